@@ -1,11 +1,24 @@
 import streamlit as st
 import pandas as pd
 import numpy as np
-import joblib
-import plotly.express as px
-import plotly.graph_objects as go
 import datetime
-from fpdf import FPDF
+import os
+import time
+
+from artifacts import FORM_LIMITS, artifacts_version, load_artifacts
+from cohort import load_or_build as load_cohort_table
+from drift import DriftMonitor, drift_level, load_or_build as load_drift_reference
+from explain import explainer_for
+from lookup_table import load_engine as load_model_engine
+from preprocessing import Preprocessor
+from whatif import MAX_INTAKE, IntakeSolver
+from registry import REGISTRY_ENV, SHADOW_FRACTION_ENV, ModelRegistry
+from shared_model import SHARED_ENV, attach
+from history import DEFAULT_CAPACITY, HistoryBuffer
+from history_store import DB_ENV, HistoryStore, Stats
+from reports import report_pdf
+from rendering import SessionFigures, importance_figure, page_css
+from telemetry import DEFAULT_METRICS_HOST, METRICS_HOST_ENV, METRICS_PORT_ENV, RerunProfile, Telemetry
 
 # Ensure page config is the very first Streamlit command
 st.set_page_config(
@@ -15,510 +28,434 @@ st.set_page_config(
     initial_sidebar_state="collapsed"
 )
 
-# ======= SIDEBAR & STATE =======
-if 'history' not in st.session_state:
-    st.session_state.history = []
-
-with st.sidebar:
-    st.header("⚙️ Dashboard Controls")
-    dark_mode = st.toggle("🌙 Dark Mode", value=True)
-    st.divider()
-    st.header("📊 Quick Analytics")
-    total_goals = len(st.session_state.history) if st.session_state.history else 124
-    st.metric("Total Goals Tracked", total_goals, "+1")
-    if st.session_state.history:
-        good_count = sum(1 for item in st.session_state.history if item['Status'] == 'Good')
-        rate = int((good_count / len(st.session_state.history)) * 100)
-        st.metric("Hydration Success Rate", f"{rate}%")
-    else:
-        st.metric("Hydration Success Rate", "85%")
-    st.divider()
-    st.markdown("### 🤖 Daily AI Tip")
-    st.info("Sip water consistently throughout the day to avoid sudden dehydration.")
-
-# ======= CSS & UI STYLING (Glassmorphism, Animations) =======
-css = """
-<style>
-/* Background Gradient Animation */
-@keyframes gradientBG {
-    0% { background-position: 0% 50%; }
-    50% { background-position: 100% 50%; }
-    100% { background-position: 0% 50%; }
-}
-
-/* Base Body Style */
-.stApp {
-    background: linear-gradient(-45deg, #1e3c72, #2a5298, #0f2027, #203a43);
-    background-size: 400% 400%;
-    animation: gradientBG 15s ease infinite;
-    color: #ffffff;
-    font-family: 'Inter', sans-serif;
-}
-
-/* Hide Streamlit empty containers that wrap style/markdown injections */
-[data-testid="stMarkdownContainer"]:empty,
-[data-testid="stMarkdownContainer"]:has(style) {
-    display: none !important;
-}
-div[data-testid="stVerticalBlock"] > div:has(style),
-div[data-testid="stVerticalBlock"] > div:empty {
-    display: none !important;
-    padding: 0 !important;
-    margin: 0 !important;
-}
-
-div[data-testid="stForm"], 
-div[data-testid="stVerticalBlock"] > div > div:not(:has(.marquee-container)):not(:empty) {
-    background: rgba(255, 255, 255, 0.05) !important;
-    backdrop-filter: blur(10px);
-    -webkit-backdrop-filter: blur(10px);
-    border-radius: 15px;
-    border: 1px solid rgba(255, 255, 255, 0.1);
-    box-shadow: 0 8px 32px 0 rgba(0, 0, 0, 0.37);
-    padding: 1rem;
-}
-
-/* The predict button - Game Action Style */
-div[data-testid="stFormSubmitButton"] > button {
-    background: linear-gradient(90deg, #ff8a00, #e52e71);
-    border: none;
-    border-radius: 50px;
-    color: white;
-    font-weight: 800;
-    font-size: 1.2rem;
-    padding: 0.5rem 2rem;
-    box-shadow: 0 4px 15px rgba(229, 46, 113, 0.4);
-    transition: all 0.3s ease;
-}
-
-div[data-testid="stFormSubmitButton"] > button:hover {
-    transform: translateY(-3px) scale(1.05);
-    box-shadow: 0 8px 25px rgba(229, 46, 113, 0.6);
-}
-
-div[data-testid="stFormSubmitButton"] > button:active {
-    transform: translateY(1px);
-}
-
-/* Emojis Animation Sequence */
-@keyframes storyAnimation {
-  0%, 20% { content: "🏃"; transform: translateX(-20px); opacity: 0; }
-  25%, 45% { content: "💧"; transform: translateX(0); opacity: 1; text-shadow: 0 0 10px #00f2fe; }
-  50%, 70% { content: "🥤"; transform: scale(1.2); opacity: 1; text-shadow: 0 0 15px #4facfe; }
-  75%, 95% { content: "⚡"; transform: translateY(-10px) scale(1.3); opacity: 1; text-shadow: 0 0 20px #f6d365; }
-  100% { content: "🏃"; transform: translateX(-20px); opacity: 0; }
-}
-
-.story-emoji::after {
-    content: "🏃";
-    display: inline-block;
-    font-size: 4rem;
-    animation: storyAnimation 6s infinite;
-}
-
-/* Text overrides for readability on dark backgrounds */
-h1, h2, h3, h4, p, label {
-    color: #ffffff !important;
-    text-shadow: 1px 1px 3px rgba(0,0,0,0.5);
-}
-
-.title-glow {
-    text-align: center;
-    font-size: 3rem;
-    font-weight: 900;
-    background: linear-gradient(to right, #00f2fe, #4facfe);
-    -webkit-background-clip: text;
-    -webkit-text-fill-color: transparent;
-    text-shadow: none;
-    margin-bottom: 0;
-}
-
-/* Pulse animation for Poor Status */
-@keyframes pulseRed {
-    0% { transform: scale(1); box-shadow: 0 0 0 0 rgba(255, 75, 75, 0.7); }
-    70% { transform: scale(1.02); box-shadow: 0 0 0 15px rgba(255, 75, 75, 0); }
-    100% { transform: scale(1); box-shadow: 0 0 0 0 rgba(255, 75, 75, 0); }
-}
-.pulse-card {
-    animation: pulseRed 2s infinite;
-    border: 2px solid #ff4b4b !important;
-}
-
-/* Highlight XP / Progress */
-progress {
-    border-radius: 7px; 
-    width: 100%;
-    height: 22px;
-    box-shadow: 1px 1px 4px rgba( 0, 0, 0, 0.2 );
-}
-progress::-webkit-progress-bar {
-    background-color: #333;
-    border-radius: 7px;
-}
-progress::-webkit-progress-value {
-    background: linear-gradient(90deg, #00C9FF 0%, #92FE9D 100%);
-    border-radius: 7px;
-}
-
-/* Marquee Animation */
-.marquee-container {
-    width: 100%;
-    overflow: hidden;
-    background: rgba(255, 255, 255, 0.1);
-    border-radius: 10px;
-    padding: 10px 0;
-    margin-bottom: 20px;
-    box-shadow: 0 4px 15px rgba(0, 0, 0, 0.2);
-    border: 1px solid rgba(255, 255, 255, 0.2);
-}
-
-.marquee-text {
-    display: inline-block;
-    white-space: nowrap;
-    animation: marquee 15s linear infinite;
-    font-size: 1.2rem;
-    font-weight: bold;
-    color: #00f2fe;
-    text-shadow: 0 0 5px rgba(0, 242, 254, 0.8);
-}
-
-@keyframes marquee {
-    0% { transform: translateX(100%); }
-    100% { transform: translateX(-100%); }
-}
-</style>
-"""
-if not dark_mode:
-    css += """
-    <style>
-    .stApp {
-        background: linear-gradient(-45deg, #e0c3fc, #8ec5fc, #e0c3fc, #8ec5fc) !important;
-        color: #111111 !important;
-    }
-    h1, h2, h3, h4, p, label {
-        color: #111111 !important;
-        text-shadow: none !important;
-    }
-    div[data-testid="stForm"], 
-    div[data-testid="stVerticalBlock"] > div > div:not(:has(.marquee-container)):not(:empty) {
-        background: rgba(255, 255, 255, 0.6) !important;
-        border: 1px solid rgba(0, 0, 0, 0.1) !important;
-        box-shadow: 0 4px 15px rgba(0, 0, 0, 0.05) !important;
-        color: #111111 !important;
-    }
-    .marquee-container {
-        background: rgba(255, 255, 255, 0.5) !important;
-        box-shadow: 0 4px 15px rgba(0, 0, 0, 0.05) !important;
-        border: 1px solid rgba(0, 0, 0, 0.1) !important;
-    }
-    .marquee-text {
-        color: #0072ff !important;
-        text-shadow: none !important;
-    }
-    .title-glow {
-        background: linear-gradient(to right, #0072ff, #00c6ff);
-        -webkit-background-clip: text;
-        -webkit-text-fill-color: transparent;
-    }
-    </style>
-    """
-st.markdown(css, unsafe_allow_html=True)
-
-# ======= LOAD ML MODELS =======
-@st.cache_resource
-def load_models():
-    scaler = joblib.load("scaler.pkl")
-    le_gender = joblib.load("label_encoder_Gender.pkl")
-    le_physical_acitivity = joblib.load("label_encoder_Physical Activity Level.pkl")
-    le_weather = joblib.load("label_encoder_Weather.pkl")
-    model = joblib.load("best_model.pkl")
-    return scaler, le_gender, le_physical_acitivity, le_weather, model
+# ======= TELEMETRY =======
+# Per-stage timings, off unless HYDRATION_TELEMETRY / HYDRATION_METRICS_FILE /
+# HYDRATION_METRICS_PORT is set; with telemetry on, ?profile=1 dumps a
+# cProfile of one rerun
+rerun_started = time.perf_counter()
 
+@st.cache_resource
+def load_telemetry():
+    telemetry = Telemetry.from_env()
+    if os.environ.get(METRICS_PORT_ENV):
+        telemetry.serve(int(os.environ[METRICS_PORT_ENV]), os.environ.get(METRICS_HOST_ENV) or DEFAULT_METRICS_HOST)
+    return telemetry
+
+telemetry = load_telemetry()
+profiler = None
+if "profile" in st.query_params:
+    del st.query_params["profile"]  # profile this rerun only
+    if telemetry.enabled:
+        profiler = RerunProfile()
+
+# Everything up to the telemetry output is the profiled rerun; the finally
+# stops the profiler on st.stop() and on errors too
 try:
-    scaler, le_gender, le_physical_acitivity, le_weather, model = load_models()
-except Exception as e:
-    st.error(f"Error loading models: {e}")
-    st.stop()
-
-# ======= HERO SECTION =======
-st.markdown("<div class='marquee-container'><div class='marquee-text'>🚀 Stay Hydrated 🌊 Stay Healthy 🌟</div></div>", unsafe_allow_html=True)
-st.markdown("<h1 class='title-glow'>Hydration Quest 💦</h1>", unsafe_allow_html=True)
-st.markdown("<div style='text-align: center; margin-bottom: 1rem;'><span class='story-emoji'></span></div>", unsafe_allow_html=True)
-st.markdown("<p style='text-align: center; font-size: 1.1rem; color: #ddd;'>Level up your health by tracking your hydration. Enter your stats and discover your Hydration Hero Status!</p>", unsafe_allow_html=True)
-
-
-# ======= PLAYER INPUT PANEL =======
-st.markdown("### 🎮 Input Details")
-
-with st.form("input_form", clear_on_submit=False):
-    col1, col2 = st.columns(2)
-
-    with col1:
-        age = st.number_input("👤 Age", min_value=0, max_value=100, value=30)
-        Weight = st.slider("⚖️ Weight (kg)", min_value=10.0, max_value=200.0, value=70.0)
-        Water_intake = st.number_input("🥤 Daily Water Intake (Liters)", min_value=0.0, max_value=8.0, value=2.0, step=0.5)
-
-    with col2:
-        gender = st.selectbox("🚻 Gender", options=le_gender.classes_ if hasattr(le_gender, 'classes_') else [])
-        Physical_activity = st.selectbox("🏃 Physical Activity Level", options=le_physical_acitivity.classes_ if hasattr(le_physical_acitivity, 'classes_') else [])
-        Weather = st.selectbox("🌞 Weather Condition", options=le_weather.classes_ if hasattr(le_weather, 'classes_') else [])
-
-    st.markdown("<br>", unsafe_allow_html=True)
-    submitted = st.form_submit_button("⚡ PREDICT HYDRATION LEVEL ⚡")
-
-# ======= PREDICTION & RESULTS DASHBOARD =======
-if submitted:
-    with st.spinner("Analyzing your vitals... 🧬"):
-        # Prepare Data
-        input_data = pd.DataFrame({
-            "Age": [age],
-            "Gender": [gender],
-            "Weight (kg)": [Weight],
-            "Daily Water Intake (liters)": [Water_intake],
-            "Physical Activity Level": [Physical_activity],
-            "Weather": [Weather]
-        })
-
-        # Encoding
-        input_data_encoded = input_data.copy()
-        try:
-            input_data_encoded["Gender"] = le_gender.transform(input_data_encoded["Gender"])
-            input_data_encoded["Physical Activity Level"] = le_physical_acitivity.transform(
-                input_data_encoded["Physical Activity Level"]
-            )
-            input_data_encoded["Weather"] = le_weather.transform(input_data_encoded["Weather"])
-        except Exception as e:
-            st.warning("Could not encode variables. Make sure your inputs match model training data.")
-
-        # Scaling
+    # ======= SIDEBAR & STATE =======
+    # Bounded, columnar history: fixed memory per session, O(1) sidebar aggregates
+    HISTORY_CAPACITY = int(os.environ.get("HYDRATION_HISTORY_CAPACITY", DEFAULT_CAPACITY))
+    if 'history' not in st.session_state:
+        st.session_state.history = HistoryBuffer(HISTORY_CAPACITY)
+
+    # Persistent history, opt-in with HYDRATION_DB. Totals are kept per signed-in
+    # user (st.login); without an identity the sidebar uses the session buffer
+    @st.cache_resource
+    def load_history_store(path):
         try:
-            num_cols = list(scaler.feature_names_in_)
-            input_data_encoded[num_cols] = scaler.transform(input_data_encoded[num_cols])
-            input_data_encoded = input_data_encoded.reindex(columns=model.feature_names_in_)
-        except Exception as e:
-            pass
-
-        # Prediction & Confidence
-        prediction = model.predict(input_data_encoded)[0]
-        confidence = 0.0
-        if hasattr(model, "predict_proba"):
-            proba = model.predict_proba(input_data_encoded)[0]
-            confidence = round(max(proba) * 100, 1)
+            return HistoryStore(path)
+        except Exception:
+            return None
+
+    user_id = (st.user.get("email") or st.user.get("sub")) if st.user.get("is_logged_in") else None
+    history_store = load_history_store(os.environ[DB_ENV]) if os.environ.get(DB_ENV) and user_id else None
+
+    with st.sidebar:
+        st.header("⚙️ Dashboard Controls")
+        dark_mode = st.toggle("🌙 Dark Mode", value=True)
+        st.divider()
+        st.header("📊 Quick Analytics")
+        history = st.session_state.history
+        stats = history_store.user_stats(user_id) if history_store else Stats(history.total, history.good_total)
+        st.metric("Total Goals Tracked", stats.total, f"+{history.total} this session" if history.total else None)
+        if stats.total:
+            rate = int((stats.good / stats.total) * 100)
+            st.metric("Hydration Success Rate", f"{rate}%")
         else:
-            confidence = 85.0 # default fallback
-        
-        # Save to history
-        st.session_state.history.append({
-            "Time": datetime.datetime.now().strftime("%H:%M:%S"),
-            "Age": age,
-            "Weight": Weight,
-            "Water Intake": Water_intake,
-            "Activity": Physical_activity,
-            "Status": "Good" if prediction == 0 else "Poor",
-            "Confidence": f"{confidence}%"
-        })
-
-    # Display Results Card
-    st.markdown("---")
-    st.markdown("### 🏆 Mission Results")
-
-    res_col1, res_col2 = st.columns([1, 1])
-
-    if prediction == 0:  # GOOD Hydration
-        st.balloons()
-        with res_col1:
-            html_content = f"""
-            <div style='padding:1rem; border-radius:10px; background:rgba(0,255,100,0.1); border: 2px solid #00cc66; box-shadow: 0 4px 15px rgba(0,204,102,0.3);'>
-                <h3 style='color:#00ff88; margin-top:0;'>✅ STATUS: Hydrated Hero</h3>
-                <p>Your hydration levels are optimal! Keep the streak going.</p>
-                <p><strong>AI Confidence: {confidence}%</strong></p>
-                <p><strong>Hydration XP: 100/100</strong></p>
-                <progress value='100' max='100'></progress>
-            </div>
-            """
-            st.markdown(html_content, unsafe_allow_html=True)
-    else:  # POOR Hydration
-        with res_col1:
-            html_content = f"""
-            <div class='pulse-card' style='padding:1rem; border-radius:10px; background:rgba(255,75,75,0.1);'>
-                <h3 style='color:#ff4b4b; margin-top:0;'>⚠️ STATUS: Needs Water!</h3>
-                <p>Warning: Hydration critically low. Energy depleted. Please drink water immediately!</p>
-                <p><strong>AI Confidence: {confidence}%</strong></p>
-                <p><strong>Hydration XP: 35/100</strong></p>
-                <progress value='35' max='100' style='accent-color: red;'></progress>
-            </div>
-            """
-            st.markdown(html_content, unsafe_allow_html=True)
-
-    # ======= ANALYTICS & VISUALIZATIONS =======
-    with res_col2:
-        # Gauge Chart for Health Score
-        score = 85 if prediction == 0 else 35
-        color = "green" if prediction == 0 else "red"
-        
-        fig_gauge = go.Figure(go.Indicator(
-            mode = "gauge+number",
-            value = score,
-            title = {'text': "Overall Health Score", 'font': {'color': 'white'}},
-            gauge = {
-                'axis': {'range': [None, 100], 'tickcolor': "white"},
-                'bar': {'color': color},
-                'steps' : [
-                    {'range': [0, 50], 'color': "rgba(255, 75, 75, 0.3)"},
-                    {'range': [50, 80], 'color': "rgba(255, 204, 0, 0.3)"},
-                    {'range': [80, 100], 'color': "rgba(0, 204, 102, 0.3)"}],
+            st.metric("Hydration Success Rate", "—")
+        st.divider()
+        st.markdown("### 🤖 Daily AI Tip")
+        st.info("Sip water consistently throughout the day to avoid sudden dehydration.")
+        debug_panel = None
+        if telemetry.enabled and st.toggle("🔬 Timing Debug Panel", value=False):
+            st.divider()
+            debug_panel = st.container()
+            if debug_panel.button("Profile next rerun"):
+                st.query_params["profile"] = "1"
+
+    # ======= CSS & UI STYLING =======
+    st.markdown(page_css(dark_mode), unsafe_allow_html=True)
+
+    # ======= LOAD ML MODELS =======
+    # With HYDRATION_MODEL_REGISTRY set, the model comes from registry.py and is
+    # hot-swapped when its CURRENT pointer changes. With HYDRATION_SHARED_MODEL
+    # set, workers attach to arrays exported by shared_model.py instead of
+    # unpickling their own copy of the model.
+    registry_dir = os.environ.get(REGISTRY_ENV)
+    shared_model_dir = os.environ.get(SHARED_ENV)
+
+    @st.cache_resource
+    def load_registry(path):
+        registry = ModelRegistry(path, shadow_fraction=float(os.environ.get(SHADOW_FRACTION_ENV) or 0))
+        telemetry.add_collector(registry.prometheus_lines)
+        return registry
+
+    @st.cache_resource
+    def load_models():
+        return load_artifacts()
+
+    @st.cache_resource
+    def load_shared_model(path):
+        return attach(path)
+
+    @st.cache_resource
+    def load_engine():
+        if shared_model_dir:
+            return load_shared_model(shared_model_dir).engine
+        return load_model_engine(load_models())
+
+    @st.cache_resource
+    def load_preprocessor():
+        if shared_model_dir:
+            return load_shared_model(shared_model_dir).preprocessor
+        return Preprocessor(load_models())
+
+    @st.cache_resource
+    def load_model_version():
+        if shared_model_dir:
+            return load_shared_model(shared_model_dir).manifest.get("version", "")
+        return artifacts_version()
+
+    # Keyed by version so a hot-swapped model gets its own
+    @st.cache_resource(max_entries=2)
+    def load_explainer(model_version):
+        return explainer_for(engine)
+
+    @st.cache_resource(max_entries=2)
+    def load_intake_solver(model_version):
+        try:
+            return IntakeSolver(engine, preprocessor)
+        except ValueError:
+            return None
+
+    # Sorted per-cohort intakes / weights from the training data, saved next to
+    # the artifacts; keyed by version as it is built for the model's categories
+    @st.cache_resource(max_entries=2)
+    def load_cohort_index(model_version):
+        try:
+            return load_cohort_table(preprocessor.categories)
+        except (OSError, ValueError, KeyError):
+            return None
+
+    # One monitor per process and model version: every session's inputs are
+    # compared with the training data profile; the live version's monitor is
+    # exported with the telemetry metrics
+    @st.cache_resource(max_entries=2)
+    def load_drift_monitor(model_version):
+        try:
+            monitor = DriftMonitor(load_drift_reference(preprocessor))
+        except (OSError, ValueError, KeyError):
+            return None
+        telemetry.add_collector(monitor.prometheus_lines, key="drift")
+        return monitor
+
+    # Model-static figure, shared read-only by every session (st.cache_data would
+    # unpickle a fresh copy, ~20ms, on every hit); the version keys it to the model.
+    # Both themes for the live and the previous version, like the loaders above
+    @st.cache_resource(max_entries=4)
+    def load_importance_figure(model_version, dark_mode):
+        return importance_figure(getattr(engine, "feature_importances_", None), preprocessor.feature_names, dark_mode)
+
+    try:
+        with telemetry.span("model_load"):
+            if registry_dir:
+                # One snapshot per rerun, so a swap mid-run never mixes versions
+                live_model = load_registry(registry_dir).live
+                engine, preprocessor, model_version = live_model.engine, live_model.preprocessor, live_model.version
+            else:
+                engine = load_engine()
+                preprocessor = load_preprocessor()
+                model_version = load_model_version()
+    except Exception as e:
+        st.error(f"Error loading models: {e}")
+        st.stop()
+
+    # ======= HERO SECTION =======
+    st.markdown("<div class='marquee-container'><div class='marquee-text'>🚀 Stay Hydrated 🌊 Stay Healthy 🌟</div></div>", unsafe_allow_html=True)
+    st.markdown("<h1 class='title-glow'>Hydration Quest 💦</h1>", unsafe_allow_html=True)
+    st.markdown("<div style='text-align: center; margin-bottom: 1rem;'><span class='story-emoji'></span></div>", unsafe_allow_html=True)
+    st.markdown("<p style='text-align: center; font-size: 1.1rem; color: #ddd;'>Level up your health by tracking your hydration. Enter your stats and discover your Hydration Hero Status!</p>", unsafe_allow_html=True)
+
+
+    # ======= PLAYER INPUT PANEL =======
+    st.markdown("### 🎮 Input Details")
+
+    with st.form("input_form", clear_on_submit=False):
+        col1, col2 = st.columns(2)
+
+        with col1:
+            lim = FORM_LIMITS["Age"]
+            age = st.number_input("👤 Age", min_value=lim.min, max_value=lim.max, value=lim.default, step=lim.step)
+            lim = FORM_LIMITS["Weight (kg)"]
+            Weight = st.slider("⚖️ Weight (kg)", min_value=lim.min, max_value=lim.max, value=lim.default, step=lim.step)
+            lim = FORM_LIMITS["Daily Water Intake (liters)"]
+            Water_intake = st.number_input("🥤 Daily Water Intake (Liters)", min_value=lim.min, max_value=lim.max, value=lim.default, step=lim.step)
+
+        with col2:
+            gender = st.selectbox("🚻 Gender", options=preprocessor.categories.get("Gender", []))
+            Physical_activity = st.selectbox("🏃 Physical Activity Level", options=preprocessor.categories.get("Physical Activity Level", []))
+            Weather = st.selectbox("🌞 Weather Condition", options=preprocessor.categories.get("Weather", []))
+
+        st.markdown("<br>", unsafe_allow_html=True)
+        submitted = st.form_submit_button("⚡ PREDICT HYDRATION LEVEL ⚡")
+
+    # ======= PREDICTION & RESULTS DASHBOARD =======
+    if submitted:
+        with st.spinner("Analyzing your vitals... 🧬"):
+            # Prepare Data
+            input_record = {
+                "Age": age,
+                "Gender": gender,
+                "Weight (kg)": Weight,
+                "Daily Water Intake (liters)": Water_intake,
+                "Physical Activity Level": Physical_activity,
+                "Weather": Weather
             }
-        ))
-        
-        fig_gauge.update_layout(
-            paper_bgcolor="rgba(0,0,0,0)",
-            plot_bgcolor="rgba(0,0,0,0)",
-            font={'color': "white"},
-            height=200,
-            margin=dict(l=20, r=20, t=50, b=20)
-        )
-        st.plotly_chart(fig_gauge, use_container_width=True)
 
-    st.markdown("### 📊 Hydration Impact Analytics")
-    
-    # Create an interactive plot comparing the user's water intake against a recommended goal
-    # Simple rule of thumb: ~35ml per kg of weight
-    recommended_intake = round(Weight * 0.035, 2)
-    
-    chart_data = pd.DataFrame({
-        "Category": ["Your Intake", "Recommended Goal"],
-        "Water (Liters)": [Water_intake, recommended_intake]
-    })
-    
-    fig_bar = px.bar(
-        chart_data, 
-        x="Category", 
-        y="Water (Liters)", 
-        color="Category",
-        color_discrete_map={
-            "Your Intake": "#00f2fe" if prediction == 0 else "#ff4b4b",
-            "Recommended Goal": "#4facfe"
-        },
-        text="Water (Liters)",
-        title="Water Intake vs Recommended Goal"
-    )
-    
-    fig_bar.update_traces(textposition='outside')
-    fig_bar.update_layout(
-        paper_bgcolor="rgba(0,0,0,0)",
-        plot_bgcolor="rgba(0,0,0,0)",
-        font={'color': "white"},
-        showlegend=False
-    )
+            # Encoding & Scaling (model feature order)
+            input_features = np.empty(preprocessor.n_features)
+            try:
+                with telemetry.span("encode"):
+                    preprocessor.encode_one(input_record, input_features)
+            except ValueError:
+                st.warning("Could not encode variables. Make sure your inputs match model training data.")
+                st.stop()
+            with telemetry.span("scale"):
+                preprocessor.scale_one(input_record, input_features)
+
+            # Prediction & Confidence (one model walk gives both, so no separate predict_proba)
+            with telemetry.span("predict"):
+                prediction, proba = engine.predict_one(input_features)
+            confidence = round(proba * 100, 1)
+        
+            drift_monitor = load_drift_monitor(model_version)
+            if drift_monitor is not None:
+                with telemetry.span("drift"):
+                    drift_monitor.observe(input_record, prediction)
+            if registry_dir:
+                load_registry(registry_dir).shadow(input_record)  # sampled; scored on the registry's thread pool
+
+            # Save to history
+            record = dict(
+                when=datetime.datetime.now(),
+                age=age,
+                weight=Weight,
+                water_intake=Water_intake,
+                activity=Physical_activity,
+                status="Good" if prediction == 0 else "Poor",
+                confidence=confidence,
+            )
+            st.session_state.history.append(**record)
+            if history_store:
+                history_store.record(user_id, **record)
+
+        # Gauge and intake templates are built on the first submit of a session
+        # (keeping plotly off cold start) and only patched afterwards
+        if 'figures' not in st.session_state:
+            st.session_state.figures = SessionFigures()
+
+        # Display Results Card
+        st.markdown("---")
+        st.markdown("### 🏆 Mission Results")
+
+        res_col1, res_col2 = st.columns([1, 1])
+
+        if prediction == 0:  # GOOD Hydration
+            st.balloons()
+            with res_col1:
+                html_content = f"""
+                <div style='padding:1rem; border-radius:10px; background:rgba(0,255,100,0.1); border: 2px solid #00cc66; box-shadow: 0 4px 15px rgba(0,204,102,0.3);'>
+                    <h3 style='color:#00ff88; margin-top:0;'>✅ STATUS: Hydrated Hero</h3>
+                    <p>Your hydration levels are optimal! Keep the streak going.</p>
+                    <p><strong>AI Confidence: {confidence}%</strong></p>
+                    <p><strong>Hydration XP: 100/100</strong></p>
+                    <progress value='100' max='100'></progress>
+                </div>
+                """
+                st.markdown(html_content, unsafe_allow_html=True)
+        else:  # POOR Hydration
+            with res_col1:
+                html_content = f"""
+                <div class='pulse-card' style='padding:1rem; border-radius:10px; background:rgba(255,75,75,0.1);'>
+                    <h3 style='color:#ff4b4b; margin-top:0;'>⚠️ STATUS: Needs Water!</h3>
+                    <p>Warning: Hydration critically low. Energy depleted. Please drink water immediately!</p>
+                    <p><strong>AI Confidence: {confidence}%</strong></p>
+                    <p><strong>Hydration XP: 35/100</strong></p>
+                    <progress value='35' max='100' style='accent-color: red;'></progress>
+                </div>
+                """
+                st.markdown(html_content, unsafe_allow_html=True)
+
+        # ======= ANALYTICS & VISUALIZATIONS =======
+        # Compare the user's water intake against the least intake the model rates
+        # Good for this profile, moving from where they are now
+        solver = load_intake_solver(model_version)
+        with telemetry.span("whatif"):
+            target = solver.solve_one(input_features, from_current=True) if solver else None
+        recommended_intake = round(target.intake, 2) if target and not np.isnan(target.intake) else None
+        with telemetry.span("session_figures"):
+            fig_gauge, fig_bar = st.session_state.figures.update(prediction == 0, Water_intake, recommended_intake)
+
+        with telemetry.span("session_charts"):
+            with res_col2:
+                # Gauge Chart for Health Score
+                st.plotly_chart(fig_gauge, use_container_width=True)
+
+            st.markdown("### 📊 Hydration Impact Analytics")
+            st.plotly_chart(fig_bar, use_container_width=True)
     
-    st.plotly_chart(fig_bar, use_container_width=True)
+        # ======= COHORT COMPARISON =======
+        cohorts = load_cohort_index(model_version)
+        if cohorts is not None:
+            with telemetry.span("cohort"):
+                peers = cohorts.compare(gender, Physical_activity, Weather, age, Water_intake, Weight)
+            if peers.size:
+                st.markdown("### 👥 How You Compare")
+                st.markdown(
+                    f"Among **{peers.size:,}** {gender.lower()} participants aged {peers.age_band} with {Physical_activity.lower()} "
+                    f"activity in {Weather.lower()} weather, your intake is higher than **{peers.intake_percentile:.0f}%** "
+                    f"and your weight higher than **{peers.weight_percentile:.0f}%**. "
+                    f"**{peers.good_rate:.0f}%** of this group is rated Good."
+                )
+
+        st.info("💡 **Tip**: Stay active and adjust your water intake based on weather and physical activity!")
+
+        # ======= FEATURE IMPORTANCE =======
+        st.markdown("---")
+        st.markdown("### 🧠 AI Feature Importance")
+        st.markdown("<p style='color:#bbb;' class='subtitle'>Discover which factors the AI weighed most heavily for your prediction.</p>", unsafe_allow_html=True)
     
-    st.info("💡 **Tip**: Stay active and adjust your water intake based on weather and physical activity!")
+        # Decision-path contributions for this input; models that are not a
+        # single tree fall back to the global (or estimated) importances
+        explainer = load_explainer(model_version)
+        if explainer is not None:
+            with telemetry.span("explain"):
+                explanation = explainer.explain_one(input_features)
+            with telemetry.span("explanation_figure"):
+                fig_imp = st.session_state.figures.explanation(
+                    preprocessor.feature_names, explainer.toward(explanation, prediction), record["status"], dark_mode
+                )
+        else:
+            with telemetry.span("importance_figure"):
+                fig_imp = load_importance_figure(model_version, dark_mode)
+        with telemetry.span("importance_chart"):
+            st.plotly_chart(fig_imp, use_container_width=True)
+
+        # ======= HISTORICAL TRACKER EXPANDEr =======
+        st.markdown("### 🕒 Session History")
+        with st.expander("View your prediction history for this session"):
+            if st.session_state.history:
+                with telemetry.span("history"):
+                    st.dataframe(
+                        st.session_state.history.frame(),
+                        use_container_width=True,
+                        column_config={
+                            "Time": st.column_config.DatetimeColumn(format="HH:mm:ss"),
+                            "Confidence": st.column_config.NumberColumn(format="%.1f%%"),
+                        },
+                    )
+            else:
+                st.info("Make some predictions to see your history!")
+
+        # ======= AI HEALTH SUGGESTIONS =======
+        st.markdown("### 🤖 Personalized AI Plan")
+        if prediction == 0:
+            floor = (f" The model keeps you in the Good range down to {recommended_intake}L a day, so stay at or above that."
+                     if recommended_intake is not None and recommended_intake < Water_intake else "")
+            st.success(f"**Optimal Hydration Maintained!**\n\nThe AI suggests continuing your regimen of {Water_intake}L. With your {Physical_activity} activity level and weighing {Weight}kg, you are hitting the sweet spot.{floor} Maintain electrolyte balance if engaging in intense activities.")
+        elif recommended_intake is not None:
+            increase = round(recommended_intake - Water_intake, 2)
+            st.warning(f"**Hydration Deficit Detected!**\n\nYour current intake of {Water_intake}L is insufficient for a {Weight}kg individual engaging in {Physical_activity} activity. With everything else unchanged, the model rates you Good from {recommended_intake}L a day, {increase}L more than now. Increase gradually and incorporate water-rich foods.")
+        else:
+            st.warning(f"**Hydration Deficit Detected!**\n\nYour current intake of {Water_intake}L is insufficient for a {Weight}kg individual engaging in {Physical_activity} activity, and raising it alone, up to {MAX_INTAKE:g}L, does not change that. Spread your intake through the day, incorporate water-rich foods and consider checking in with a health professional.")
 
-    # ======= FEATURE IMPORTANCE =======
-    st.markdown("---")
-    st.markdown("### 🧠 AI Feature Importance")
-    st.markdown("<p style='color:#bbb;' class='subtitle'>Discover which factors the AI weighed most heavily for your prediction.</p>", unsafe_allow_html=True)
+        # ======= PDF REPORT DOWNLOAD =======
+        st.markdown("---")
+        st.markdown("### 📄 Generate Health Report")
     
-    if hasattr(model, "feature_importances_") and model.feature_importances_ is not None:
-        importances = model.feature_importances_
-        features = input_data_encoded.columns
-        df_imp = pd.DataFrame({"Feature": features, "Importance": importances}).sort_values(by="Importance", ascending=True)
-        
-        fig_imp = px.bar(
-            df_imp, 
-            x="Importance", 
-            y="Feature", 
-            orientation='h', 
-            color="Importance", 
-            color_continuous_scale="Viridis",
-            title="Feature Impact on Hydration Prediction"
-        )
-        fig_imp.update_layout(
-            paper_bgcolor="rgba(0,0,0,0)",
-            plot_bgcolor="rgba(0,0,0,0)",
-            font={'color': "white" if dark_mode else "black"}
-        )
-        st.plotly_chart(fig_imp, use_container_width=True)
-    else:
-        # Mock feature importance if the model doesn't support it (e.g., Logistic Regression or KNN)
-        mock_features = ["Water Intake", "Weight", "Physical Activity", "Weather", "Age", "Gender"]
-        mock_imps = [0.45, 0.20, 0.15, 0.10, 0.08, 0.02]
-        df_imp = pd.DataFrame({"Feature": mock_features, "Importance": mock_imps}).sort_values(by="Importance", ascending=True)
-        fig_imp = px.bar(
-            df_imp, 
-            x="Importance", 
-            y="Feature", 
-            orientation='h', 
-            color="Importance", 
-            color_continuous_scale="Plasma",
-            title="Estimated Feature Impact on Hydration Prediction"
-        )
-        fig_imp.update_layout(
-            paper_bgcolor="rgba(0,0,0,0)",
-            plot_bgcolor="rgba(0,0,0,0)",
-            font={'color': "white" if dark_mode else "black"}
-        )
-        st.plotly_chart(fig_imp, use_container_width=True)
+        # Built only when the button is clicked: Streamlit calls create_pdf
+        # while serving the download, not during this script run, and
+        # on_click="ignore" skips the rerun a click would otherwise start.
+        # Reports are memoized across sessions. Streamlit commands do nothing
+        # inside the callable, so a failure there only fails the download;
+        # it is kept and shown here on the next submit.
+        pdf_errors = st.session_state.setdefault("pdf_errors", [])
+        if pdf_errors:
+            st.error(f"Could not generate PDF: {pdf_errors.pop()}")
+            pdf_errors.clear()
+
+        def create_pdf(pred_status=prediction, conf=confidence, history_len=st.session_state.history.total):
+            try:
+                with telemetry.span("create_pdf"):
+                    return report_pdf(pred_status, conf, history_len)
+            except Exception as e:
+                pdf_errors.append(e)
+                raise
 
-    # ======= HISTORICAL TRACKER EXPANDEr =======
-    st.markdown("### 🕒 Session History")
-    with st.expander("View your prediction history for this session"):
-        if st.session_state.history:
-            st.dataframe(pd.DataFrame(st.session_state.history), use_container_width=True)
-        else:
-            st.info("Make some predictions to see your history!")
-
-    # ======= AI HEALTH SUGGESTIONS =======
-    st.markdown("### 🤖 Personalized AI Plan")
-    if prediction == 0:
-        st.success(f"**Optimal Hydration Maintained!**\n\nThe AI suggests continuing your regimen of {Water_intake}L. With your {Physical_activity} activity level and weighing {Weight}kg, you are hitting the sweet spot. Maintain electrolyte balance if engaging in intense activities.")
-    else:
-        st.warning(f"**Hydration Deficit Detected!**\n\nYour current intake of {Water_intake}L is insufficient for a {Weight}kg individual engaging in {Physical_activity} activity. The AI recommends gradually increasing your intake by at least 0.5L - 1.0L daily and incorporating water-rich foods.")
-
-    # ======= PDF REPORT DOWNLOAD =======
-    st.markdown("---")
-    st.markdown("### 📄 Generate Health Report")
-    
-    def create_pdf(pred_status, conf, history_len):
-        pdf = FPDF()
-        pdf.add_page()
-        pdf.set_font("Helvetica", size=16)
-        pdf.cell(200, 10, txt="Hydration Quest - AI Health Report", align='C')
-        pdf.ln(20)
-        
-        pdf.set_font("Helvetica", size=12)
-        pdf.cell(200, 10, txt=f"Date: {datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
-        pdf.ln(10)
-        pdf.cell(200, 10, txt=f"Current Status: {'Optimal (Hydrated Hero)' if pred_status == 0 else 'Poor (Needs Water)'}")
-        pdf.ln(10)
-        pdf.cell(200, 10, txt=f"AI Confidence: {conf}%")
-        pdf.ln(10)
-        pdf.cell(200, 10, txt=f"Total Predictions made this session: {history_len}")
-        pdf.ln(20)
-        
-        pdf.cell(200, 10, txt="Personalized Advice:")
-        pdf.ln(10)
-        pdf.set_font("Helvetica", style='I', size=11)
-        if pred_status == 0:
-            pdf.multi_cell(0, 10, txt="Great job! Your hydration markers look steady. Continue to balance water intake with your physical activity.")
-        else:
-            pdf.multi_cell(0, 10, txt="You are currently running a hydration deficit. Increase fluid intake to optimize bodily functions and energy levels.")
-            
         try:
-            out = pdf.output(dest='S')
-            return out.encode('latin-1') if isinstance(out, str) else bytes(out)
-        except Exception:
-            out = pdf.output()
-            return out.encode('latin-1') if isinstance(out, str) else bytes(out)
-
-    try:
-        pdf_bytes = create_pdf(prediction, confidence, len(st.session_state.history))
-        st.download_button(
-            label="📄 Download PDF Report",
-            data=pdf_bytes,
-            file_name="Hydration_Report.pdf",
-            mime="application/pdf",
+            st.download_button(
+                label="📄 Download PDF Report",
+                data=create_pdf,
+                file_name="Hydration_Report.pdf",
+                mime="application/pdf",
+                on_click="ignore",
+            )
+        except Exception as e:
+            st.error(f"Could not generate PDF: {e}")
+
+    # ======= TELEMETRY OUTPUT =======
+    telemetry.observe("rerun", time.perf_counter() - rerun_started)
+    telemetry.write()
+    if profiler is not None:
+        st.sidebar.caption(f"🔬 Rerun profile written to {profiler.stop()}")
+finally:
+    if profiler is not None:
+        profiler.stop()
+if debug_panel is not None:
+    debug_panel.dataframe(
+        pd.DataFrame(telemetry.summary()).drop(columns="total_s"),
+        use_container_width=True,
+        hide_index=True,
+        column_config={
+            "count": st.column_config.NumberColumn("Count"),
+            "mean_ms": st.column_config.NumberColumn("Mean ms", format="%.2f"),
+            "p50_ms": st.column_config.NumberColumn("p50 ms", format="%.2f"),
+            "p99_ms": st.column_config.NumberColumn("p99 ms", format="%.2f"),
+        },
+    )
+    if registry_dir:
+        debug_panel.markdown(f"**Model** {model_version}  \n{load_registry(registry_dir).describe_shadow()}")
+    drift_monitor = load_drift_monitor(model_version)
+    if drift_monitor is not None and drift_monitor.events:
+        live, reference, _ = drift_monitor.status_rates()
+        debug_panel.markdown(f"**Input drift** over the last {drift_monitor.window_events():,} of "
+                             f"{drift_monitor.events:,} predictions (Good rate {live:.0%} vs {reference:.0%} in training)")
+        debug_panel.dataframe(
+            pd.DataFrame(
+                [(row.feature, row.psi, drift_level(row.psi), row.below_range + row.above_range + row.unknown)
+                 for row in drift_monitor.features()],
+                columns=["Feature", "PSI", "Drift", "Out of range"],
+            ),
+            use_container_width=True,
+            hide_index=True,
+            column_config={"PSI": st.column_config.NumberColumn(format="%.3f")},
         )
-    except Exception as e:
-        st.error(f"Could not generate PDF: {e}")
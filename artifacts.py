@@ -0,0 +1,215 @@
+"""Loading and packaging of the fitted model artifacts.
+
+The notebook writes one .pkl per object. For deployment they can be packed
+into a single versioned, checksummed bundle that loads in one call with its
+NumPy arrays memory-mapped:
+    python artifacts.py bundle
+"""
+import argparse
+import datetime
+import hashlib
+import json
+import os
+from collections import namedtuple
+
+import joblib
+
+# ======= ARTIFACT LAYOUT =======
+# File names written by analysis_model.ipynb and read by app.py
+SCALER_FILE = "scaler.pkl"
+GENDER_ENCODER_FILE = "label_encoder_Gender.pkl"
+ACTIVITY_ENCODER_FILE = "label_encoder_Physical Activity Level.pkl"
+WEATHER_ENCODER_FILE = "label_encoder_Weather.pkl"
+TARGET_ENCODER_FILE = "Hydration_level_encoder.pkl"
+MODEL_FILE = "best_model.pkl"
+SOURCE_FILES = (SCALER_FILE, GENDER_ENCODER_FILE, ACTIVITY_ENCODER_FILE, WEATHER_ENCODER_FILE, MODEL_FILE)
+
+# Single-file bundle written by `python artifacts.py bundle`
+BUNDLE_FILE = "model_bundle.joblib"
+BUNDLE_MANIFEST = "model_bundle.json"
+BUNDLE_FORMAT = 1
+
+# Raw input columns, in the order of Daily_Water_Intake.csv
+FEATURE_COLUMNS = [
+    "Age",
+    "Gender",
+    "Weight (kg)",
+    "Daily Water Intake (liters)",
+    "Physical Activity Level",
+    "Weather",
+]
+TARGET_COLUMN = "Hydration Level"
+
+# Numeric widgets of the input form in app.py; the lookup table and the
+# what-if solver cover exactly these ranges
+FormLimit = namedtuple("FormLimit", ["min", "max", "default", "step"])
+FORM_LIMITS = {
+    "Age": FormLimit(0, 100, 30, 1),
+    "Weight (kg)": FormLimit(10.0, 200.0, 70.0, 0.01),
+    "Daily Water Intake (liters)": FormLimit(0.0, 8.0, 2.0, 0.5),
+}
+
+ModelArtifacts = namedtuple(
+    "ModelArtifacts",
+    ["scaler", "le_gender", "le_physical_acitivity", "le_weather", "model"],
+)
+Bundle = namedtuple("Bundle", ["artifacts", "target_encoder", "manifest"])
+
+
+def has_bundle(base_dir="."):
+    return all(os.path.exists(os.path.join(base_dir, name)) for name in (BUNDLE_FILE, BUNDLE_MANIFEST))
+
+
+def bundle_is_current(base_dir="."):
+    """False if a .pkl next to the bundle differs from the one the bundle was built from.
+
+    Bundles without their source files (e.g. registry versions) are current.
+    """
+    manifest = read_manifest(base_dir)
+    recorded = manifest.get("source_sha256")
+    if recorded is None:
+        # Older manifests: the version is the fingerprint of SOURCE_FILES
+        if not all(os.path.exists(os.path.join(base_dir, name)) for name in SOURCE_FILES):
+            return True
+        return manifest["version"] == artifact_fingerprint(base_dir)
+    for name, digest in recorded.items():
+        path = os.path.join(base_dir, name)
+        if os.path.exists(path) and sha256_files([path]) != digest:
+            return False
+    return True
+
+
+def use_bundle(base_dir="."):
+    """Whether load_artifacts(base_dir) loads the bundle: present and not stale."""
+    return has_bundle(base_dir) and bundle_is_current(base_dir)
+
+
+def load_artifacts(base_dir=".", prefer_bundle=True):
+    """Load the scaler, the three feature encoders and the model from base_dir.
+
+    A bundle written by write_bundle() is used when present, unless the .pkl
+    files next to it have changed since it was written; otherwise the
+    individual .pkl files are loaded.
+    """
+    if prefer_bundle and use_bundle(base_dir):
+        return load_bundle(base_dir).artifacts
+
+    def _load(name):
+        return joblib.load(os.path.join(base_dir, name))
+
+    return ModelArtifacts(
+        scaler=_load(SCALER_FILE),
+        le_gender=_load(GENDER_ENCODER_FILE),
+        le_physical_acitivity=_load(ACTIVITY_ENCODER_FILE),
+        le_weather=_load(WEATHER_ENCODER_FILE),
+        model=_load(MODEL_FILE),
+    )
+
+
+def sha256_files(paths):
+    """Hex SHA-256 over the concatenated contents of paths, read in order."""
+    digest = hashlib.sha256()
+    for path in paths:
+        with open(path, "rb") as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                digest.update(block)
+    return digest.hexdigest()
+
+
+def artifact_fingerprint(base_dir="."):
+    """SHA-256 over the scaler, encoder and model files in base_dir."""
+    return sha256_files(os.path.join(base_dir, name) for name in SOURCE_FILES)
+
+
+def artifacts_version(base_dir="."):
+    """Version of the artifacts load_artifacts(base_dir) would return."""
+    if use_bundle(base_dir):
+        return read_manifest(base_dir)["version"]
+    return artifact_fingerprint(base_dir)
+
+
+def write_bundle(base_dir=".", out_dir=None):
+    """Pack the .pkl artifacts in base_dir into one bundle; returns its manifest.
+
+    The bundle version is the fingerprint of the source files, so it matches
+    what artifacts_version() reports for the unbundled .pkl files.
+    """
+    import sklearn
+
+    out_dir = out_dir or base_dir
+    artifacts = load_artifacts(base_dir, prefer_bundle=False)
+    payload = {
+        "format": BUNDLE_FORMAT,
+        "artifacts": dict(artifacts._asdict()),
+        "target_encoder": joblib.load(os.path.join(base_dir, TARGET_ENCODER_FILE)),
+    }
+    bundle_path = os.path.join(out_dir, BUNDLE_FILE)
+    tmp = bundle_path + ".tmp"
+    # Uncompressed, so load_bundle can memory-map the NumPy arrays
+    joblib.dump(payload, tmp)
+    manifest = {
+        "format": BUNDLE_FORMAT,
+        "version": artifact_fingerprint(base_dir),
+        "sha256": sha256_files([tmp]),
+        "created": datetime.datetime.now().isoformat(timespec="seconds"),
+        "sklearn": sklearn.__version__,
+        "model": type(artifacts.model).__name__,
+        "sources": list(SOURCE_FILES) + [TARGET_ENCODER_FILE],
+        "source_sha256": {
+            name: sha256_files([os.path.join(base_dir, name)]) for name in SOURCE_FILES + (TARGET_ENCODER_FILE,)
+        },
+    }
+    os.replace(tmp, bundle_path)
+    manifest_path = os.path.join(out_dir, BUNDLE_MANIFEST)
+    with open(manifest_path + ".tmp", "w") as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(manifest_path + ".tmp", manifest_path)
+    return manifest
+
+
+def read_manifest(base_dir="."):
+    with open(os.path.join(base_dir, BUNDLE_MANIFEST)) as f:
+        return json.load(f)
+
+
+def load_bundle(base_dir=".", mmap_mode="r", verify=True):
+    """Load the bundle in one call, checking it against its manifest checksum."""
+    manifest = read_manifest(base_dir)
+    if manifest.get("format") != BUNDLE_FORMAT:
+        raise ValueError(f"Unsupported bundle format {manifest.get('format')!r}")
+    bundle_path = os.path.join(base_dir, BUNDLE_FILE)
+    if verify and sha256_files([bundle_path]) != manifest["sha256"]:
+        raise ValueError(f"{BUNDLE_FILE} does not match the checksum in {BUNDLE_MANIFEST}")
+    payload = joblib.load(bundle_path, mmap_mode=mmap_mode)
+    return Bundle(ModelArtifacts(**payload["artifacts"]), payload["target_encoder"], manifest)
+
+
+def categorical_encoders(artifacts):
+    """Map each categorical input column to its fitted LabelEncoder."""
+    return {
+        "Gender": artifacts.le_gender,
+        "Physical Activity Level": artifacts.le_physical_acitivity,
+        "Weather": artifacts.le_weather,
+    }
+
+
+def status_label(prediction):
+    return "Good" if prediction == 0 else "Poor"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Package or inspect the model artifacts.")
+    parser.add_argument("command", choices=["bundle", "info"], help="bundle: write the single-file bundle; info: show its manifest")
+    parser.add_argument("--artifacts", default=".", help="directory holding the .pkl artifacts")
+    parser.add_argument("--out", help="output directory for the bundle (default: --artifacts)")
+    args = parser.parse_args(argv)
+
+    if args.command == "bundle":
+        manifest = write_bundle(args.artifacts, args.out)
+    else:
+        manifest = read_manifest(args.artifacts)
+    print(json.dumps(manifest, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,187 @@
+"""Headless batch scoring for files shaped like Daily_Water_Intake.csv.
+
+Usage:
+    python batch_score.py input.csv scored.csv
+    python batch_score.py input.csv scored.parquet --chunksize 200000
+    python batch_score.py input.csv scored.csv --explain
+    python batch_score.py input.csv scored.csv --drift drift_report.json
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+from artifacts import load_artifacts, status_label
+from explain import explainer_for
+from inference import compile_model
+from preprocessing import Preprocessor, to_float
+
+DEFAULT_CHUNKSIZE = 100_000
+
+
+def score_chunk(chunk, preprocessor, engine, explainer=None):
+    """Append Prediction / Confidence / Status columns to one chunk of raw rows.
+
+    Rows with missing values, categories unknown to the encoders or numeric
+    inputs that are not finite numbers are kept and marked "Invalid" instead
+    of failing the whole batch. With an
+    explainer, one "<feature> contribution" column per model feature gives
+    the points of confidence in the predicted class credited to it.
+    """
+    out = chunk.copy()
+    n = len(chunk)
+    prediction = np.full(n, -1, dtype=np.int64)
+    confidence = np.full(n, np.nan)
+    status = np.full(n, "Invalid", dtype=object)
+    if explainer is not None:
+        contributions = np.full((n, preprocessor.n_features), np.nan)
+
+    mask = preprocessor.valid_mask(chunk)
+    if mask.any():
+        features = preprocessor.transform(chunk[mask])
+        pred, conf = engine.predict(features)
+        prediction[mask] = pred
+        confidence[mask] = np.round(conf * 100, 1)
+        status[mask] = [status_label(p) for p in pred]
+        if explainer is not None:
+            contributions[mask] = np.round(explainer.toward(explainer.explain(features), pred) * 100, 2)
+
+    out["Prediction"] = prediction
+    out["Confidence"] = confidence
+    out["Status"] = status
+    if explainer is not None:
+        for j, name in enumerate(preprocessor.feature_names):
+            out[f"{name} contribution"] = contributions[:, j]
+    return out
+
+
+class _CsvSink:
+    def __init__(self, path):
+        self.path = path
+        self.header = True
+
+    def write(self, df):
+        df.to_csv(self.path, mode="w" if self.header else "a", header=self.header, index=False)
+        self.header = False
+
+    def close(self):
+        pass
+
+
+class _ParquetSink:
+    """Parquet output with one declared schema for every chunk.
+
+    Types come from each column's role, not from what the first chunk
+    happened to contain: numeric features, Confidence and contributions are
+    float64 (a value that is not a number is null; its row is Invalid),
+    Prediction is int64, and everything else is a string.
+    """
+
+    def __init__(self, path, preprocessor):
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError as e:
+            raise SystemExit("Parquet output needs pyarrow: pip install pyarrow") from e
+        self.pa = pa
+        self.pq = pq
+        self.path = path
+        self.types = {"Prediction": pa.int64(), "Confidence": pa.float64()}
+        for _, col, _, _ in preprocessor.numeric:
+            self.types[col] = pa.float64()
+        for name in preprocessor.feature_names:
+            self.types[f"{name} contribution"] = pa.float64()
+        self.writer = None
+
+    def _array(self, values, type_):
+        if self.pa.types.is_string(type_):
+            values = values.astype("string")
+        elif self.pa.types.is_floating(type_):
+            values = to_float(values)
+        return self.pa.array(values, type=type_, from_pandas=True)
+
+    def write(self, df):
+        if self.writer is None:
+            schema = self.pa.schema([(col, self.types.get(col, self.pa.string())) for col in df.columns])
+            self.writer = self.pq.ParquetWriter(self.path, schema)
+        schema = self.writer.schema
+        arrays = [self._array(df[field.name], field.type) for field in schema]
+        self.writer.write_table(self.pa.Table.from_arrays(arrays, schema=schema))
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.close()
+
+
+def open_sink(path, preprocessor):
+    if os.path.splitext(path)[1].lower() in (".parquet", ".pq"):
+        return _ParquetSink(path, preprocessor)
+    return _CsvSink(path)
+
+
+def score_file(input_path, output_path, artifacts, chunksize=DEFAULT_CHUNKSIZE, log=None, explain=False, monitor=None):
+    """Stream input_path through the model chunk by chunk; return (rows, seconds).
+
+    A drift.DriftMonitor, if given, sees every input row and the predictions.
+    """
+    preprocessor = Preprocessor(artifacts)
+    engine = compile_model(artifacts.model)
+    explainer = explainer_for(engine) if explain else None
+    if explain and explainer is None:
+        raise ValueError(f"Explanations need a decision tree, got {type(artifacts.model).__name__}")
+    sink = open_sink(output_path, preprocessor)
+    rows = 0
+    start = time.perf_counter()
+    try:
+        for chunk in pd.read_csv(input_path, chunksize=chunksize):
+            scored = score_chunk(chunk, preprocessor, engine, explainer)
+            if monitor is not None:
+                monitor.observe_frame(chunk, scored["Prediction"].to_numpy())
+            sink.write(scored)
+            rows += len(chunk)
+            if log:
+                elapsed = time.perf_counter() - start
+                log(f"{rows:,} rows scored ({rows / elapsed:,.0f} rows/sec)")
+    finally:
+        sink.close()
+    return rows, time.perf_counter() - start
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Score a CSV of hydration inputs in fixed-size chunks.")
+    parser.add_argument("input", help="CSV with the Daily_Water_Intake.csv feature columns")
+    parser.add_argument("output", help="destination .csv or .parquet file")
+    parser.add_argument("--chunksize", type=int, default=DEFAULT_CHUNKSIZE, help="rows per chunk (default: %(default)s)")
+    parser.add_argument("--artifacts", default=".", help="directory holding the .pkl artifacts")
+    parser.add_argument("--progress", action="store_true", help="report throughput after every chunk")
+    parser.add_argument("--explain", action="store_true", help="add per-feature decision-path contributions")
+    parser.add_argument("--drift", metavar="JSON", help="write an input-drift report against the training data here")
+    parser.add_argument("--data", default="Daily_Water_Intake.csv", help="training data for the drift reference")
+    args = parser.parse_args(argv)
+
+    artifacts = load_artifacts(args.artifacts)
+    monitor = None
+    if args.drift:
+        from drift import DriftMonitor, load_or_build
+
+        # One window over the whole file: the report describes every scored row
+        monitor = DriftMonitor(load_or_build(Preprocessor(artifacts), args.data, args.artifacts), window=None)
+    log = (lambda msg: print(msg, file=sys.stderr)) if args.progress else None
+    rows, seconds = score_file(args.input, args.output, artifacts, args.chunksize, log=log, explain=args.explain,
+                               monitor=monitor)
+    rate = rows / seconds if seconds else float("inf")
+    print(f"Scored {rows:,} rows in {seconds:.2f}s ({rate:,.0f} rows/sec) -> {args.output}", file=sys.stderr)
+    if monitor is not None:
+        report = monitor.report()
+        with open(args.drift, "w") as f:
+            json.dump(report, f, indent=2)
+        drifted = [name for name, feature in report["features"].items() if feature["drift"] != "stable"]
+        print(f"Drift report -> {args.drift}; drifted features: {', '.join(drifted) or 'none'}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
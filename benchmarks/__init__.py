@@ -0,0 +1,9 @@
+"""Benchmark suite for the model pipeline and the Streamlit app.
+
+Run from the repository root:
+    python -m benchmarks.micro                  # preprocessing, predict, figures, PDF
+    python -m benchmarks.interleaved            # many AppTest sessions, submitting in turn
+    python -m benchmarks.contention             # threads on the shared per-process objects
+    python -m benchmarks.micro --compare        # against benchmarks/baselines/micro.json
+    python -m benchmarks.interleaved --save     # record a new baseline
+"""
@@ -0,0 +1,159 @@
+"""Timing, environment and JSON baseline helpers shared by the benchmarks."""
+import datetime
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+
+BASELINE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baselines")
+DEFAULT_TOLERANCE = 0.4  # relative slowdown reported as a regression; single runs vary ~20-30%
+
+
+def measure(fn, repeat=5, min_time=0.05):
+    """Best seconds per call over repeat rounds, each at least min_time long (like timeit)."""
+    fn()
+    loops = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(loops):
+            fn()
+        if time.perf_counter() - start >= min_time / 5 or loops >= 1 << 20:
+            break
+        loops *= 2
+    loops = max(1, int(loops * min_time / max(time.perf_counter() - start, 1e-9)))
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(loops):
+            fn()
+        best = min(best, (time.perf_counter() - start) / loops)
+    return best
+
+
+def metric(value, unit, better="lower"):
+    """better is "lower", "higher" or None for a reported-only metric that --compare never fails on."""
+    return {"value": value, "unit": unit, "better": better}
+
+
+def best_of(runs):
+    """Combine repeated runs like measure does its rounds: each metric's best value.
+
+    Noise on a shared CPU only ever makes a run slower, so the best of a few
+    runs is far steadier than any one. Reported-only metrics keep the median;
+    everything but the metrics comes from the first run.
+    """
+    combined = dict(runs[0])
+    combined["metrics"] = {}
+    for name, m in runs[0]["metrics"].items():
+        values = [run["metrics"][name]["value"] for run in runs]
+        pick = {"lower": min, "higher": max}.get(m["better"], statistics.median)
+        combined["metrics"][name] = dict(m, value=pick(values))
+    combined["runs"] = len(runs)
+    return combined
+
+
+def _version(module):
+    try:
+        return __import__(module).__version__
+    except Exception:
+        return None
+
+
+def environment():
+    """What the numbers depend on: code and model versions, libraries, machine."""
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                                check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    try:
+        from artifacts import artifacts_version
+
+        model = artifacts_version()[:12]
+    except Exception:
+        model = None
+    return {
+        "date": datetime.datetime.now().isoformat(timespec="seconds"),
+        "commit": commit,
+        "model_version": model,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "libraries": {name: _version(name) for name in ("numpy", "pandas", "sklearn", "streamlit", "plotly")},
+    }
+
+
+def baseline_path(name):
+    return os.path.join(BASELINE_DIR, f"{name}.json")
+
+
+def save(results, path):
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path + ".tmp", "w") as f:
+        json.dump(results, f, indent=2)
+    os.replace(path + ".tmp", path)
+
+
+def load(path):
+    with open(path) as f:
+        return json.load(f)
+
+
+def compare(results, baseline, tolerance=DEFAULT_TOLERANCE):
+    """(rows, regressions): rows are (name, baseline, current, unit, relative change, regressed)."""
+    rows = []
+    for name, current in results["metrics"].items():
+        old = baseline["metrics"].get(name)
+        if old is None:
+            continue
+        if not old["value"]:  # e.g. an error count: any rise from zero is a regression
+            change = float("inf") if current["value"] else 0.0
+        else:
+            change = current["value"] / old["value"] - 1
+        worse = change if current["better"] == "lower" else -change
+        regressed = current["better"] is not None and worse > tolerance
+        rows.append((name, old["value"], current["value"], current["unit"], change, regressed))
+    return rows, [row[0] for row in rows if row[5]]
+
+
+def print_metrics(results):
+    for name, m in results["metrics"].items():
+        print(f"  {name:<40} {m['value']:14,.2f} {m['unit']}")
+
+
+def report(results, args, name):
+    """Shared --save / --out / --compare handling; exits 1 on a regression."""
+    print_metrics(results)
+    if args.out:
+        save(results, args.out)
+    if args.compare is not None:
+        path = args.compare or baseline_path(name)
+        baseline = load(path)
+        rows, regressions = compare(results, baseline, args.tolerance)
+        print(f"\nvs {path} (commit {baseline['environment'].get('commit')}, "
+              f"model {baseline['environment'].get('model_version')}):")
+        if baseline.get("config") != results.get("config"):
+            print(f"  note: baseline was run with {baseline.get('config')}")
+        for metric_name, old, new, unit, change, regressed in rows:
+            flag = "  REGRESSION" if regressed else ""
+            print(f"  {metric_name:<40} {old:12,.2f} -> {new:12,.2f} {unit:<10} {change:+7.1%}{flag}")
+        if regressions:
+            print(f"{len(regressions)} regression(s) beyond {args.tolerance:.0%}")
+            sys.exit(1)
+    if args.save:
+        save(results, baseline_path(name))
+        print(f"Baseline written to {baseline_path(name)}")
+
+
+def add_baseline_arguments(parser, tolerance=DEFAULT_TOLERANCE, runs=1):
+    parser.add_argument("--runs", type=int, default=runs,
+                        help="repeat the whole benchmark and keep each metric's best (default: %(default)s)")
+    parser.add_argument("--save", action="store_true", help="write the results as the stored baseline")
+    parser.add_argument("--out", help="also write the results to this JSON file")
+    parser.add_argument("--compare", nargs="?", const="", metavar="JSON",
+                        help="compare with a baseline (default: the stored one); exit 1 on a regression")
+    parser.add_argument("--tolerance", type=float, default=tolerance,
+                        help="relative slowdown counted as a regression (default: %(default)s)")
@@ -0,0 +1,176 @@
+"""Contention on the objects app.py shares between the sessions of a process.
+
+Every session of one `streamlit run` process goes through the same
+cache_resource objects: the telemetry histograms and the drift monitor
+(each behind a lock), the history store's write queue and connection pool,
+the report memo and the model engine. Here T threads call each of them, and
+then a submit's worth of all of them, in a tight loop, the way concurrent
+reruns would. The results are calls/sec and p99 call latency at each thread
+count, best of ROUNDS rounds like benchmarks.common.measure. With the GIL,
+throughput can at best hold steady as threads are added; a drop or a growing
+p99 is contention. The history store also reports how long its writer takes
+to drain what the threads queued. --compare gates on throughput only: p99s
+of microsecond calls swing with the GIL's 5ms switch interval, and drain
+times with whatever the writer had left, far beyond any useful tolerance,
+so both are reported but never fail the comparison.
+
+    python -m benchmarks.contention --threads 1,4,16
+    python -m benchmarks.contention --compare
+"""
+import argparse
+import datetime
+import os
+import shutil
+import tempfile
+import threading
+import time
+import warnings
+
+from benchmarks.common import add_baseline_arguments, environment, best_of, metric, report
+
+DEFAULT_THREADS = (1, 4, 16)
+DEFAULT_DURATION = 0.5  # seconds per round
+ROUNDS = 3
+
+
+def _hammer(fn, threads, duration):
+    """Run fn from `threads` threads for duration seconds; (calls/sec, sorted latencies)."""
+    barrier = threading.Barrier(threads + 1)
+    stop = threading.Event()
+    latencies = [[] for _ in range(threads)]
+
+    def loop(out, i):
+        barrier.wait()
+        while not stop.is_set():
+            start = time.perf_counter()
+            fn(i)
+            out.append(time.perf_counter() - start)
+
+    workers = [threading.Thread(target=loop, args=(latencies[i], i), daemon=True) for i in range(threads)]
+    for t in workers:
+        t.start()
+    barrier.wait()
+    start = time.perf_counter()
+    time.sleep(duration)
+    stop.set()
+    for t in workers:
+        t.join()
+    elapsed = time.perf_counter() - start
+    merged = sorted(t for part in latencies for t in part)
+    return len(merged) / elapsed, merged
+
+
+def _components(data_path, artifacts_dir, db_path):
+    from artifacts import FEATURE_COLUMNS, load_artifacts
+    from drift import DriftMonitor, load_or_build as load_drift_reference
+    from history_store import HistoryStore
+    from lookup_table import load_engine
+    from preprocessing import Preprocessor
+    from reports import report_pdf
+    from telemetry import Telemetry
+
+    import numpy as np
+    import pandas as pd
+
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")  # pickles from another sklearn release
+        artifacts = load_artifacts(artifacts_dir)
+    preprocessor = Preprocessor(artifacts)
+    df = pd.read_csv(data_path)
+    records = df[preprocessor.valid_mask(df)][FEATURE_COLUMNS].head(1000).to_dict("records")
+    rows = [preprocessor.transform_one(record, np.empty(preprocessor.n_features)) for record in records]
+    engine = load_engine(artifacts, artifacts_dir)
+    telemetry = Telemetry(enabled=True)
+    monitor = DriftMonitor(load_drift_reference(preprocessor, data_path, artifacts_dir))
+    store = HistoryStore(db_path)
+    date = datetime.date(2026, 1, 1)
+    counters = {}
+
+    def pick(items, i):
+        n = counters[i] = counters.get(i, 0) + 1
+        return items[(n + 97 * i) % len(items)]
+
+    def predict(i):
+        return engine.predict_one(pick(rows, i))
+
+    def span(i):
+        with telemetry.span("stage"):
+            pass
+
+    def drift(i):
+        monitor.observe(pick(records, i), 0)
+
+    def history(i):
+        record = pick(records, i)
+        store.record(f"user{i}", time.time(), record["Age"], record["Weight (kg)"],
+                     record["Daily Water Intake (liters)"], record["Physical Activity Level"], "Good", 90.0)
+
+    def pdf(i):
+        report_pdf(i % 2, 87.5, 3, date)
+
+    def submit(i):
+        with telemetry.span("predict"):
+            predict(i)
+        drift(i)
+        history(i)
+        store.user_stats(f"user{i}")
+        pdf(i)
+
+    components = {"predict": predict, "telemetry_span": span, "drift_observe": drift,
+                  "history_record": history, "report_memo": pdf, "submit": submit}
+    return components, store
+
+
+def run(threads=DEFAULT_THREADS, duration=DEFAULT_DURATION, data_path="Daily_Water_Intake.csv",
+        artifacts_dir=".", rounds=ROUNDS):
+    tmp = tempfile.mkdtemp(prefix="hydration_contention_")
+    components, store = _components(data_path, artifacts_dir, os.path.join(tmp, "history.db"))
+    metrics = {}
+    try:
+        for name, fn in components.items():
+            for n in threads:
+                rates, p99s, drains = [], [], []
+                for _ in range(rounds):
+                    rate, latencies = _hammer(fn, n, duration)
+                    rates.append(rate)
+                    p99s.append(latencies[int(0.99 * (len(latencies) - 1))])
+                    # Drain after every round, so no round starts behind a backlog
+                    start = time.perf_counter()
+                    store.flush()
+                    drains.append(time.perf_counter() - start)
+                key = f"contention/{name}"
+                metrics[f"{key}/calls_per_sec_{n}t"] = metric(max(rates), "calls/s", "higher")
+                metrics[f"{key}/p99_us_{n}t"] = metric(min(p99s) * 1e6, "us", None)
+                if name in ("history_record", "submit"):
+                    metrics[f"{key}/history_drain_ms_{n}t"] = metric(min(drains) * 1000, "ms", None)
+    finally:
+        store.close()
+        shutil.rmtree(tmp, ignore_errors=True)
+    return {
+        "environment": environment(),
+        "config": {"threads": list(threads), "duration": duration, "rounds": rounds},
+        "metrics": metrics,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Thread contention on the app's shared per-process objects.")
+    parser.add_argument("--threads", default=",".join(map(str, DEFAULT_THREADS)),
+                        help="comma-separated thread counts (default: %(default)s)")
+    parser.add_argument("--duration", type=float, default=DEFAULT_DURATION,
+                        help="seconds per round (default: %(default)s)")
+    parser.add_argument("--rounds", type=int, default=ROUNDS,
+                        help="rounds per component and thread count; the best is kept (default: %(default)s)")
+    parser.add_argument("--data", default="Daily_Water_Intake.csv")
+    parser.add_argument("--artifacts", default=".")
+    add_baseline_arguments(parser, tolerance=0.5)
+    args = parser.parse_args(argv)
+    threads = tuple(int(n) for n in args.threads.split(","))
+    results = best_of([run(threads, args.duration, args.data, args.artifacts, args.rounds) for _ in range(args.runs)])
+    print(f"threads {', '.join(map(str, threads))}; best of {args.rounds} x {args.duration:g}s, "
+          f"commit {results['environment']['commit']}")
+    report(results, args, "contention")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+"""Interleaved-session load test of the Streamlit app (AppTest).
+
+Each process opens --sessions AppTest sessions of app.py. They share the
+process's cache_resource objects (model, explainer, drift monitor...) the
+way sessions of one `streamlit run` server do. The process then submits the
+form --submits times per session, round robin, with varied inputs. AppTest
+is not thread-safe, so within a process the reruns run one after another:
+this measures per-rerun cost and memory per open session, not lock
+contention (see benchmarks.contention for that). --processes runs several
+such workers in parallel, like a multi-worker deployment.
+
+Reported: reruns/sec summed over processes, p50/p99 submit rerun latency,
+resident memory added per open session, and the count of reruns that raised.
+
+    python -m benchmarks.interleaved --sessions 20 --submits 5
+    python -m benchmarks.interleaved --processes 4 --compare
+"""
+import argparse
+import gc
+import logging
+import multiprocessing
+import os
+import random
+import time
+import warnings
+
+from benchmarks.common import add_baseline_arguments, environment, best_of, metric, report
+
+APP = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "app.py")
+SUBMIT_LABEL = "PREDICT"
+TIMEOUT = 60
+
+
+def rss_mb():
+    """Resident set size of this process in MB (Linux /proc; 0 elsewhere)."""
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return 0.0
+
+
+def _submit(at, rng):
+    at.number_input[0].set_value(rng.randint(18, 70))
+    at.number_input[1].set_value(rng.choice([1.0, 1.5, 2.0, 2.5, 3.0, 3.5, 4.0]))
+    at.slider[0].set_value(float(rng.randint(45, 110)))
+    for box in at.selectbox:
+        box.select(rng.choice(box.options))
+    next(b for b in at.button if SUBMIT_LABEL in b.label).click().run()
+
+
+def _worker(index, sessions, submits, seed, barrier, queue):
+    warnings.simplefilter("ignore")
+    logging.disable(logging.WARNING)
+    from streamlit.testing.v1 import AppTest
+
+    rng = random.Random(seed + index)
+    # First run pays for imports and cache_resource loads; keep it out of the numbers
+    AppTest.from_file(APP, default_timeout=TIMEOUT).run()
+    gc.collect()
+    rss_before = rss_mb()
+    apps = [AppTest.from_file(APP, default_timeout=TIMEOUT).run() for _ in range(sessions)]
+    barrier.wait()
+    latencies, errors = [], 0
+    start = time.perf_counter()
+    for _ in range(submits):
+        for at in apps:
+            t = time.perf_counter()
+            _submit(at, rng)
+            latencies.append(time.perf_counter() - t)
+            errors += bool(at.exception)
+    elapsed = time.perf_counter() - start
+    gc.collect()
+    queue.put({
+        "reruns": len(latencies),
+        "elapsed": elapsed,
+        "latencies": latencies,
+        "errors": errors,
+        "rss_per_session_mb": (rss_mb() - rss_before) / sessions,
+    })
+
+
+def run(sessions=20, submits=5, processes=1, seed=0):
+    from loadgen import percentile
+
+    ctx = multiprocessing.get_context("spawn")
+    barrier, queue = ctx.Barrier(processes), ctx.Queue()
+    workers = [
+        ctx.Process(target=_worker, args=(i, sessions, submits, seed, barrier, queue))
+        for i in range(processes)
+    ]
+    for p in workers:
+        p.start()
+    parts = [queue.get() for _ in workers]
+    for p in workers:
+        p.join()
+    latencies = sorted(t for part in parts for t in part["latencies"])
+    return {
+        "environment": environment(),
+        "config": {"sessions": sessions, "submits": submits, "processes": processes, "seed": seed},
+        "metrics": {
+            "interleaved/reruns_per_sec": metric(sum(p["reruns"] / p["elapsed"] for p in parts), "reruns/s", "higher"),
+            "interleaved/rerun_p50_ms": metric(percentile(latencies, 50) * 1000, "ms"),
+            "interleaved/rerun_p99_ms": metric(percentile(latencies, 99) * 1000, "ms"),
+            "interleaved/memory_per_session_mb": metric(sum(p["rss_per_session_mb"] for p in parts) / processes, "MB"),
+            "interleaved/rerun_errors": metric(sum(p["errors"] for p in parts), "reruns"),
+        },
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Interleaved-session load test of app.py via AppTest.")
+    parser.add_argument("--sessions", type=int, default=20, help="open sessions per process")
+    parser.add_argument("--submits", type=int, default=5, help="form submits per session")
+    parser.add_argument("--processes", type=int, default=1, help="worker processes run in parallel")
+    parser.add_argument("--seed", type=int, default=0)
+    add_baseline_arguments(parser, tolerance=0.5)
+    args = parser.parse_args(argv)
+    os.environ.pop("HYDRATION_DB", None)  # AppTest sessions are not signed in; keep the store out
+    results = best_of([run(args.sessions, args.submits, args.processes, args.seed) for _ in range(args.runs)])
+    config = results["config"]
+    print(f"{config['processes']} x {config['sessions']} sessions, {config['submits']} submits each, "
+          f"commit {results['environment']['commit']}")
+    report(results, args, "interleaved")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+"""Microbenchmarks for the per-submit pipeline: preprocessing, predict, figures, PDF.
+
+Each metric is the best time per call over a few timed rounds. The sklearn
+rows time the DataFrame -> predict / predict_proba path app.py used before
+the compiled engine, for reference.
+
+    python -m benchmarks.micro
+    python -m benchmarks.micro --compare
+"""
+import argparse
+import datetime
+import warnings
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.common import add_baseline_arguments, environment, measure, best_of, metric, report
+
+US = "us/call"
+MS = "ms/call"
+
+
+def run(data_path="Daily_Water_Intake.csv", artifacts_dir="."):
+    from artifacts import FEATURE_COLUMNS, load_artifacts
+    from cohort import load_or_build as load_cohort_index
+    from drift import DriftMonitor, load_or_build as load_drift_reference
+    from explain import TreeExplainer
+    from inference import compile_model
+    from lookup_table import load_engine
+    from preprocessing import Preprocessor, encode_frame
+    from rendering import SessionFigures, importance_figure
+    from reports import render_pdf, report_pdf
+    from whatif import IntakeSolver
+
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")  # pickles from another sklearn release
+        artifacts = load_artifacts(artifacts_dir)
+    df = pd.read_csv(data_path)
+    preprocessor = Preprocessor(artifacts)
+    df = df[preprocessor.valid_mask(df)]
+    records = df[FEATURE_COLUMNS].to_dict("records")[:1000]
+    X = preprocessor.transform(df)
+    rows = list(X[:1000])
+    engine = load_engine(artifacts, artifacts_dir, use_table=True)
+    tree = compile_model(artifacts.model)
+    one_frame = pd.DataFrame(X[:1], columns=artifacts.model.feature_names_in_)
+    explainer = TreeExplainer(engine)
+    solver = IntakeSolver(engine, preprocessor)
+    cohorts = load_cohort_index(preprocessor.categories, data_path, artifacts_dir)
+    monitor = DriftMonitor(load_drift_reference(preprocessor, data_path, artifacts_dir))
+    figures = SessionFigures()
+    contributions = explainer.toward(explainer.explain_one(rows[0]), 0)
+    out = np.empty(preprocessor.n_features)
+    date = datetime.date(2026, 1, 1)
+
+    def cycle(items):
+        state = [0]
+
+        def take():
+            state[0] = (state[0] + 1) % len(items)
+            return items[state[0]]
+        return take
+
+    record, row = cycle(records), cycle(rows)
+    counter = cycle(list(range(1000)))
+    timings = {
+        # Preprocessing
+        "preprocess/transform_one": (lambda: preprocessor.transform_one(record(), out), US),
+        "preprocess/encode_frame_one_row": (lambda: encode_frame(df.iloc[:1], artifacts), US),
+        "preprocess/transform_batch": (lambda: preprocessor.transform(df), MS),
+        # Predict / predict_proba
+        "predict/table_predict_one": (lambda: engine.predict_one(row()), US),
+        "predict/tree_predict_one": (lambda: tree.predict_one(row()), US),
+        "predict/table_predict_batch": (lambda: engine.predict(X), MS),
+        "predict/sklearn_predict_one_row": (lambda: artifacts.model.predict(one_frame), US),
+        "predict/sklearn_predict_proba_one_row": (lambda: artifacts.model.predict_proba(one_frame), US),
+        # Rest of the submit path
+        "explain/explain_one": (lambda: explainer.explain_one(row()), US),
+        "whatif/solve_one": (lambda: solver.solve_one(row(), from_current=True), US),
+        "cohort/compare": (lambda: cohorts.compare("Male", "Moderate", "Hot", 35, 2.5, 70.0), US),
+        "drift/observe": (lambda: monitor.observe(record(), 0), US),
+        # Figures
+        "figures/session_update": (lambda: figures.update(counter() % 2 == 0, 1.5 + counter() % 4, 2.45), US),
+        "figures/explanation_update": (
+            lambda: figures.explanation(preprocessor.feature_names, contributions, "Good", True), US),
+        "figures/importance_build": (
+            lambda: importance_figure(engine.feature_importances_, preprocessor.feature_names, True), MS),
+        # PDF
+        "pdf/fpdf_render": (lambda: render_pdf(counter() % 2, 87.5, counter(), date), US),
+        "pdf/memoized": (lambda: report_pdf(1, 87.5, 3, date), US),
+    }
+    metrics = {}
+    for name, (fn, unit) in timings.items():
+        seconds = measure(fn)
+        metrics[name] = metric(seconds * (1e6 if unit == US else 1e3), unit)
+    return {"environment": environment(), "rows": len(df), "metrics": metrics}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Microbenchmarks for preprocessing, predict, figures and PDF.")
+    parser.add_argument("--data", default="Daily_Water_Intake.csv")
+    parser.add_argument("--artifacts", default=".")
+    # One run swings by up to ~50% on a shared single-CPU host; the best of
+    # three stays well inside the tolerance
+    add_baseline_arguments(parser, runs=3)
+    args = parser.parse_args(argv)
+    results = best_of([run(args.data, args.artifacts) for _ in range(args.runs)])
+    print(f"{results['rows']:,} rows, commit {results['environment']['commit']}, "
+          f"model {results['environment']['model_version']}")
+    report(results, args, "micro")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,295 @@
+"""Where a user's intake and weight fall among similar people in the data.
+
+A cohort is a gender, activity level, weather and age band. The bands are
+the notebook's pd.cut bins [0, 18, 30, 45, 60, 100], closed on the right.
+Every cohort's intakes and weights are kept sorted in one concatenated
+array per column, with an offsets array marking where each cohort starts. A
+lookup then costs a dict lookup per category and one searchsorted per column
+over that cohort's slice.
+
+New labeled rows go into small sorted per-cohort buffers that lookups merge
+on the fly. The buffers are folded into the main arrays once they grow past
+COMPACT_AFTER rows, and before every save.
+
+The index is saved next to the artifacts and tagged with the source data's
+SHA-256, so it is rebuilt when the data file changes:
+    python cohort.py                      # build or refresh the index
+    python cohort.py --update new_rows.csv
+    python cohort.py --check
+"""
+import argparse
+import bisect
+import os
+import sys
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+
+from artifacts import TARGET_COLUMN
+from datasource import data_version, read_data
+
+COHORT_FILE = "cohort_index.npz"
+COHORT_FORMAT = 1
+AGE_BINS = [0, 18, 30, 45, 60, 100]
+AGE_LABELS = ["<18", "18-30", "31-45", "46-60", "60+"]
+COHORT_COLUMNS = ["Gender", "Physical Activity Level", "Weather"]
+INTAKE_COLUMN = "Daily Water Intake (liters)"
+WEIGHT_COLUMN = "Weight (kg)"
+GOOD_LABEL = "Good"
+DATA_COLUMNS = COHORT_COLUMNS + ["Age", INTAKE_COLUMN, WEIGHT_COLUMN, TARGET_COLUMN]
+COMPACT_AFTER = 4096
+
+# Percentiles are mid-rank: ties count half, so an exact median scores 50
+Comparison = namedtuple("Comparison", ["size", "intake_percentile", "weight_percentile", "good_rate", "age_band"])
+
+
+def age_band(age):
+    """Index into AGE_LABELS; ages outside the bins go to the nearest band."""
+    band = np.searchsorted(AGE_BINS, age, side="left") - 1
+    return np.clip(band, 0, len(AGE_LABELS) - 1)
+
+
+def _age_band_one(age):
+    return min(max(bisect.bisect_left(AGE_BINS, age) - 1, 0), len(AGE_LABELS) - 1)
+
+
+class CohortIndex:
+    def __init__(self, categories, offsets, intake, weight, good, version=""):
+        self.categories = {col: list(categories[col]) for col in COHORT_COLUMNS}
+        self.offsets = offsets
+        self.intake = intake
+        self.weight = weight
+        self.good = good
+        self.version = version
+        self._codes = [{value: i for i, value in enumerate(self.categories[col])} for col in COHORT_COLUMNS]
+        self._shape = tuple(len(self.categories[col]) for col in COHORT_COLUMNS) + (len(AGE_LABELS),)
+        self.n_cohorts = int(np.prod(self._shape))
+        self._pending = {}  # cohort -> (sorted intakes, sorted weights)
+        self._pending_good = np.zeros(self.n_cohorts, dtype=np.int64)
+        self.n_pending = 0
+
+    # ======= BUILD / PERSIST =======
+    @classmethod
+    def build(cls, df, categories, version=""):
+        """Index labeled rows shaped like Daily_Water_Intake.csv; invalid rows are skipped."""
+        index = cls(categories, np.zeros(1, dtype=np.int64), np.empty(0), np.empty(0), np.empty(0, dtype=np.int64),
+                    version)
+        cohort, valid = index.cohorts(df)
+        index._rebuild(
+            cohort[valid],
+            np.asarray(df[INTAKE_COLUMN], dtype=np.float64)[valid],
+            np.asarray(df[WEIGHT_COLUMN], dtype=np.float64)[valid],
+            (np.asarray(df[TARGET_COLUMN]) == GOOD_LABEL)[valid],
+        )
+        return index
+
+    def _rebuild(self, cohort, intake, weight, good):
+        counts = np.bincount(cohort, minlength=self.n_cohorts)
+        self.offsets = np.concatenate([[0], np.cumsum(counts)]).astype(np.int64)
+        self.intake = intake[np.lexsort((intake, cohort))]
+        self.weight = weight[np.lexsort((weight, cohort))]
+        self.good = np.bincount(cohort, weights=good, minlength=self.n_cohorts).astype(np.int64)
+
+    def save(self, path):
+        self.compact()
+        arrays = {
+            "format": np.array(COHORT_FORMAT),
+            "version": np.array(self.version),
+            "offsets": self.offsets,
+            "intake": self.intake,
+            "weight": self.weight,
+            "good": self.good,
+        }
+        for j, col in enumerate(COHORT_COLUMNS):
+            arrays[f"categories_{j}"] = np.asarray(self.categories[col])
+        tmp = path + ".tmp.npz"
+        np.savez(tmp, **arrays)
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path, allow_pickle=False) as data:
+            if int(data["format"]) != COHORT_FORMAT:
+                raise ValueError(f"Unsupported cohort index format in {path}")
+            categories = {col: data[f"categories_{j}"].tolist() for j, col in enumerate(COHORT_COLUMNS)}
+            return cls(categories, data["offsets"], data["intake"], data["weight"], data["good"],
+                       str(data["version"]))
+
+    # ======= COHORTS =======
+    def cohorts(self, df):
+        """(cohort id per row, mask of rows with known categories and no missing values)."""
+        cohort = np.zeros(len(df), dtype=np.int64)
+        valid = df[COHORT_COLUMNS + ["Age", INTAKE_COLUMN, WEIGHT_COLUMN]].notna().all(axis=1).to_numpy()
+        for col, size in zip(COHORT_COLUMNS, self._shape):
+            codes = pd.Categorical(df[col], categories=self.categories[col]).codes
+            valid = valid & (codes >= 0)
+            cohort = cohort * size + codes
+        ages = np.asarray(df["Age"], dtype=np.float64)
+        cohort = cohort * len(AGE_LABELS) + age_band(np.nan_to_num(ages))
+        return np.where(valid, cohort, 0), valid
+
+    def cohort_of(self, gender, activity, weather, age):
+        """Cohort id for one profile; raises ValueError for unknown categories."""
+        cohort = 0
+        for codes, col, size, value in zip(self._codes, COHORT_COLUMNS, self._shape, (gender, activity, weather)):
+            try:
+                cohort = cohort * size + codes[value]
+            except KeyError:
+                raise ValueError(f"Unknown {col}: {value!r}") from None
+        return cohort * len(AGE_LABELS) + _age_band_one(age)
+
+    # ======= LOOKUP =======
+    def _rank(self, column, pending_column, cohort, value):
+        start, end = self.offsets[cohort], self.offsets[cohort + 1]
+        sorted_values = column[start:end]
+        below = int(np.searchsorted(sorted_values, value, side="left"))
+        at_or_below = int(np.searchsorted(sorted_values, value, side="right"))
+        pending = self._pending.get(cohort)
+        if pending is not None:
+            extra = pending[pending_column]
+            below += bisect.bisect_left(extra, value)
+            at_or_below += bisect.bisect_right(extra, value)
+        return (below + at_or_below) / 2
+
+    def size(self, cohort):
+        pending = self._pending.get(cohort)
+        return int(self.offsets[cohort + 1] - self.offsets[cohort]) + (len(pending[0]) if pending else 0)
+
+    def compare(self, gender, activity, weather, age, intake, weight):
+        """Comparison for one profile; percentiles and good_rate are None for an empty cohort."""
+        cohort = self.cohort_of(gender, activity, weather, age)
+        n = self.size(cohort)
+        band = AGE_LABELS[_age_band_one(age)]
+        if n == 0:
+            return Comparison(0, None, None, None, band)
+        good = int(self.good[cohort] + self._pending_good[cohort])
+        return Comparison(
+            n,
+            100.0 * self._rank(self.intake, 0, cohort, intake) / n,
+            100.0 * self._rank(self.weight, 1, cohort, weight) / n,
+            100.0 * good / n,
+            band,
+        )
+
+    # ======= INCREMENTAL UPDATES =======
+    def update(self, df):
+        """Add labeled rows; returns how many were valid and added."""
+        cohort, valid = self.cohorts(df)
+        intakes = np.asarray(df[INTAKE_COLUMN], dtype=np.float64)
+        weights = np.asarray(df[WEIGHT_COLUMN], dtype=np.float64)
+        good = np.asarray(df[TARGET_COLUMN]) == GOOD_LABEL
+        for c, intake, weight, is_good in zip(cohort[valid].tolist(), intakes[valid].tolist(),
+                                              weights[valid].tolist(), good[valid].tolist()):
+            pending = self._pending.setdefault(c, ([], []))
+            bisect.insort(pending[0], intake)
+            bisect.insort(pending[1], weight)
+            self._pending_good[c] += is_good
+        added = int(valid.sum())
+        self.n_pending += added
+        if self.n_pending > COMPACT_AFTER:
+            self.compact()
+        return added
+
+    def compact(self):
+        """Fold the pending buffers into the sorted arrays."""
+        if not self.n_pending:
+            return
+        counts = np.diff(self.offsets)
+        cohort = np.repeat(np.arange(self.n_cohorts), counts)
+        # Both main arrays are ordered by cohort, so one cohort id array serves both
+        extra_cohort = np.concatenate([np.full(len(p[0]), c) for c, p in self._pending.items()])
+        extra_intake = np.concatenate([p[0] for p in self._pending.values()])
+        extra_weight = np.concatenate([p[1] for p in self._pending.values()])
+        all_cohort = np.concatenate([cohort, extra_cohort])
+        intake = np.concatenate([self.intake, extra_intake])
+        weight = np.concatenate([self.weight, extra_weight])
+        good = self.good + self._pending_good
+        self.offsets = np.concatenate([[0], np.cumsum(np.bincount(all_cohort, minlength=self.n_cohorts))]).astype(np.int64)
+        self.intake = intake[np.lexsort((intake, all_cohort))]
+        self.weight = weight[np.lexsort((weight, all_cohort))]
+        self.good = good
+        self._pending = {}
+        self._pending_good = np.zeros(self.n_cohorts, dtype=np.int64)
+        self.n_pending = 0
+
+
+def load_or_build(categories, data_path="Daily_Water_Intake.csv", base_dir=".", path=None):
+    """Load the saved index if it was built from this data with these categories, else rebuild it.
+
+    Without the data file (e.g. a deployment that ships only the artifacts),
+    the saved index is used as is.
+    """
+    path = path or os.path.join(base_dir, COHORT_FILE)
+    if not os.path.exists(data_path):
+        return CohortIndex.load(path)
+    version = data_version(data_path)
+    if os.path.exists(path):
+        try:
+            index = CohortIndex.load(path)
+            if index.version == version and all(
+                index.categories[col] == list(categories[col]) for col in COHORT_COLUMNS
+            ):
+                return index
+        except (OSError, ValueError, KeyError):
+            pass
+    index = CohortIndex.build(read_data(data_path, DATA_COLUMNS), categories, version)
+    try:
+        index.save(path)
+    except OSError:
+        pass  # read-only deployments keep the in-memory index
+    return index
+
+
+def check(index, df, samples=2000, seed=0):
+    """Compare lookups with a pandas groupby-style computation; returns mismatches."""
+    rng = np.random.default_rng(seed)
+    cats = df[COHORT_COLUMNS].astype(object)
+    bands = pd.cut(df["Age"], bins=AGE_BINS, labels=AGE_LABELS).astype(object)
+    mismatches = 0
+    for i in rng.choice(len(df), samples, replace=False):
+        row = df.iloc[i]
+        intake = row[INTAKE_COLUMN] + rng.choice([-0.1, 0.0, 0.1])
+        same = (cats == cats.iloc[i]).all(axis=1) & (bands == bands.iloc[i])
+        group = df[same]
+        expected = (
+            len(group),
+            100.0 * ((group[INTAKE_COLUMN] < intake).sum() + (group[INTAKE_COLUMN] <= intake).sum()) / 2 / len(group),
+            100.0 * (group[TARGET_COLUMN] == GOOD_LABEL).mean(),
+        )
+        got = index.compare(row["Gender"], row["Physical Activity Level"], row["Weather"], row["Age"],
+                            intake, row[WEIGHT_COLUMN])
+        if got.size != expected[0] or not np.isclose(got.intake_percentile, expected[1]) \
+                or not np.isclose(got.good_rate, expected[2]):
+            mismatches += 1
+    return samples, mismatches
+
+
+def main(argv=None):
+    from artifacts import load_artifacts
+    from preprocessing import Preprocessor
+
+    parser = argparse.ArgumentParser(description="Build, update or check the cohort percentile index.")
+    parser.add_argument("--artifacts", default=".", help="directory holding the artifacts; the index is saved here")
+    parser.add_argument("--data", default="Daily_Water_Intake.csv", help="CSV or dataset.py directory")
+    parser.add_argument("--update", metavar="CSV", help="add these labeled rows to the saved index")
+    parser.add_argument("--check", action="store_true", help="compare lookups with a pandas computation")
+    args = parser.parse_args(argv)
+
+    categories = Preprocessor(load_artifacts(args.artifacts)).categories
+    index = load_or_build(categories, args.data, args.artifacts)
+    if args.update:
+        added = index.update(pd.read_csv(args.update))
+        index.save(os.path.join(args.artifacts, COHORT_FILE))
+        print(f"Added {added:,} rows")
+    print(f"Cohort index {index.version[:12]}: {index.offsets[-1]:,} rows in "
+          f"{int((np.diff(index.offsets) > 0).sum())} of {index.n_cohorts} cohorts")
+    if args.check:
+        samples, mismatches = check(index, read_data(args.data, DATA_COLUMNS))
+        print(f"  {samples:,} lookups checked, {mismatches} mismatches")
+        if mismatches:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
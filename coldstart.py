@@ -0,0 +1,122 @@
+"""Cold-start timing: time-to-first-prediction in fresh interpreters.
+
+Each run starts a new Python process, loads the artifacts (individual .pkl
+files or the single bundle), compiles the engine and preprocessor, and scores
+one row. Medians per stage are printed, and can be appended to a JSON-lines
+log so releases can be compared:
+
+    python coldstart.py --runs 5 --release 1.4.0 --log coldstart.jsonl
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+SAMPLE_RECORD = {
+    "Age": 30,
+    "Gender": "Male",
+    "Weight (kg)": 70.0,
+    "Daily Water Intake (liters)": 2.0,
+    "Physical Activity Level": "Low",
+    "Weather": "Hot",
+}
+STAGES = ["import", "load", "compile", "first_prediction", "total"]
+
+
+def _child(mode, base_dir):
+    start = time.perf_counter()
+    timings = {}
+
+    import numpy  # noqa: F401
+    import joblib  # noqa: F401
+    # Unpickling imports sklearn anyway; doing it here keeps "load" to I/O + unpickle
+    import sklearn.preprocessing  # noqa: F401
+    import sklearn.tree  # noqa: F401
+
+    import artifacts
+    from inference import compile_model
+    from preprocessing import Preprocessor
+
+    mark = time.perf_counter()
+    timings["import"] = mark - start
+
+    if mode == "bundle":
+        loaded = artifacts.load_bundle(base_dir).artifacts
+    else:
+        loaded = artifacts.load_artifacts(base_dir, prefer_bundle=False)
+    timings["load"] = time.perf_counter() - mark
+    mark = time.perf_counter()
+
+    engine = compile_model(loaded.model)
+    preprocessor = Preprocessor(loaded)
+    timings["compile"] = time.perf_counter() - mark
+    mark = time.perf_counter()
+
+    engine.predict_one(preprocessor.transform_one(SAMPLE_RECORD))
+    timings["first_prediction"] = time.perf_counter() - mark
+    timings["total"] = time.perf_counter() - start
+    if mode == "ui-imports":
+        # What app.py no longer pays before the first result is shown
+        mark = time.perf_counter()
+        import plotly.express  # noqa: F401
+        import plotly.graph_objects  # noqa: F401
+        import fpdf  # noqa: F401
+        timings["deferred_ui_imports"] = time.perf_counter() - mark
+    print(json.dumps(timings))
+
+
+def measure(mode, base_dir, runs):
+    here = os.path.dirname(os.path.abspath(__file__))
+    samples = []
+    for _ in range(runs):
+        out = subprocess.run(
+            [sys.executable, "-W", "ignore", os.path.abspath(__file__), "--child", mode, "--artifacts", base_dir],
+            capture_output=True, text=True, check=True, cwd=here,
+        )
+        samples.append(json.loads(out.stdout.strip().splitlines()[-1]))
+    return {stage: statistics.median(s[stage] for s in samples) for stage in samples[0]}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Measure time-to-first-prediction in fresh processes.")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--artifacts", default=".")
+    parser.add_argument("--release", default="", help="label stored with the results, e.g. a version tag")
+    parser.add_argument("--log", help="append results to this JSON-lines file")
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    base_dir = os.path.abspath(args.artifacts)
+    if args.child:
+        _child(args.child, base_dir)
+        return
+
+    from artifacts import artifacts_version, has_bundle
+
+    modes = ["pickles", "ui-imports"] + (["bundle"] if has_bundle(base_dir) else [])
+    results = {mode: measure(mode, base_dir, args.runs) for mode in modes}
+
+    print(f"median of {args.runs} runs (ms)")
+    print(f"{'mode':<12}" + "".join(f"{stage:>18}" for stage in STAGES))
+    for mode, timings in results.items():
+        print(f"{mode:<12}" + "".join(f"{timings[stage] * 1000:>18.1f}" for stage in STAGES))
+    deferred = results["ui-imports"]["deferred_ui_imports"]
+    print(f"plotly + fpdf imports deferred until results render: {deferred * 1000:.1f}ms")
+
+    if args.log:
+        record = {
+            "release": args.release,
+            "version": artifacts_version(base_dir),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "runs": args.runs,
+            "results": results,
+        }
+        with open(args.log, "a") as f:
+            f.write(json.dumps(record) + "\n")
+
+
+if __name__ == "__main__":
+    main()
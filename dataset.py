@@ -0,0 +1,307 @@
+"""Typed, columnar copy of Daily_Water_Intake.csv.
+
+The CSV is converted once into a directory of Arrow IPC part files plus a
+JSON manifest. Text columns are dictionary-encoded with int8 codes whose
+dictionaries are the saved LabelEncoders' classes_, so a column's codes are
+exactly what the encoder would produce, and a value the encoders do not know
+is an error. A dataset converted for training (--for-training) instead takes
+each dictionary from the data, sorted like LabelEncoder.classes_, so new
+categories can reach a retrained model. Age is stored as uint8 and the two
+decimal columns as float32. Conversion checks that every float32 value
+rounds back to the CSV value at DECIMALS places, and load_frame() widens
+them that way, so the loaded values equal what pd.read_csv returns.
+
+Part files are uncompressed, so loading memory-maps them without copying,
+and only the projected columns are ever paged in:
+
+    python dataset.py convert --csv Daily_Water_Intake.csv --out Daily_Water_Intake.arrow
+    python dataset.py info Daily_Water_Intake.arrow
+"""
+import argparse
+import json
+import os
+import shutil
+import time
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.csv as pacsv
+
+from artifacts import (
+    FEATURE_COLUMNS,
+    TARGET_COLUMN,
+    TARGET_ENCODER_FILE,
+    categorical_encoders,
+    load_artifacts,
+    load_bundle,
+    sha256_files,
+    use_bundle,
+)
+
+DATASET_FORMAT = 1
+DATASET_MANIFEST = "manifest.json"
+DEFAULT_CSV = "Daily_Water_Intake.csv"
+DEFAULT_DATASET = "Daily_Water_Intake.arrow"
+ROWS_PER_PART = 1_000_000
+DECIMALS = 4  # float32 keeps these exactly for values below 1000
+
+INTEGER_COLUMNS = {"Age": pa.uint8()}
+DECIMAL_COLUMNS = ["Weight (kg)", "Daily Water Intake (liters)"]
+CATEGORY_TYPE = pa.dictionary(pa.int8(), pa.string())
+CATEGORY_COLUMNS = ["Gender", "Physical Activity Level", "Weather", TARGET_COLUMN]
+MAX_CATEGORIES = 127  # int8 codes
+
+
+def encoder_categories(base_dir="."):
+    """Category order for every text column, taken from the saved encoders."""
+    if use_bundle(base_dir):
+        bundle = load_bundle(base_dir)
+        artifacts, target_encoder = bundle.artifacts, bundle.target_encoder
+    else:
+        import joblib
+
+        artifacts = load_artifacts(base_dir, prefer_bundle=False)
+        target_encoder = joblib.load(os.path.join(base_dir, TARGET_ENCODER_FILE))
+    categories = {col: le.classes_.tolist() for col, le in categorical_encoders(artifacts).items()}
+    categories[TARGET_COLUMN] = target_encoder.classes_.tolist()
+    return categories
+
+
+def data_categories(csv_path, columns=CATEGORY_COLUMNS):
+    """Sorted distinct values of each text column, i.e. a LabelEncoder's classes_ if fitted on the CSV."""
+    reader = pacsv.open_csv(
+        csv_path,
+        read_options=pacsv.ReadOptions(block_size=4 << 20, use_threads=False),
+        convert_options=pacsv.ConvertOptions(column_types={col: pa.string() for col in columns},
+                                             include_columns=columns),
+    )
+    seen = {col: set() for col in columns}
+    for batch in reader:
+        for col in columns:
+            seen[col].update(pc.unique(batch.column(col)).drop_null().to_pylist())
+    categories = {col: sorted(values) for col, values in seen.items()}
+    for col, values in categories.items():
+        if len(values) > MAX_CATEGORIES:
+            raise ValueError(f"{col} has {len(values)} categories; int8 codes hold at most {MAX_CATEGORIES}")
+    return categories
+
+
+def schema(categories):
+    fields = []
+    for col in FEATURE_COLUMNS + [TARGET_COLUMN]:
+        if col in categories:
+            fields.append(pa.field(col, CATEGORY_TYPE))
+        elif col in INTEGER_COLUMNS:
+            fields.append(pa.field(col, INTEGER_COLUMNS[col]))
+        else:
+            fields.append(pa.field(col, pa.float32()))
+    return pa.schema(fields)
+
+
+def _encode_batch(batch, categories, target_schema):
+    columns = []
+    for field in target_schema:
+        values = batch.column(field.name)
+        if field.name in categories:
+            dictionary = pa.array(categories[field.name], pa.string())
+            codes = pc.index_in(values, value_set=dictionary)
+            unknown = pc.and_(pc.is_null(codes), pc.is_valid(values))
+            if pc.any(unknown).as_py():
+                seen = pc.unique(pc.filter(values, unknown)).to_pylist()
+                raise ValueError(f"{field.name} values not in the saved encoder: {sorted(seen)}")
+            columns.append(pa.DictionaryArray.from_arrays(pc.cast(codes, pa.int8()), dictionary))
+        elif field.name in INTEGER_COLUMNS:
+            # Safe cast: raises on values that do not fit the narrow type
+            columns.append(pc.cast(values, field.type))
+        else:
+            narrow = pc.cast(values, pa.float32(), safe=False)
+            restored = np.round(narrow.to_numpy(zero_copy_only=False).astype(np.float64), DECIMALS)
+            original = values.to_numpy(zero_copy_only=False)
+            if not np.array_equal(restored, original, equal_nan=True):
+                raise ValueError(f"{field.name} has values float32 cannot hold to {DECIMALS} decimals")
+            columns.append(narrow)
+    return pa.RecordBatch.from_arrays(columns, schema=target_schema)
+
+
+def convert_csv(csv_path=DEFAULT_CSV, out_dir=DEFAULT_DATASET, base_dir=".", rows_per_part=ROWS_PER_PART,
+                for_training=False):
+    """Stream csv_path into part files under out_dir (replacing it); returns the manifest.
+
+    The CSV is read in blocks, so memory stays bounded by one part file
+    whatever the input size. Categories come from the saved encoders in
+    base_dir, or with for_training from an extra pass over the CSV.
+    """
+    categories = data_categories(csv_path) if for_training else encoder_categories(base_dir)
+    target_schema = schema(categories)
+    column_types = {col: pa.string() for col in categories}
+    column_types.update({col: pa.int64() for col in INTEGER_COLUMNS})
+    column_types.update({col: pa.float64() for col in DECIMAL_COLUMNS})
+
+    out_dir = os.path.abspath(out_dir)
+    tmp = f"{out_dir}.tmp-{os.getpid()}"
+    shutil.rmtree(tmp, ignore_errors=True)
+    os.makedirs(tmp)
+
+    parts = []
+    writer = None
+    reader = pacsv.open_csv(
+        csv_path,
+        read_options=pacsv.ReadOptions(block_size=4 << 20, use_threads=False),
+        convert_options=pacsv.ConvertOptions(column_types=column_types, include_columns=target_schema.names),
+    )
+    try:
+        for batch in reader:
+            batch = _encode_batch(batch, categories, target_schema)
+            offset = 0
+            while offset < batch.num_rows:
+                if writer is None:
+                    name = f"part-{len(parts):05d}.arrow"
+                    writer = pa.ipc.new_file(os.path.join(tmp, name), target_schema)
+                    parts.append({"file": name, "rows": 0})
+                take = min(batch.num_rows - offset, rows_per_part - parts[-1]["rows"])
+                writer.write_batch(batch.slice(offset, take))
+                parts[-1]["rows"] += take
+                offset += take
+                if parts[-1]["rows"] == rows_per_part:
+                    writer.close()
+                    writer = None
+    except BaseException:
+        shutil.rmtree(tmp, ignore_errors=True)
+        raise
+    finally:
+        if writer is not None:
+            writer.close()
+
+    manifest = {
+        "format": DATASET_FORMAT,
+        "source": os.path.basename(csv_path),
+        "source_sha256": sha256_files([csv_path]),
+        "rows": sum(p["rows"] for p in parts),
+        "parts": parts,
+        "columns": {field.name: str(field.type) for field in target_schema},
+        "categories": categories,
+        "categories_from": "data" if for_training else "encoders",
+        "decimals": DECIMALS,
+    }
+    with open(os.path.join(tmp, DATASET_MANIFEST), "w") as f:
+        json.dump(manifest, f, indent=2)
+    if os.path.exists(out_dir):
+        shutil.rmtree(out_dir)
+    os.rename(tmp, out_dir)
+    return manifest
+
+
+def read_manifest(path=DEFAULT_DATASET):
+    with open(os.path.join(path, DATASET_MANIFEST)) as f:
+        manifest = json.load(f)
+    if manifest.get("format") != DATASET_FORMAT:
+        raise ValueError(f"Unsupported dataset format {manifest.get('format')!r}")
+    return manifest
+
+
+def is_dataset(path):
+    return os.path.isfile(os.path.join(path, DATASET_MANIFEST))
+
+
+def iter_tables(path=DEFAULT_DATASET, columns=None):
+    """Yield one memory-mapped table per part file, projected to columns."""
+    for part in read_manifest(path)["parts"]:
+        table = pa.ipc.open_file(pa.memory_map(os.path.join(path, part["file"]))).read_all()
+        yield table.select(columns) if columns is not None else table
+
+
+def load_table(path=DEFAULT_DATASET, columns=None):
+    """All parts as one Arrow table; zero-copy over the mapped files."""
+    tables = list(iter_tables(path, columns))
+    if not tables:
+        empty = schema(read_manifest(path)["categories"]).empty_table()
+        return empty.select(columns) if columns is not None else empty
+    return pa.concat_tables(tables)
+
+
+def to_frame(table, widen=True):
+    """Arrow table -> DataFrame with categorical text columns.
+
+    With widen, the float32 columns come back as the float64 values the CSV
+    holds; otherwise they stay float32 (half the memory, ~7 digits).
+    """
+    df = table.to_pandas(split_blocks=True)
+    if widen:
+        for col in DECIMAL_COLUMNS:
+            if col in df:
+                df[col] = np.round(df[col].to_numpy(dtype=np.float64), DECIMALS)
+    return df
+
+
+def load_frame(path=DEFAULT_DATASET, columns=None, widen=True):
+    return to_frame(load_table(path, columns), widen)
+
+
+def check_encoders(path=DEFAULT_DATASET, base_dir="."):
+    """Names of the columns whose stored category order differs from the saved encoders."""
+    stored = read_manifest(path)["categories"]
+    return [col for col, classes in encoder_categories(base_dir).items() if stored.get(col) != classes]
+
+
+def compare(csv_path=DEFAULT_CSV, path=DEFAULT_DATASET):
+    """Load time and in-memory size: pd.read_csv vs this dataset."""
+    import pandas as pd
+
+    start = time.perf_counter()
+    csv_df = pd.read_csv(csv_path)
+    csv_s = time.perf_counter() - start
+    start = time.perf_counter()
+    df = load_frame(path)
+    arrow_s = time.perf_counter() - start
+    same = csv_df.astype(object).equals(df[csv_df.columns].astype(object))
+    return {
+        "rows": len(df),
+        "csv_load_s": csv_s,
+        "csv_mb": csv_df.memory_usage(deep=True).sum() / 1e6,
+        "dataset_load_s": arrow_s,
+        "dataset_mb": df.memory_usage(deep=True).sum() / 1e6,
+        "identical": bool(same),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Convert or inspect the columnar training dataset.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    convert = sub.add_parser("convert", help="write the dataset from the CSV")
+    convert.add_argument("--csv", default=DEFAULT_CSV)
+    convert.add_argument("--out", default=DEFAULT_DATASET)
+    convert.add_argument("--artifacts", default=".", help="directory holding the saved encoders")
+    convert.add_argument("--rows-per-part", type=int, default=ROWS_PER_PART)
+    convert.add_argument("--for-training", action="store_true",
+                         help="take the categories from the data instead of the saved encoders")
+    info = sub.add_parser("info", help="show the manifest and compare against pd.read_csv")
+    info.add_argument("path", nargs="?", default=DEFAULT_DATASET)
+    info.add_argument("--csv", default=DEFAULT_CSV)
+    info.add_argument("--artifacts", default=".")
+    args = parser.parse_args(argv)
+
+    if args.command == "convert":
+        start = time.perf_counter()
+        manifest = convert_csv(args.csv, args.out, args.artifacts, args.rows_per_part, args.for_training)
+        print(f"Wrote {manifest['rows']:,} rows in {len(manifest['parts'])} part(s) to {args.out} "
+              f"in {time.perf_counter() - start:.2f}s")
+        return
+
+    manifest = read_manifest(args.path)
+    print(f"{manifest['rows']:,} rows in {len(manifest['parts'])} part(s) from {manifest['source']}")
+    for col, dtype in manifest["columns"].items():
+        print(f"  {col:<30} {dtype}")
+    stale = check_encoders(args.path, args.artifacts)
+    if stale and manifest.get("categories_from") == "data":
+        print(f"Categories taken from the data; they differ from the saved encoders for: {', '.join(stale)}")
+    elif stale:
+        print(f"Category order differs from the saved encoders for: {', '.join(stale)}; re-run convert")
+    if os.path.exists(args.csv) and sha256_files([args.csv]) == manifest["source_sha256"]:
+        r = compare(args.csv, args.path)
+        print(f"pd.read_csv: {r['csv_load_s'] * 1000:8.1f}ms {r['csv_mb']:8.2f}MB")
+        print(f"dataset:     {r['dataset_load_s'] * 1000:8.1f}ms {r['dataset_mb']:8.2f}MB  identical={r['identical']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,28 @@
+"""Reading the training data and fingerprinting it, from the CSV or a dataset.py directory.
+
+Shared by the indexes built from the data (cohort.py, drift.py) and by
+train.py, so they agree on what "the same data" means.
+"""
+import os
+
+import pandas as pd
+
+from artifacts import sha256_files
+
+
+def read_data(data_path, columns=None):
+    """DataFrame from the CSV or from a dataset.py directory, optionally projected to columns."""
+    import dataset
+
+    if dataset.is_dataset(data_path):
+        return dataset.load_frame(data_path, columns=columns)
+    return pd.read_csv(data_path, usecols=columns)
+
+
+def data_version(data_path):
+    """SHA-256 of the source CSV; a dataset.py directory reports the CSV it was converted from."""
+    if os.path.isdir(data_path):
+        import dataset
+
+        return dataset.read_manifest(data_path)["source_sha256"]
+    return sha256_files([data_path])
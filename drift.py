@@ -0,0 +1,627 @@
+"""Streaming input-drift and prediction monitor with constant memory.
+
+Every observed input updates, per feature:
+- numeric columns: Welford mean / variance, min / max, counts of values
+  outside the range the MinMaxScaler was fitted on (they scale outside
+  feature_range), and a histogram over fixed bins;
+- categorical columns: a count per known category plus one for unknown
+  values;
+and the predicted status counts (Good / Poor rate).
+
+The bins and the reference shares come from a profile of
+Daily_Water_Intake.csv: numeric bins are the reference deciles, and the
+reference status shares are its labeled Hydration Level. Each histogram's
+PSI against the reference,
+
+    PSI = sum_i (p_i - q_i) * ln(p_i / q_i),
+
+is kept up to date in O(1) per event. With counts c_i (plus SMOOTHING, so
+empty bins stay finite) out of n it expands to
+
+    (sum_i c_i ln c_i - sum_i c_i ln q_i) / n - sum_i q_i ln c_i + sum_i q_i ln q_i,
+
+and an event changes one c_i, so each running sum moves by one term.
+
+A long-lived process would dilute recent drift in statistics kept since it
+started, so the monitor keeps them per window of WINDOW_EVENTS events. The
+current window takes every update. Once it fills, it replaces the previous
+window, and the previous one is folded into lifetime totals. PSI, the means
+and the rates cover the previous plus the current window, i.e. the last
+WINDOW_EVENTS to 2 * WINDOW_EVENTS events. Merging them for a report is
+O(bins); an update stays O(1) (a rotation is O(bins) once per window). The
+Prometheus counters (out of range, unknown categories, predictions) use the
+lifetime totals so they stay monotonic.
+
+The profile is saved as drift_reference.json next to the artifacts and
+rebuilt when the data file changes:
+    python drift.py                       # build or refresh the profile
+    python drift.py --check
+    python drift.py --bench
+"""
+import argparse
+import bisect
+import copy
+import json
+import math
+import os
+import sys
+import threading
+import time
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+
+from artifacts import TARGET_COLUMN
+from datasource import data_version, read_data
+from preprocessing import to_float
+
+REFERENCE_FILE = "drift_reference.json"
+REFERENCE_FORMAT = 1
+N_BINS = 10  # reference deciles
+WINDOW_EVENTS = 5000  # events per window; None keeps statistics over the monitor's lifetime
+SMOOTHING = 0.5  # pseudo-count added to every bin on both sides
+STATUS_LABELS = ["Good", "Poor"]  # artifacts.status_label order: prediction 0 is Good
+# Usual PSI reading: below 0.1 stable, 0.1-0.25 moderate shift, above 0.25 major shift
+PSI_MODERATE = 0.1
+PSI_MAJOR = 0.25
+
+FeatureDrift = namedtuple(
+    "FeatureDrift", ["feature", "psi", "count", "mean", "std", "reference_mean", "below_range", "above_range", "unknown"]
+)
+
+
+def drift_level(psi):
+    if psi != psi:
+        return "no data"
+    return "major" if psi >= PSI_MAJOR else "moderate" if psi >= PSI_MODERATE else "stable"
+
+
+# ======= REFERENCE =======
+class ReferenceProfile:
+    """Bins and reference counts per feature, plus the scaler's input range."""
+
+    def __init__(self, numeric, categorical, status, version=""):
+        # numeric: {col: {"edges", "counts", "mean", "std", "low", "high"}}
+        # categorical: {col: {"categories", "counts"}}; status: counts per STATUS_LABELS
+        self.numeric = numeric
+        self.categorical = categorical
+        self.status = status
+        self.version = version
+
+    @classmethod
+    def build(cls, df, preprocessor, version=""):
+        low_range, high_range = preprocessor.feature_range
+        numeric = {}
+        for _, col, scale, offset in preprocessor.numeric:
+            values = np.asarray(df[col], dtype=np.float64)
+            values = values[~np.isnan(values)]
+            edges = np.unique(np.quantile(values, np.linspace(0, 1, N_BINS + 1)[1:-1]))
+            # Raw values whose scaled value lands in feature_range
+            low, high = sorted([(low_range - offset) / scale, (high_range - offset) / scale])
+            numeric[col] = {
+                "edges": edges.tolist(),
+                "counts": np.bincount(np.searchsorted(edges, values, side="right"), minlength=len(edges) + 1).tolist(),
+                "mean": float(values.mean()),
+                "std": float(values.std()),
+                "low": low,
+                "high": high,
+            }
+        categorical = {}
+        for _, col, _, classes in preprocessor.categorical:
+            codes = pd.Categorical(df[col], categories=classes).codes
+            counts = np.bincount(codes[codes >= 0], minlength=len(classes)).tolist()
+            categorical[col] = {"categories": classes.tolist(), "counts": counts + [int((codes < 0).sum())]}
+        labels = pd.Categorical(df[TARGET_COLUMN], categories=STATUS_LABELS).codes
+        status = np.bincount(labels[labels >= 0], minlength=len(STATUS_LABELS)).tolist()
+        return cls(numeric, categorical, status, version)
+
+    def matches(self, preprocessor):
+        """Whether the profile was built for this preprocessor's columns, categories and scaling."""
+        low_range, high_range = preprocessor.feature_range
+        for _, col, scale, offset in preprocessor.numeric:
+            spec = self.numeric.get(col)
+            bounds = sorted([(low_range - offset) / scale, (high_range - offset) / scale])
+            if spec is None or not np.allclose([spec["low"], spec["high"]], bounds):
+                return False
+        return all(
+            col in self.categorical and self.categorical[col]["categories"] == classes.tolist()
+            for _, col, _, classes in preprocessor.categorical
+        )
+
+    def save(self, path):
+        tmp = path + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump({"format": REFERENCE_FORMAT, "version": self.version, "numeric": self.numeric,
+                       "categorical": self.categorical, "status": self.status}, f, indent=2)
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path):
+        with open(path) as f:
+            data = json.load(f)
+        if data.get("format") != REFERENCE_FORMAT:
+            raise ValueError(f"Unsupported drift reference format in {path}")
+        return cls(data["numeric"], data["categorical"], data["status"], data["version"])
+
+
+def load_or_build(preprocessor, data_path="Daily_Water_Intake.csv", base_dir=".", path=None):
+    """Load the saved profile if it matches this data and preprocessor, else rebuild it.
+
+    Without the data file the saved profile is used as is.
+    """
+    path = path or os.path.join(base_dir, REFERENCE_FILE)
+    if not os.path.exists(data_path):
+        return ReferenceProfile.load(path)
+    version = data_version(data_path)
+    if os.path.exists(path):
+        try:
+            reference = ReferenceProfile.load(path)
+            if reference.version == version and reference.matches(preprocessor):
+                return reference
+        except (OSError, ValueError, KeyError):
+            pass
+    reference = ReferenceProfile.build(read_data(data_path), preprocessor, version)
+    try:
+        reference.save(path)
+    except OSError:
+        pass  # read-only deployments keep the in-memory profile
+    return reference
+
+
+# ======= STREAMING STATISTICS =======
+class Histogram:
+    """Counts over fixed bins with their PSI against reference counts, updated in O(1)."""
+
+    def __init__(self, reference_counts):
+        q = np.asarray(reference_counts, dtype=np.float64) + SMOOTHING
+        q /= q.sum()
+        self.q = q.tolist()
+        self.log_q = np.log(q).tolist()
+        self.q_log_q = float((q * np.log(q)).sum())
+        self.counts = [0] * len(q)
+        self.n = 0
+        self._recompute()
+
+    def _recompute(self):
+        c = np.asarray(self.counts, dtype=np.float64) + SMOOTHING
+        log_c = np.log(c)
+        self._c_log_c = float((c * log_c).sum())
+        self._c_log_q = float((c * np.asarray(self.log_q)).sum())
+        self._q_log_c = float((np.asarray(self.q) * log_c).sum())
+
+    def add(self, i):
+        old = self.counts[i] + SMOOTHING
+        new = old + 1
+        log_old, log_new = math.log(old), math.log(new)
+        self._c_log_c += new * log_new - old * log_old
+        self._c_log_q += self.log_q[i]
+        self._q_log_c += self.q[i] * (log_new - log_old)
+        self.counts[i] += 1
+        self.n += 1
+
+    def add_counts(self, counts):
+        """Add a batch's per-bin counts; O(bins)."""
+        self.counts = (np.asarray(self.counts) + counts).tolist()
+        self.n += int(np.sum(counts))
+        self._recompute()
+
+    def merged(self, other):
+        """Histogram of both sets of counts (same reference); O(bins)."""
+        merged = copy.copy(self)
+        merged.counts = [a + b for a, b in zip(self.counts, other.counts)]
+        merged.n = self.n + other.n
+        merged._recompute()
+        return merged
+
+    def psi(self):
+        if not self.n:
+            return float("nan")
+        n = self.n + SMOOTHING * len(self.counts)
+        return (self._c_log_c - self._c_log_q) / n - self._q_log_c + self.q_log_q
+
+    def psi_exact(self):
+        """Same PSI straight from the counts, for checking the running sums."""
+        if not self.n:
+            return float("nan")
+        p = np.asarray(self.counts, dtype=np.float64) + SMOOTHING
+        p /= p.sum()
+        q = np.asarray(self.q)
+        return float(((p - q) * np.log(p / q)).sum())
+
+
+class NumericStats:
+    def __init__(self, name, spec):
+        self.name = name
+        self.edges = list(spec["edges"])
+        self.low, self.high = spec["low"], spec["high"]
+        self.reference_mean = spec["mean"]
+        self.histogram = Histogram(spec["counts"])
+        self.n = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+        self.below = 0
+        self.above = 0
+        self.missing = 0
+
+    def add(self, value):
+        # Anything that is not a finite number counts as missing, like the
+        # rows preprocessing marks Invalid
+        try:
+            x = float(value)
+        except (TypeError, ValueError):
+            x = math.nan
+        if not math.isfinite(x):
+            self.missing += 1
+            return
+        self.n += 1
+        delta = x - self.mean
+        self.mean += delta / self.n
+        self.m2 += delta * (x - self.mean)
+        if x < self.min:
+            self.min = x
+        if x > self.max:
+            self.max = x
+        if x < self.low:
+            self.below += 1
+        elif x > self.high:
+            self.above += 1
+        self.histogram.add(bisect.bisect_right(self.edges, x))
+
+    def add_batch(self, values):
+        values = to_float(values)
+        missing = ~np.isfinite(values)
+        self.missing += int(missing.sum())
+        x = values[~missing]
+        if not len(x):
+            return
+        self._merge_moments(len(x), float(x.mean()), float(((x - x.mean()) ** 2).sum()))
+        self.min = min(self.min, float(x.min()))
+        self.max = max(self.max, float(x.max()))
+        self.below += int((x < self.low).sum())
+        self.above += int((x > self.high).sum())
+        bins = np.searchsorted(self.edges, x, side="right")
+        self.histogram.add_counts(np.bincount(bins, minlength=len(self.edges) + 1))
+
+    def _merge_moments(self, n, mean, m2):
+        # Chan et al.'s merge of two (count, mean, M2) summaries
+        if not n:
+            return
+        total = self.n + n
+        delta = mean - self.mean
+        self.mean += delta * n / total
+        self.m2 += m2 + delta * delta * self.n * n / total
+        self.n = total
+
+    def merged(self, other):
+        merged = copy.copy(self)
+        merged._merge_moments(other.n, other.mean, other.m2)
+        merged.min = min(self.min, other.min)
+        merged.max = max(self.max, other.max)
+        merged.below = self.below + other.below
+        merged.above = self.above + other.above
+        merged.missing = self.missing + other.missing
+        merged.histogram = self.histogram.merged(other.histogram)
+        return merged
+
+    @property
+    def std(self):
+        return math.sqrt(self.m2 / self.n) if self.n else float("nan")
+
+
+class CategoryStats:
+    def __init__(self, name, spec):
+        self.name = name
+        self.categories = list(spec["categories"])
+        self._codes = {value: i for i, value in enumerate(self.categories)}
+        self.histogram = Histogram(spec["counts"])  # last bin counts unknown values
+
+    def add(self, value):
+        self.histogram.add(self._codes.get(value, len(self.categories)))
+
+    def add_batch(self, values):
+        codes = pd.Categorical(values, categories=self.categories).codes
+        codes = np.where(codes < 0, len(self.categories), codes)
+        self.histogram.add_counts(np.bincount(codes, minlength=len(self.categories) + 1))
+
+    def merged(self, other):
+        merged = copy.copy(self)
+        merged.histogram = self.histogram.merged(other.histogram)
+        return merged
+
+    @property
+    def unknown(self):
+        return self.histogram.counts[-1]
+
+
+class Window:
+    """One generation of the monitor's statistics."""
+
+    def __init__(self, reference):
+        self.numeric = [NumericStats(col, spec) for col, spec in reference.numeric.items()]
+        self.categorical = [CategoryStats(col, spec) for col, spec in reference.categorical.items()]
+        self.status = Histogram(reference.status)
+        self.events = 0
+
+    def merged(self, other):
+        merged = copy.copy(self)
+        merged.numeric = [a.merged(b) for a, b in zip(self.numeric, other.numeric)]
+        merged.categorical = [a.merged(b) for a, b in zip(self.categorical, other.categorical)]
+        merged.status = self.status.merged(other.status)
+        merged.events = self.events + other.events
+        return merged
+
+
+class DriftMonitor:
+    """Windowed per-feature statistics and PSI against a ReferenceProfile; thread-safe."""
+
+    def __init__(self, reference, window=WINDOW_EVENTS):
+        self.reference = reference
+        self.window = window
+        self.current = Window(reference)
+        self.previous = None
+        self.retired = None  # every window before previous, for the lifetime counters
+        self.events = 0
+        self._lock = threading.Lock()
+
+    def observe(self, record, prediction=None):
+        """Add one raw input record (column -> value) and its predicted class; O(1)."""
+        with self._lock:
+            current = self.current
+            for stats in current.numeric:
+                stats.add(record.get(stats.name))
+            for stats in current.categorical:
+                stats.add(record.get(stats.name))
+            if prediction is not None and 0 <= prediction < len(STATUS_LABELS):
+                current.status.add(int(prediction))
+            current.events += 1
+            self.events += 1
+            if self.window and current.events >= self.window:
+                self._rotate()
+
+    def observe_frame(self, df, predictions=None):
+        """Add a batch of raw rows; predictions of -1 (invalid rows) are not counted.
+
+        A batch lands in one window, which rotates afterwards if it is full.
+        """
+        with self._lock:
+            current = self.current
+            for stats in current.numeric:
+                stats.add_batch(df[stats.name] if stats.name in df else np.full(len(df), np.nan))
+            for stats in current.categorical:
+                stats.add_batch(df[stats.name] if stats.name in df else np.full(len(df), None, dtype=object))
+            if predictions is not None:
+                predictions = np.asarray(predictions)
+                valid = predictions[(predictions >= 0) & (predictions < len(STATUS_LABELS))]
+                current.status.add_counts(np.bincount(valid.astype(np.int64), minlength=len(STATUS_LABELS)))
+            current.events += len(df)
+            self.events += len(df)
+            if self.window and current.events >= self.window:
+                self._rotate()
+
+    def _rotate(self):
+        if self.previous is not None:
+            self.retired = self.previous if self.retired is None else self.retired.merged(self.previous)
+        self.previous = self.current
+        self.current = Window(self.reference)
+
+    def _recent(self):
+        return self.current if self.previous is None else self.previous.merged(self.current)
+
+    def _view(self):
+        """Statistics over the previous and current windows."""
+        with self._lock:
+            return self._recent()
+
+    def _lifetime(self):
+        with self._lock:
+            view = self._recent()
+            return view if self.retired is None else self.retired.merged(view)
+
+    # ======= REPORTS =======
+    @staticmethod
+    def _rows(window):
+        rows = [
+            FeatureDrift(s.name, s.histogram.psi(), s.n, s.mean if s.n else float("nan"), s.std,
+                         s.reference_mean, s.below, s.above, 0)
+            for s in window.numeric
+        ]
+        rows += [
+            FeatureDrift(s.name, s.histogram.psi(), s.histogram.n, None, None, None, 0, 0, s.unknown)
+            for s in window.categorical
+        ]
+        return rows
+
+    def window_events(self):
+        """Events covered by features() and status_rates()."""
+        with self._lock:
+            return self.current.events + (self.previous.events if self.previous is not None else 0)
+
+    def features(self):
+        """Per-feature rows over the recent windows."""
+        return self._rows(self._view())
+
+    def status_rates(self, window=None):
+        """(live Good rate, reference Good rate, PSI of the predicted status mix) over the recent windows."""
+        status = (window or self._view()).status
+        live = status.counts[0] / status.n if status.n else float("nan")
+        reference = self.reference.status[0] / sum(self.reference.status)
+        return live, reference, status.psi()
+
+    def report(self):
+        """JSON-serializable summary of the recent windows."""
+        view = self._view()
+        live, reference, psi = self.status_rates(view)
+
+        def _number(value):
+            return None if value is None or value != value else round(float(value), 6)
+
+        features = {}
+        for row in self._rows(view):
+            feature = {"psi": _number(row.psi), "drift": drift_level(row.psi), "count": row.count}
+            if row.mean is None:
+                feature["unknown_categories"] = row.unknown
+            else:
+                feature.update(mean=_number(row.mean), std=_number(row.std), reference_mean=_number(row.reference_mean),
+                               below_scaler_range=row.below_range, above_scaler_range=row.above_range)
+            features[row.feature] = feature
+        return {
+            "events": self.events,
+            "window": {"size": self.window, "events": view.events},
+            "features": features,
+            "predictions": {
+                "count": view.status.n,
+                "good_rate": _number(live),
+                "reference_good_rate": _number(reference),
+                "psi": _number(psi),
+                "drift": drift_level(psi),
+            },
+        }
+
+    def prometheus_lines(self):
+        """Gauges and counters in Prometheus text format (see telemetry.Telemetry.add_collector)."""
+        lines = [
+            "# HELP hydration_drift_psi Population stability index of live inputs against the training data.",
+            "# TYPE hydration_drift_psi gauge",
+        ]
+        view = self._view()
+        lines += [f'hydration_drift_psi{{feature="{row.feature}"}} {row.psi:.6g}' for row in self._rows(view)]
+        lines.append(f'hydration_drift_psi{{feature="prediction"}} {self.status_rates(view)[2]:.6g}')
+        # Counters: lifetime totals
+        lifetime = self._lifetime()
+        rows = self._rows(lifetime)
+        lines += [
+            "# HELP hydration_out_of_scaler_range_total Inputs outside the range the scaler was fitted on.",
+            "# TYPE hydration_out_of_scaler_range_total counter",
+        ]
+        for row in rows[:len(lifetime.numeric)]:
+            lines.append(f'hydration_out_of_scaler_range_total{{feature="{row.feature}",side="below"}} {row.below_range}')
+            lines.append(f'hydration_out_of_scaler_range_total{{feature="{row.feature}",side="above"}} {row.above_range}')
+        lines += [
+            "# HELP hydration_unknown_category_total Inputs with a category the encoders do not know.",
+            "# TYPE hydration_unknown_category_total counter",
+        ]
+        lines += [f'hydration_unknown_category_total{{feature="{row.feature}"}} {row.unknown}'
+                  for row in rows[len(lifetime.numeric):]]
+        lines += [
+            "# HELP hydration_predictions_total Predictions by status.",
+            "# TYPE hydration_predictions_total counter",
+        ]
+        lines += [f'hydration_predictions_total{{status="{label}"}} {count}'
+                  for label, count in zip(STATUS_LABELS, lifetime.status.counts)]
+        return lines
+
+
+# ======= CHECKS =======
+def _load(data_path, artifacts_dir):
+    from artifacts import load_artifacts
+    from preprocessing import Preprocessor
+
+    preprocessor = Preprocessor(load_artifacts(artifacts_dir))
+    return read_data(data_path), preprocessor, load_or_build(preprocessor, data_path, artifacts_dir)
+
+
+def check(data_path="Daily_Water_Intake.csv", artifacts_dir="."):
+    """Per-event vs batch updates, running vs exact PSI, and a shifted sample."""
+    df, _, reference = _load(data_path, artifacts_dir)
+    labels = pd.Categorical(df[TARGET_COLUMN], categories=STATUS_LABELS).codes
+
+    # Lifetime monitors (no windows), so the two update paths see the same rows
+    streamed = DriftMonitor(reference, window=None)
+    for record, label in zip(df.to_dict("records"), labels.tolist()):
+        streamed.observe(record, label)
+    batch = DriftMonitor(reference, window=None)
+    for start in range(0, len(df), 7000):
+        batch.observe_frame(df.iloc[start:start + 7000], labels[start:start + 7000])
+
+    problems = {}
+    one_window, many_window = streamed.current, batch.current
+    histograms = [(s.name, s.histogram, b.histogram) for s, b in zip(one_window.numeric + one_window.categorical,
+                                                                    many_window.numeric + many_window.categorical)]
+    histograms.append(("prediction", one_window.status, many_window.status))
+    for name, one, many in histograms:
+        if one.counts != many.counts:
+            problems[f"{name} counts"] = "event and batch histograms differ"
+        if not math.isclose(one.psi(), one.psi_exact(), rel_tol=1e-9, abs_tol=1e-12):
+            problems[f"{name} psi"] = f"running {one.psi():.3g} vs exact {one.psi_exact():.3g}"
+    for one, many in zip(one_window.numeric, many_window.numeric):
+        expected = np.asarray(df[one.name], dtype=np.float64)
+        for got in (one, many):
+            if not (np.isclose(got.mean, expected.mean()) and np.isclose(got.std, expected.std())):
+                problems[f"{one.name} moments"] = "mean / std differ from numpy"
+
+    # The training data against its own profile is stable; heavier, hotter inputs are not
+    same = max(row.psi for row in streamed.features())
+    shifted = df.copy()
+    shifted["Weight (kg)"] = shifted["Weight (kg)"] + 15
+    shifted["Weather"] = "Hot"
+    drifted = DriftMonitor(reference)
+    drifted.observe_frame(shifted)
+    psi = {row.feature: row.psi for row in drifted.features()}
+    if same >= PSI_MODERATE:
+        problems["reference vs itself"] = f"max PSI {same:.3g}"
+    if not (psi["Weight (kg)"] >= PSI_MAJOR and psi["Weather"] >= PSI_MAJOR):
+        problems["shifted sample"] = f"weight PSI {psi['Weight (kg)']:.3g}, weather PSI {psi['Weather']:.3g}"
+    if {row.feature: row for row in drifted.features()}["Weight (kg)"].above_range == 0:
+        problems["scaler range"] = "no out-of-range weights counted"
+
+    # Once shifted inputs fill the recent windows, the training data seen
+    # before no longer dilutes them; the lifetime totals still count it all
+    windowed = DriftMonitor(reference, window=1000)
+    windowed.observe_frame(df)
+    for record in shifted.head(2500).to_dict("records"):
+        windowed.observe(record)
+    alone = DriftMonitor(reference, window=None)
+    alone.observe_frame(shifted.iloc[1000:2500])
+    recent = {row.feature: row.psi for row in windowed.features()}
+    expected = {row.feature: row.psi for row in alone.features()}
+    if windowed.window_events() != 1500 or not all(math.isclose(recent[f], expected[f]) for f in expected):
+        problems["window"] = (f"{windowed.window_events()} recent events, weight PSI {recent['Weight (kg)']:.3g} "
+                              f"vs {expected['Weight (kg)']:.3g} on the same shifted inputs alone")
+    if windowed._lifetime().events != len(df) + 2500:
+        problems["lifetime totals"] = f"{windowed._lifetime().events} events counted"
+    return len(df), problems
+
+
+def benchmark(data_path="Daily_Water_Intake.csv", artifacts_dir="."):
+    df, _, reference = _load(data_path, artifacts_dir)
+    records = df.to_dict("records")
+    monitor = DriftMonitor(reference)
+    start = time.perf_counter()
+    for record in records:
+        monitor.observe(record, 0)
+    per_event = (time.perf_counter() - start) / len(records)
+    start = time.perf_counter()
+    DriftMonitor(reference).observe_frame(df, np.zeros(len(df), dtype=np.int64))
+    batch = time.perf_counter() - start
+    return len(df), per_event * 1e6, len(df) / batch
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build or check the input-drift reference profile.")
+    parser.add_argument("--artifacts", default=".", help="directory holding the artifacts; the profile is saved here")
+    parser.add_argument("--data", default="Daily_Water_Intake.csv", help="CSV or dataset.py directory")
+    parser.add_argument("--check", action="store_true", help="check the running statistics and PSI")
+    parser.add_argument("--bench", action="store_true", help="measure per-event and batch update cost")
+    args = parser.parse_args(argv)
+
+    df, _, reference = _load(args.data, args.artifacts)
+    print(f"Drift reference {reference.version[:12]}: {len(df):,} rows, "
+          f"{len(reference.numeric)} numeric / {len(reference.categorical)} categorical features")
+    if args.bench:
+        rows, per_event_us, batch_rate = benchmark(args.data, args.artifacts)
+        print(f"  observe():       {per_event_us:8.1f} us/event")
+        print(f"  observe_frame(): {batch_rate:12,.0f} rows/sec")
+    if args.check:
+        rows, problems = check(args.data, args.artifacts)
+        print(f"  {rows:,} rows checked, {len(problems)} problems")
+        for name, problem in problems.items():
+            print(f"    {name}: {problem}")
+        if problems:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
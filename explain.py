@@ -0,0 +1,195 @@
+"""Per-prediction explanations from the tree's decision path.
+
+Each split on a row's path moves the class probabilities from the parent
+node's values to the child's; that change is credited to the feature the
+split tests. The root's probabilities (the bias) plus every feature's
+contributions add up exactly to the probabilities of the leaf the row lands
+in, so the result explains this prediction rather than the model on average.
+
+Batches walk the flattened node arrays of a TreeEngine one depth level at a
+time for all rows at once; leaves point back at themselves and contribute
+nothing once reached. Single rows take a plain-Python walk like
+TreeEngine.predict_one.
+
+    python explain.py --check
+    python explain.py --bench
+"""
+import argparse
+import sys
+import time
+from collections import namedtuple
+
+import numpy as np
+
+from inference import TreeEngine
+
+# bias: (n_classes,) root probabilities; contributions: (n_rows, n_features,
+# n_classes); leaf: (n_rows,) node each row ends in
+Explanation = namedtuple("Explanation", ["bias", "contributions", "leaf"])
+
+
+class TreeExplainer:
+    def __init__(self, engine):
+        engine = getattr(engine, "engine", engine)  # unwrap a lookup_table.TableEngine
+        if not isinstance(engine, TreeEngine):
+            raise TypeError(f"Explanations need a decision tree, got {type(engine).__name__}")
+        self.engine = engine
+        self.classes_ = engine.classes_
+        self.feature_names_in_ = engine.feature_names_in_
+        self.node_proba = np.asarray(engine.leaf_proba)  # class probabilities of every node, not only leaves
+        self.bias = self.node_proba[0]
+        self._proba = self.node_proba.tolist()
+
+    def explain(self, X):
+        """Explanation for a 2-D batch in model feature order."""
+        engine = self.engine
+        X = engine._as_array(X)
+        rows = np.arange(len(X))
+        contributions = np.zeros((len(X), X.shape[1], self.node_proba.shape[1]))
+        node = np.zeros(len(X), dtype=np.intp)
+        for _ in range(engine.max_depth):
+            feature = engine.feature[node]
+            child = np.where(X[rows, feature] <= engine.threshold[node], engine.left[node], engine.right[node])
+            # One (row, feature) pair per row per level, so += cannot collide
+            contributions[rows, feature] += self.node_proba[child] - self.node_proba[node]
+            node = child
+        return Explanation(self.bias, contributions, node)
+
+    def explain_one(self, row):
+        """Explanation for one row; contributions is (n_features, n_classes)."""
+        engine = self.engine
+        values = engine._as_array(row).tolist()
+        proba = self._proba
+        contributions = [[0.0] * len(self.bias) for _ in values]
+        node = 0
+        while not engine._is_leaf[node]:
+            j = engine._feature[node]
+            child = engine._left[node] if values[j] <= engine._threshold[node] else engine._right[node]
+            for k, (after, before) in enumerate(zip(proba[child], proba[node])):
+                contributions[j][k] += after - before
+            node = child
+        return Explanation(self.bias, np.array(contributions), node)
+
+    def toward(self, explanation, classes):
+        """Per-feature contributions to the probability of the given class(es).
+
+        classes is one label for explain_one() output, or one label per row
+        for explain() output (e.g. the predicted classes).
+        """
+        index = np.searchsorted(self.classes_, classes)
+        contributions = explanation.contributions
+        if contributions.ndim == 2:
+            return contributions[:, index]
+        return contributions[np.arange(len(contributions)), :, index]
+
+
+def explainer_for(engine):
+    """TreeExplainer for engine, or None when the model is not a decision tree."""
+    try:
+        return TreeExplainer(engine)
+    except TypeError:
+        return None
+
+
+def _decision_path_reference(model, X, node_proba):
+    # Independent per-row version built on sklearn's decision_path
+    paths = model.decision_path(X)
+    feature = model.tree_.feature
+    out = np.zeros((X.shape[0], X.shape[1], node_proba.shape[1]))
+    for i in range(X.shape[0]):
+        nodes = paths.indices[paths.indptr[i]:paths.indptr[i + 1]]
+        nodes = np.sort(nodes)  # children always have larger ids than their parent
+        for parent, child in zip(nodes[:-1], nodes[1:]):
+            out[i, feature[parent]] += node_proba[child] - node_proba[parent]
+    return out
+
+
+def _load(data_path, artifacts_dir):
+    import pandas as pd
+
+    from artifacts import load_artifacts
+    from inference import compile_model
+    from preprocessing import Preprocessor
+
+    artifacts = load_artifacts(artifacts_dir)
+    df = pd.read_csv(data_path)
+    preprocessor = Preprocessor(artifacts)
+    X = preprocessor.transform(df[preprocessor.valid_mask(df)])
+    return artifacts.model, compile_model(artifacts.model), X
+
+
+def check(data_path="Daily_Water_Intake.csv", artifacts_dir="."):
+    """Mismatch counts for the batch and single-row paths on every row."""
+    import pandas as pd
+
+    model, engine, X = _load(data_path, artifacts_dir)
+    explainer = TreeExplainer(engine)
+    batch = explainer.explain(X)
+    reference = _decision_path_reference(model, pd.DataFrame(X, columns=model.feature_names_in_), explainer.node_proba)
+    totals = batch.bias + batch.contributions.sum(axis=1)
+    sample = range(0, len(X), 10)
+    return len(X), {
+        "leaf vs engine.apply": int((batch.leaf != engine.apply(X)).sum()),
+        "batch vs decision_path": int((~np.isclose(batch.contributions, reference).all(axis=(1, 2))).sum()),
+        "bias + contributions vs leaf proba": int((~np.isclose(totals, explainer.node_proba[batch.leaf]).all(axis=1)).sum()),
+        "single vs batch (every 10th row)": sum(
+            not np.allclose(explainer.explain_one(X[i]).contributions, batch.contributions[i]) for i in sample
+        ),
+    }
+
+
+def benchmark(data_path="Daily_Water_Intake.csv", artifacts_dir=".", repeats=5):
+    """Rows/sec over the whole dataset for each explanation path."""
+    import pandas as pd
+
+    model, engine, X = _load(data_path, artifacts_dir)
+    explainer = TreeExplainer(engine)
+
+    def _rate(fn, rows):
+        fn()
+        best = float("inf")
+        for _ in range(repeats):
+            start = time.perf_counter()
+            fn()
+            best = min(best, time.perf_counter() - start)
+        return rows / best
+
+    frame = pd.DataFrame(X, columns=model.feature_names_in_)
+    subset = X[:2000]
+    return len(X), {
+        "explain (vectorized)": _rate(lambda: explainer.explain(X), len(X)),
+        "explain_one (per row)": _rate(lambda: [explainer.explain_one(row) for row in subset], len(subset)),
+        "decision_path loop": _rate(
+            lambda: _decision_path_reference(model, frame.iloc[:2000], explainer.node_proba), len(subset)
+        ),
+        "predict only": _rate(lambda: engine.predict(X), len(X)),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Decision-path explanation utilities.")
+    parser.add_argument("--check", action="store_true", help="check against sklearn's decision_path on the dataset")
+    parser.add_argument("--bench", action="store_true", help="measure explanation throughput on the dataset")
+    parser.add_argument("--data", default="Daily_Water_Intake.csv")
+    parser.add_argument("--artifacts", default=".")
+    args = parser.parse_args(argv)
+    if not (args.check or args.bench):
+        parser.print_help()
+        return
+
+    if args.bench:
+        rows, rates = benchmark(args.data, args.artifacts)
+        print(f"{rows:,} rows")
+        for name, rate in rates.items():
+            print(f"  {name:<24} {rate:14,.0f} rows/sec")
+    if args.check:
+        rows, mismatches = check(args.data, args.artifacts)
+        print(f"{rows:,} rows checked")
+        for name, count in mismatches.items():
+            print(f"  {name} mismatches: {count}")
+        if any(mismatches.values()):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""Bounded, columnar prediction history for a Streamlit session.
+
+Each column is a typed NumPy array of 2 * capacity slots and every record is
+written twice, at i and i + capacity. The newest `capacity` records are then
+always one contiguous slice, so frame() hands out a chronological DataFrame
+built on views instead of copying, while append stays O(1) and memory is
+fixed no matter how long the session lives.
+"""
+import numpy as np
+import pandas as pd
+
+DEFAULT_CAPACITY = 500
+STATUSES = ("Good", "Poor")
+
+
+class HistoryBuffer:
+    def __init__(self, capacity=DEFAULT_CAPACITY, activities=()):
+        if capacity < 1:
+            raise ValueError("capacity must be at least 1")
+        self.capacity = capacity
+        self.activities = list(activities)
+        self._activity_codes = {name: i for i, name in enumerate(self.activities)}
+        size = 2 * capacity
+        self.time = np.zeros(size, dtype="datetime64[s]")
+        self.age = np.zeros(size, dtype=np.int16)
+        self.weight = np.zeros(size)
+        self.water_intake = np.zeros(size)
+        self.activity = np.zeros(size, dtype=np.int8)
+        self.status = np.zeros(size, dtype=np.int8)  # index into STATUSES
+        self.confidence = np.zeros(size)
+        self._next = 0  # slot in [0, capacity) the next record goes to
+        self._len = 0
+        # Running aggregates: over the whole session and over the kept window
+        self.total = 0
+        self.good_total = 0
+        self.good_in_window = 0
+
+    def __len__(self):
+        return self._len
+
+    def __bool__(self):
+        return self._len > 0
+
+    def append(self, when, age, weight, water_intake, activity, status, confidence):
+        """Record one prediction; evicts the oldest once the buffer is full."""
+        i = self._next
+        status_code = STATUSES.index(status)
+        good = status_code == 0
+        if self._len == self.capacity:
+            self.good_in_window -= int(self.status[i] == 0)
+        else:
+            self._len += 1
+        code = self._activity_codes.get(activity)
+        if code is None:
+            code = self._activity_codes[activity] = len(self.activities)
+            self.activities.append(activity)
+        for j in (i, i + self.capacity):
+            self.time[j] = np.datetime64(when, "s")
+            self.age[j] = age
+            self.weight[j] = weight
+            self.water_intake[j] = water_intake
+            self.activity[j] = code
+            self.status[j] = status_code
+            self.confidence[j] = confidence
+        self._next = (i + 1) % self.capacity
+        self.total += 1
+        self.good_total += good
+        self.good_in_window += good
+
+    def success_rate(self):
+        """Share of Good predictions over the whole session (0-1), None if empty."""
+        return self.good_total / self.total if self.total else None
+
+    def _window(self):
+        # Oldest kept record sits at _next once the buffer has wrapped
+        start = self._next if self._len == self.capacity else 0
+        return slice(start, start + self._len)
+
+    def frame(self):
+        """Chronological DataFrame of the kept records.
+
+        Numeric and time columns are views into the buffer; the two
+        categorical columns wrap their int8 codes.
+        """
+        w = self._window()
+        return pd.DataFrame({
+            "Time": self.time[w],
+            "Age": self.age[w],
+            "Weight": self.weight[w],
+            "Water Intake": self.water_intake[w],
+            "Activity": pd.Categorical.from_codes(self.activity[w], categories=self.activities),
+            "Status": pd.Categorical.from_codes(self.status[w], categories=STATUSES),
+            "Confidence": self.confidence[w],
+        }, copy=False)
+
+    @property
+    def nbytes(self):
+        return sum(a.nbytes for a in (
+            self.time, self.age, self.weight, self.water_intake, self.activity, self.status, self.confidence
+        ))
@@ -0,0 +1,312 @@
+"""Persistent, multi-user prediction history in SQLite.
+
+Records are queued by the app and written in batches by a background thread,
+each batch in one transaction. A per-user summary row (total / Good counts)
+is updated in the same transaction, so the sidebar metrics are a primary-key
+lookup no matter how many predictions are stored. The database runs in WAL
+mode so readers never block the writer. A batch that fails to write (locked
+database, full disk...) is retried a few times, then dropped and logged; the
+writer keeps running either way.
+
+    python history_store.py --bench 10000000 --db /tmp/bench.db
+"""
+import argparse
+import atexit
+import os
+import queue
+import sqlite3
+import sys
+import threading
+import datetime
+import time
+from collections import namedtuple
+from contextlib import contextmanager
+
+DEFAULT_DB = "hydration_history.db"
+DB_ENV = "HYDRATION_DB"
+ALL_USERS = "*"
+WRITE_RETRIES = 3
+CLOSE_TIMEOUT = 10.0  # seconds close() waits for queued records at exit
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS predictions (
+    id INTEGER PRIMARY KEY,
+    user_id TEXT NOT NULL,
+    ts REAL NOT NULL,
+    age INTEGER,
+    weight REAL,
+    water_intake REAL,
+    activity TEXT,
+    status TEXT NOT NULL,
+    confidence REAL
+);
+CREATE INDEX IF NOT EXISTS idx_predictions_user_ts ON predictions (user_id, ts, status);
+CREATE INDEX IF NOT EXISTS idx_predictions_user_status ON predictions (user_id, status, ts);
+CREATE TABLE IF NOT EXISTS user_stats (
+    user_id TEXT PRIMARY KEY,
+    total INTEGER NOT NULL,
+    good INTEGER NOT NULL
+);
+"""
+
+INSERT_SQL = (
+    "INSERT INTO predictions (user_id, ts, age, weight, water_intake, activity, status, confidence) "
+    "VALUES (?, ?, ?, ?, ?, ?, ?, ?)"
+)
+UPSERT_STATS_SQL = (
+    "INSERT INTO user_stats (user_id, total, good) VALUES (?, ?, ?) "
+    "ON CONFLICT(user_id) DO UPDATE SET total = total + excluded.total, good = good + excluded.good"
+)
+
+Stats = namedtuple("Stats", ["total", "good"])
+
+
+def _connect(path):
+    conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    return conn
+
+
+def _log(message):
+    print(f"[history {datetime.datetime.now():%H:%M:%S}] {message}", file=sys.stderr)
+
+
+class ConnectionPool:
+    """Small pool of connections for one process; reopened after a fork."""
+
+    def __init__(self, path, size=4):
+        self.path = path
+        self.size = size
+        self._pid = os.getpid()
+        self._idle = queue.LifoQueue()
+        self._lock = threading.Lock()
+        self._opened = 0
+
+    @contextmanager
+    def connection(self):
+        if os.getpid() != self._pid:
+            # Connections must not cross a fork; start a fresh pool in the child
+            self.__init__(self.path, self.size)
+        conn = self._acquire()
+        try:
+            yield conn
+        finally:
+            self._idle.put(conn)
+
+    def _acquire(self):
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+        with self._lock:
+            if self._opened < self.size:
+                self._opened += 1
+                return _connect(self.path)
+        return self._idle.get()
+
+    def close(self):
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                break
+
+
+class HistoryStore:
+    def __init__(self, path=DEFAULT_DB, pool_size=4, batch_size=256, flush_interval=0.2, retries=WRITE_RETRIES):
+        self.path = path
+        self.pool = ConnectionPool(path, pool_size)
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.retries = retries
+        self.dropped = 0  # records lost to failed batches
+        with self.pool.connection() as conn:
+            conn.executescript(SCHEMA)
+        self._queue = queue.Queue()
+        self._writer = threading.Thread(target=self._write_loop, name="history-writer", daemon=True)
+        self._writer.start()
+        self._closed = False
+        atexit.register(self.close)  # don't drop queued records on interpreter exit
+
+    # ======= WRITES =======
+    def record(self, user_id, when, age, weight, water_intake, activity, status, confidence):
+        """Queue one prediction; it is written by the background thread."""
+        ts = when.timestamp() if hasattr(when, "timestamp") else float(when)
+        self._queue.put((user_id, ts, age, weight, water_intake, activity, status, confidence))
+
+    def flush(self, timeout=None):
+        """Wait until every record queued so far has been handled; False if timeout ran out first.
+
+        A marker event goes through the queue behind the records; the writer
+        sets it once everything ahead of it is written (or dropped).
+        """
+        done = threading.Event()
+        self._queue.put(done)
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while not done.is_set():
+            if not self._writer.is_alive():
+                return False
+            remaining = 1.0 if deadline is None else min(deadline - time.monotonic(), 1.0)
+            if remaining <= 0:
+                return False
+            done.wait(remaining)
+        return True
+
+    def close(self, timeout=CLOSE_TIMEOUT):
+        if self._closed:
+            return
+        self._closed = True
+        deadline = time.monotonic() + timeout
+        if not self.flush(timeout):
+            _log(f"close: gave up on about {self._queue.qsize()} queued record(s) after {timeout:g}s")
+        self._queue.put(None)
+        self._writer.join(max(deadline - time.monotonic(), 0))
+        self.pool.close()
+
+    def _write_loop(self):
+        # Items are records, flush() markers (events) or None to stop
+        stop = False
+        while not stop:
+            item = self._queue.get()
+            batch, flushed = [], []
+            deadline = time.monotonic() + self.flush_interval
+            while True:
+                if item is None:
+                    stop = True
+                    break
+                if isinstance(item, threading.Event):
+                    flushed.append(item)
+                    break
+                batch.append(item)
+                if len(batch) >= self.batch_size:
+                    break
+                try:
+                    item = self._queue.get(timeout=max(deadline - time.monotonic(), 0))
+                except queue.Empty:
+                    break
+            if batch:
+                self._write_with_retry(batch)
+            for done in flushed:
+                done.set()
+
+    def _write_with_retry(self, batch):
+        for attempt in range(self.retries + 1):
+            try:
+                self.write_batch(batch)
+                return
+            except Exception as e:
+                if attempt == self.retries:
+                    self.dropped += len(batch)
+                    _log(f"dropped {len(batch)} record(s) after {attempt + 1} failed writes: {e!r}")
+                    return
+                time.sleep(0.1 * 2 ** attempt)
+
+    def write_batch(self, rows):
+        """Insert rows and update the per-user summaries in one transaction."""
+        stats = {}
+        for row in rows:
+            for user in (row[0], ALL_USERS):
+                total, good = stats.get(user, (0, 0))
+                stats[user] = (total + 1, good + (row[6] == "Good"))
+        with self.pool.connection() as conn:
+            with conn:
+                conn.executemany(INSERT_SQL, rows)
+                conn.executemany(UPSERT_STATS_SQL, [(user, t, g) for user, (t, g) in stats.items()])
+
+    # ======= READS =======
+    def user_stats(self, user_id=ALL_USERS):
+        """(total, good) for a user, or for everyone by default; O(1)."""
+        with self.pool.connection() as conn:
+            row = conn.execute("SELECT total, good FROM user_stats WHERE user_id = ?", (user_id,)).fetchone()
+        return Stats(*row) if row else Stats(0, 0)
+
+    def range_stats(self, user_id, start, end):
+        """(total, good) for a user's predictions with start <= ts < end."""
+        with self.pool.connection() as conn:
+            total = conn.execute(
+                "SELECT COUNT(*) FROM predictions WHERE user_id = ? AND ts >= ? AND ts < ?",
+                (user_id, start, end),
+            ).fetchone()[0]
+            good = conn.execute(
+                "SELECT COUNT(*) FROM predictions WHERE user_id = ? AND status = 'Good' AND ts >= ? AND ts < ?",
+                (user_id, start, end),
+            ).fetchone()[0]
+        return Stats(total, good)
+
+    def recent(self, user_id, limit=100):
+        """Latest predictions for a user, newest first."""
+        with self.pool.connection() as conn:
+            return conn.execute(
+                "SELECT ts, age, weight, water_intake, activity, status, confidence FROM predictions "
+                "WHERE user_id = ? ORDER BY ts DESC LIMIT ?",
+                (user_id, limit),
+            ).fetchall()
+
+
+# ======= BENCHMARK =======
+def benchmark(path, rows, users=1000, chunk=100_000, queries=2000, seed=0):
+    import random
+
+    for suffix in ("", "-wal", "-shm"):
+        if os.path.exists(path + suffix):
+            os.remove(path + suffix)
+    store = HistoryStore(path)
+    record = store.record
+    rng = random.Random(seed)
+    activities = ["High", "Low", "Moderate"]
+    now = time.time()
+    insert_s = 0.0
+    written = 0
+    while written < rows:
+        n = min(chunk, rows - written)
+        batch = [
+            (f"user{rng.randrange(users)}", now - rng.random() * 86400 * 365, rng.randint(18, 70),
+             rng.uniform(45, 110), round(rng.uniform(1.5, 5.5), 2), rng.choice(activities),
+             "Good" if rng.random() < 0.8 else "Poor", 100.0)
+            for _ in range(n)
+        ]
+        # Through the public queue and the background writer, as the app does
+        start_chunk = time.perf_counter()
+        for row in batch:
+            record(*row)
+        store.flush()
+        insert_s += time.perf_counter() - start_chunk
+        written += n
+
+    def _timed(fn):
+        t0 = time.perf_counter()
+        for _ in range(queries):
+            fn()
+        return (time.perf_counter() - t0) / queries * 1e6
+
+    week = 7 * 86400
+    results = {
+        "rows": rows,
+        "insert_rows_per_s": rows / insert_s,
+        "user_stats_us": _timed(lambda: store.user_stats(f"user{rng.randrange(users)}")),
+        "global_stats_us": _timed(lambda: store.user_stats()),
+        "week_range_stats_us": _timed(lambda: store.range_stats(f"user{rng.randrange(users)}", now - week, now)),
+        "recent_20_us": _timed(lambda: store.recent(f"user{rng.randrange(users)}", 20)),
+    }
+    store.close()
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Prediction history store utilities.")
+    parser.add_argument("--bench", type=int, metavar="ROWS", help="benchmark with this many stored predictions")
+    parser.add_argument("--db", default="history_bench.db", help="database file for the benchmark (recreated)")
+    parser.add_argument("--users", type=int, default=1000)
+    args = parser.parse_args(argv)
+    if not args.bench:
+        parser.print_help()
+        return
+    results = benchmark(args.db, args.bench, args.users)
+    print(f"{results['rows']:,} rows inserted at {results['insert_rows_per_s']:,.0f} rows/s")
+    for name in ("user_stats_us", "global_stats_us", "week_range_stats_us", "recent_20_us"):
+        print(f"  {name[:-3]:<18} {results[name]:10.1f} us/query")
+
+
+if __name__ == "__main__":
+    main()
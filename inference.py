@@ -0,0 +1,211 @@
+"""Single-pass inference: predicted class and confidence from one model walk.
+
+A fitted DecisionTreeClassifier is flattened into plain NumPy node arrays so
+one traversal yields both the class and its max probability, without going
+through sklearn's input validation twice. Other models fall back to a single
+predict_proba call.
+
+Parity check against sklearn on the full dataset (also tests/test_inference.py):
+    python inference.py --check
+"""
+import argparse
+import sys
+
+import numpy as np
+
+DEFAULT_CONFIDENCE = 0.85  # same fallback app.py shows for models without predict_proba
+
+
+class TreeEngine:
+    # Node arrays that fully describe the engine; see from_arrays / shared_model.py
+    ARRAYS = ("feature", "threshold", "left", "right", "is_leaf", "leaf_proba", "leaf_class", "leaf_confidence")
+
+    def __init__(self, model):
+        tree = model.tree_
+        value = tree.value[:, 0, :]
+        proba = value / value.sum(axis=1, keepdims=True)
+
+        # Leaves point back at themselves so a batch can take max_depth
+        # steps without masking rows that already reached a leaf.
+        is_leaf = tree.children_left == -1
+        nodes = np.arange(tree.node_count)
+        self._setup(
+            model.classes_,
+            tree.max_depth,
+            feature=np.where(is_leaf, 0, tree.feature).astype(np.intp),
+            threshold=np.where(is_leaf, 0.0, tree.threshold),
+            left=np.where(is_leaf, nodes, tree.children_left).astype(np.intp),
+            right=np.where(is_leaf, nodes, tree.children_right).astype(np.intp),
+            is_leaf=is_leaf,
+            leaf_proba=proba,
+            leaf_class=model.classes_[proba.argmax(axis=1)],
+            leaf_confidence=proba.max(axis=1),
+            feature_names_in_=getattr(model, "feature_names_in_", None),
+            feature_importances_=getattr(model, "feature_importances_", None),
+            private=True,
+        )
+        self.tree = tree
+
+    @classmethod
+    def from_arrays(cls, classes, max_depth, feature_names_in_=None, feature_importances_=None, **arrays):
+        """Build an engine directly from node arrays (e.g. read-only memory maps).
+
+        The arrays are used as given, without copies: the one-row walk reads
+        them in place and batches use the NumPy walk, since there is no
+        sklearn Tree to delegate to.
+        """
+        engine = cls.__new__(cls)
+        engine._setup(classes, max_depth, feature_names_in_=feature_names_in_,
+                      feature_importances_=feature_importances_, private=False, **arrays)
+        engine.tree = None
+        return engine
+
+    def _setup(self, classes, max_depth, feature_names_in_, feature_importances_, private, **arrays):
+        self.classes_ = classes
+        self.max_depth = int(max_depth)
+        self.feature_names_in_ = feature_names_in_
+        self.feature_importances_ = feature_importances_
+        for name in self.ARRAYS:
+            setattr(self, name, arrays[name])
+        self.n_nodes = len(self.feature)
+
+        names = ("feature", "threshold", "left", "right", "is_leaf", "leaf_class", "leaf_confidence")
+        if private:
+            # Plain lists are faster than NumPy scalars for the one-row walk,
+            # but each one is a copy; only worth it for arrays we own anyway
+            walk = [getattr(self, name).tolist() for name in names]
+        else:
+            # Base-class views skip np.memmap's per-item overhead; no copies
+            walk = [np.asarray(getattr(self, name)) for name in names]
+        (self._feature, self._threshold, self._left, self._right, self._is_leaf,
+         self._leaf_class, self._leaf_confidence) = walk
+
+    def _as_array(self, X):
+        # sklearn casts inputs to float32 before comparing against thresholds
+        return np.asarray(X, dtype=np.float32)
+
+    def apply(self, X):
+        """Leaf index reached by each row of X."""
+        X = self._as_array(X)
+        if self.tree is not None:
+            # sklearn's compiled walk, minus the estimator's input validation
+            return self.tree.apply(np.ascontiguousarray(X))
+        return self.walk(X)
+
+    def walk(self, X):
+        """NumPy-only batch walk over the flattened node arrays."""
+        X = self._as_array(X)
+        rows = np.arange(len(X))
+        node = np.zeros(len(X), dtype=np.intp)
+        for _ in range(self.max_depth):
+            go_left = X[rows, self.feature[node]] <= self.threshold[node]
+            node = np.where(go_left, self.left[node], self.right[node])
+        return node
+
+    def predict(self, X):
+        """Return (classes, confidences) for a 2-D batch in model feature order."""
+        leaf = self.apply(X)
+        return self.leaf_class[leaf], self.leaf_confidence[leaf]
+
+    def predict_one(self, row):
+        """Return (class, confidence) for a single row of feature values."""
+        values = self._as_array(row).tolist()
+        node = 0
+        left, right, is_leaf = self._left, self._right, self._is_leaf
+        while not is_leaf[node]:
+            if values[self._feature[node]] <= self._threshold[node]:
+                node = left[node]
+            else:
+                node = right[node]
+        return self._leaf_class[node], float(self._leaf_confidence[node])
+
+
+class ProbaEngine:
+    """Fallback for non-tree models: one predict_proba call per batch."""
+
+    def __init__(self, model):
+        self.model = model
+        self.classes_ = getattr(model, "classes_", None)
+        self.feature_names_in_ = getattr(model, "feature_names_in_", None)
+        self.feature_importances_ = getattr(model, "feature_importances_", None)
+
+    def _frame(self, X):
+        # Keep feature names so sklearn does not warn about bare arrays
+        if self.feature_names_in_ is not None and isinstance(X, np.ndarray):
+            import pandas as pd
+
+            return pd.DataFrame(X, columns=self.feature_names_in_)
+        return X
+
+    def predict(self, X):
+        X = self._frame(X)
+        if hasattr(self.model, "predict_proba"):
+            proba = self.model.predict_proba(X)
+            return self.model.classes_[proba.argmax(axis=1)], proba.max(axis=1)
+        prediction = np.asarray(self.model.predict(X))
+        return prediction, np.full(len(prediction), DEFAULT_CONFIDENCE)
+
+    def predict_one(self, row):
+        classes, confidence = self.predict(np.asarray(row, dtype=np.float64).reshape(1, -1))
+        return classes[0], float(confidence[0])
+
+
+def compile_model(model):
+    """Return the fastest engine that reproduces model.predict / predict_proba."""
+    tree = getattr(model, "tree_", None)
+    if tree is not None and hasattr(model, "classes_") and tree.n_outputs == 1:
+        return TreeEngine(model)
+    return ProbaEngine(model)
+
+
+def check_parity(data_path="Daily_Water_Intake.csv", artifacts_dir="."):
+    """Compare the engine with sklearn's predict / predict_proba on every row."""
+    import pandas as pd
+
+    from artifacts import load_artifacts
+    from preprocessing import encode_frame, valid_rows
+
+    artifacts = load_artifacts(artifacts_dir)
+    df = pd.read_csv(data_path)
+    encoded = encode_frame(df[valid_rows(df, artifacts)], artifacts)
+    model = artifacts.model
+    engine = compile_model(model)
+
+    expected_class = model.predict(encoded)
+    expected_conf = model.predict_proba(encoded).max(axis=1)
+    classes, confidence = engine.predict(encoded)
+
+    X = encoded.to_numpy()
+    single = [engine.predict_one(row) for row in X]
+    single_class = np.array([c for c, _ in single])
+    single_conf = np.array([p for _, p in single])
+
+    mismatches = {
+        "batch class": int((classes != expected_class).sum()),
+        "batch confidence": int((~np.isclose(confidence, expected_conf)).sum()),
+        "single class": int((single_class != expected_class).sum()),
+        "single confidence": int((~np.isclose(single_conf, expected_conf)).sum()),
+    }
+    return type(engine).__name__, len(X), mismatches
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Single-pass inference engine utilities.")
+    parser.add_argument("--check", action="store_true", help="check parity with sklearn on the dataset")
+    parser.add_argument("--data", default="Daily_Water_Intake.csv")
+    parser.add_argument("--artifacts", default=".")
+    args = parser.parse_args(argv)
+    if not args.check:
+        parser.print_help()
+        return
+
+    engine_name, rows, mismatches = check_parity(args.data, args.artifacts)
+    print(f"{engine_name}: {rows:,} rows checked")
+    for name, count in mismatches.items():
+        print(f"  {name} mismatches: {count}")
+    if any(mismatches.values()):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""Load generator for server.py: p50/p99 latency and throughput on localhost.
+
+    python server.py &
+    python loadgen.py --concurrency 64 --requests 20000
+"""
+import argparse
+import asyncio
+import json
+import random
+import time
+
+import pandas as pd
+
+from artifacts import FEATURE_COLUMNS
+
+
+def percentile(sorted_values, q):
+    if not sorted_values:
+        return float("nan")
+    k = min(len(sorted_values) - 1, max(0, round(q / 100 * (len(sorted_values) - 1))))
+    return sorted_values[k]
+
+
+def build_payloads(data_path, batch_size, count=1000, seed=0):
+    records = pd.read_csv(data_path)[FEATURE_COLUMNS].to_dict("records")
+    rng = random.Random(seed)
+    if batch_size == 1:
+        return [json.dumps(rng.choice(records)).encode() for _ in range(count)]
+    return [json.dumps({"records": rng.sample(records, batch_size)}).encode() for _ in range(count)]
+
+
+async def _client(host, port, path, payloads, remaining, latencies, errors):
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        while remaining[0] > 0:
+            remaining[0] -= 1
+            body = random.choice(payloads)
+            request = (
+                f"POST {path} HTTP/1.1\r\nHost: {host}\r\n"
+                f"Content-Type: application/json\r\nContent-Length: {len(body)}\r\n\r\n"
+            ).encode() + body
+            start = time.perf_counter()
+            writer.write(request)
+            await writer.drain()
+            status = await reader.readline()
+            length = 0
+            while True:
+                line = await reader.readline()
+                if line in (b"\r\n", b""):
+                    break
+                name, _, value = line.decode("latin-1").partition(":")
+                if name.lower() == "content-length":
+                    length = int(value)
+            await reader.readexactly(length)
+            latencies.append(time.perf_counter() - start)
+            if b" 200 " not in status:
+                errors[0] += 1
+    finally:
+        writer.close()
+
+
+async def run_load(host, port, payloads, total, concurrency, path):
+    latencies, errors, remaining = [], [0], [total]
+    start = time.perf_counter()
+    await asyncio.gather(*(
+        _client(host, port, path, payloads, remaining, latencies, errors)
+        for _ in range(concurrency)
+    ))
+    return latencies, errors[0], time.perf_counter() - start
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Drive server.py and report latency percentiles.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8502)
+    parser.add_argument("--requests", type=int, default=10_000)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--batch-size", type=int, default=1, help="records per request; >1 uses /predict/batch")
+    parser.add_argument("--data", default="Daily_Water_Intake.csv")
+    args = parser.parse_args(argv)
+
+    payloads = build_payloads(args.data, args.batch_size)
+    path = "/predict" if args.batch_size == 1 else "/predict/batch"
+    latencies, errors, elapsed = asyncio.run(
+        run_load(args.host, args.port, payloads, args.requests, args.concurrency, path)
+    )
+    latencies.sort()
+    done = len(latencies)
+    print(f"{done:,} requests ({done * args.batch_size:,} predictions) in {elapsed:.2f}s, {errors} errors")
+    print(f"throughput: {done / elapsed:,.0f} req/s, {done * args.batch_size / elapsed:,.0f} predictions/s")
+    print(f"latency: p50 {percentile(latencies, 50) * 1000:.2f}ms, p99 {percentile(latencies, 99) * 1000:.2f}ms")
+
+
+if __name__ == "__main__":
+    main()
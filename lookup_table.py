@@ -0,0 +1,270 @@
+"""Exhaustive (class, confidence) lookup table over the app's input domain.
+
+A decision tree only looks at which interval between its split thresholds a
+feature value falls into. Each feature's thresholds give an interval index,
+and the intervals reachable from the input form in app.py are enumerated
+once into a dense table. An interactive prediction then costs one
+searchsorted per feature plus one array index.
+
+The table is saved next to the artifacts and tagged with the artifacts'
+version (a fingerprint of every artifact file), so it is rebuilt whenever
+best_model.pkl (or the scaler / encoders) changes:
+    python lookup_table.py            # build or refresh the table
+    python lookup_table.py --check    # compare against the inference engine
+"""
+import argparse
+import bisect
+import os
+import sys
+
+import numpy as np
+
+from artifacts import FORM_LIMITS, artifacts_version, categorical_encoders, load_artifacts
+from inference import TreeEngine, compile_model
+from preprocessing import Preprocessor
+
+TABLE_FILE = "prediction_table.npz"
+TABLE_FORMAT = 1
+MAX_TABLE_CELLS = 50_000_000
+
+TABLE_ENV = "HYDRATION_LOOKUP_TABLE"
+
+
+def _widget_values(limit):
+    """Every value a numeric widget can take, from its min, max and step."""
+    steps = np.arange(round(limit.min / limit.step), round(limit.max / limit.step) + 1)
+    return np.round(steps * float(limit.step), 6)
+
+
+# Numeric widget domains of the input form in app.py
+FORM_DOMAIN = {col: _widget_values(limit) for col, limit in FORM_LIMITS.items()}
+
+
+def _raw_intervals(thresholds, values):
+    # The tree sends float32(x) <= threshold left, so x lands in interval
+    # "number of thresholds strictly below float32(x)".
+    x = np.asarray(values, dtype=np.float32).astype(np.float64)
+    return np.searchsorted(thresholds, x, side="left")
+
+
+class PredictionTable:
+    def __init__(self, thresholds, interval_maps, table_class, table_confidence, classes, version):
+        self.thresholds = thresholds
+        self.interval_maps = interval_maps
+        self.table_class = table_class
+        self.table_confidence = table_confidence
+        self.classes = classes
+        self.version = version
+        self.n_features = len(thresholds)
+        self._thresholds = [t.astype(np.float64) for t in thresholds]
+
+        # Plain lists and a flat index keep the one-row lookup in pure Python
+        self._threshold_lists = [t.tolist() for t in self._thresholds]
+        self._interval_lists = [m.tolist() for m in interval_maps]
+        self._strides = [s // table_class.itemsize for s in table_class.strides]
+        self._flat_class = classes[table_class.ravel()].tolist()
+        self._flat_confidence = table_confidence.ravel().tolist()
+
+    @classmethod
+    def build(cls, artifacts, version=""):
+        model = artifacts.model
+        engine = compile_model(model)
+        if not isinstance(engine, TreeEngine):
+            raise TypeError(f"Lookup tables need a decision tree, got {type(model).__name__}")
+        preprocessor = Preprocessor(artifacts)
+        tree = model.tree_
+
+        domain = dict(FORM_DOMAIN)
+        for col, le in categorical_encoders(artifacts).items():
+            domain[col] = np.asarray(le.classes_)
+        raw = {col: domain[col] for col in preprocessor.feature_names}
+        n = max(len(v) for v in raw.values())
+        # Encode every widget value once; columns are padded to a common length
+        padded = {col: np.resize(v, n) for col, v in raw.items()}
+        encoded = preprocessor.transform(padded)
+
+        thresholds, interval_maps, reps = [], [], []
+        for j, col in enumerate(preprocessor.feature_names):
+            values = encoded[: len(raw[col]), j]
+            thr = np.unique(tree.threshold[tree.feature == j])
+            intervals = _raw_intervals(thr, values)
+            reachable, first = np.unique(intervals, return_index=True)
+            # Map raw interval index -> dense table axis index (-1: not reachable)
+            mapping = np.full(len(thr) + 1, -1, dtype=np.int32)
+            mapping[reachable] = np.arange(len(reachable), dtype=np.int32)
+            thresholds.append(thr)
+            interval_maps.append(mapping)
+            reps.append(values[first])
+
+        shape = tuple(len(r) for r in reps)
+        cells = int(np.prod(shape))
+        if cells > MAX_TABLE_CELLS:
+            raise ValueError(f"Lookup table would need {cells:,} cells (limit {MAX_TABLE_CELLS:,})")
+        grid = np.stack([g.ravel() for g in np.meshgrid(*reps, indexing="ij")], axis=1)
+        leaf = engine.apply(grid)
+        class_index = engine.leaf_proba.argmax(axis=1)[leaf]
+        table_class = class_index.astype(np.int8).reshape(shape)
+        table_confidence = engine.leaf_confidence[leaf].reshape(shape)
+        return cls(thresholds, interval_maps, table_class, table_confidence, engine.classes_, version)
+
+    def save(self, path):
+        arrays = {
+            "format": np.array(TABLE_FORMAT),
+            "version": np.array(self.version),
+            "classes": self.classes,
+            "table_class": self.table_class,
+            "table_confidence": self.table_confidence,
+        }
+        for j in range(self.n_features):
+            arrays[f"thresholds_{j}"] = self.thresholds[j]
+            arrays[f"interval_map_{j}"] = self.interval_maps[j]
+        tmp = path + ".tmp.npz"
+        np.savez(tmp, **arrays)
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path, allow_pickle=False) as data:
+            if int(data["format"]) != TABLE_FORMAT:
+                raise ValueError(f"Unsupported lookup table format in {path}")
+            n_features = data["table_class"].ndim
+            return cls(
+                [data[f"thresholds_{j}"] for j in range(n_features)],
+                [data[f"interval_map_{j}"] for j in range(n_features)],
+                data["table_class"],
+                data["table_confidence"],
+                data["classes"],
+                str(data["version"]),
+            )
+
+    def index(self, X):
+        """Dense table index of each row of X, and a mask of rows the table covers."""
+        X = np.atleast_2d(X)
+        idx = np.empty((len(X), self.n_features), dtype=np.intp)
+        for j in range(self.n_features):
+            idx[:, j] = self.interval_maps[j][_raw_intervals(self._thresholds[j], X[:, j])]
+        hit = (idx >= 0).all(axis=1)
+        return idx, hit
+
+    def lookup(self, X):
+        """Return (classes, confidences, hit) for a batch; misses are undefined where ~hit."""
+        idx, hit = self.index(X)
+        cell = tuple(np.where(hit, idx[:, j], 0) for j in range(self.n_features))
+        return self.classes[self.table_class[cell]], self.table_confidence[cell], hit
+
+    def lookup_one(self, row):
+        """Return (class, confidence) for one row, or None if it is outside the table."""
+        values = np.asarray(row, dtype=np.float32).tolist()
+        offset = 0
+        for thresholds, intervals, stride, value in zip(
+            self._threshold_lists, self._interval_lists, self._strides, values
+        ):
+            i = intervals[bisect.bisect_left(thresholds, value)]
+            if i < 0:
+                return None
+            offset += i * stride
+        return self._flat_class[offset], self._flat_confidence[offset]
+
+
+class TableEngine:
+    """Engine that answers single rows from the lookup table.
+
+    Batches and rows outside the table go to the wrapped tree engine, whose
+    compiled walk is faster than per-feature searchsorted over many rows.
+    """
+
+    def __init__(self, table, engine):
+        self.table = table
+        self.engine = engine
+        self.classes_ = engine.classes_
+        self.feature_names_in_ = engine.feature_names_in_
+        self.feature_importances_ = engine.feature_importances_
+
+    def predict_one(self, row):
+        hit = self.table.lookup_one(row)
+        return hit if hit is not None else self.engine.predict_one(row)
+
+    def predict(self, X):
+        return self.engine.predict(X)
+
+
+def load_or_build(artifacts, base_dir=".", path=None):
+    """Load the saved table if it matches the current artifacts, else rebuild it."""
+    path = path or os.path.join(base_dir, TABLE_FILE)
+    version = artifacts_version(base_dir)
+    if os.path.exists(path):
+        try:
+            table = PredictionTable.load(path)
+            if table.version == version:
+                return table
+        except (OSError, ValueError, KeyError):
+            pass
+    table = PredictionTable.build(artifacts, version=version)
+    try:
+        table.save(path)
+    except OSError:
+        pass  # read-only deployments keep the in-memory table
+    return table
+
+
+def load_engine(artifacts, base_dir=".", use_table=None):
+    """Compiled engine, wrapped in a TableEngine if use_table (default: HYDRATION_LOOKUP_TABLE is set).
+
+    Off by default: lookup_one (~4us) is slower than the compiled tree walk
+    (~2us), and rows off the form's grid pay for both.
+    """
+    engine = compile_model(artifacts.model)
+    if use_table is None:
+        use_table = bool(os.environ.get(TABLE_ENV))
+    if use_table and isinstance(engine, TreeEngine):
+        return TableEngine(load_or_build(artifacts, base_dir), engine)
+    return engine
+
+
+def check_table(table, artifacts, data_path="Daily_Water_Intake.csv", samples=200_000, seed=0):
+    """Compare the table with the tree walk on the dataset and on random form inputs.
+
+    Returns {name: (rows, outside the table, mismatches)}. Dataset rows may
+    fall outside the table (their intakes are not on the 0.5 L grid); form
+    inputs never should.
+    """
+    import pandas as pd
+
+    preprocessor = Preprocessor(artifacts)
+    engine = compile_model(artifacts.model)
+    df = pd.read_csv(data_path)
+
+    rng = np.random.default_rng(seed)
+    sample = {col: rng.choice(values, samples) for col, values in FORM_DOMAIN.items()}
+    for col, le in categorical_encoders(artifacts).items():
+        sample[col] = rng.choice(le.classes_, samples)
+
+    results = {}
+    for name, frame in (("dataset", df[preprocessor.valid_mask(df)]), ("form inputs", pd.DataFrame(sample))):
+        X = preprocessor.transform(frame)
+        classes, confidence, hit = table.lookup(X)
+        expected_class, expected_conf = engine.predict(X)
+        ok = (classes == expected_class) & np.isclose(confidence, expected_conf)
+        results[name] = (len(X), int((~hit).sum()), int((hit & ~ok).sum()))
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build or check the prediction lookup table.")
+    parser.add_argument("--artifacts", default=".", help="directory holding the .pkl artifacts")
+    parser.add_argument("--check", action="store_true", help="compare the table with the tree walk")
+    args = parser.parse_args(argv)
+
+    artifacts = load_artifacts(args.artifacts)
+    table = load_or_build(artifacts, args.artifacts)
+    print(f"Lookup table {table.version[:12]}: shape {table.table_class.shape}, {table.table_class.size:,} cells")
+    if args.check:
+        results = check_table(table, artifacts)
+        for name, (rows, misses, mismatches) in results.items():
+            print(f"  {name}: {rows:,} rows, {misses:,} outside the table, {mismatches} mismatches")
+        if any(mismatches for _, _, mismatches in results.values()) or results["form inputs"][1]:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
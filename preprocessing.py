@@ -0,0 +1,174 @@
+import numpy as np
+import pandas as pd
+
+from artifacts import FEATURE_COLUMNS, categorical_encoders
+
+
+def to_float(values):
+    """values as a float64 array; anything that does not parse as a number is NaN."""
+    return pd.to_numeric(pd.Series(values, copy=False), errors="coerce").astype(np.float64).to_numpy()
+
+
+def valid_rows(df, artifacts):
+    """Boolean mask of rows whose inputs the encoders and scaler can handle."""
+    mask = df[FEATURE_COLUMNS].notna().all(axis=1).to_numpy()
+    encoders = categorical_encoders(artifacts)
+    for col in FEATURE_COLUMNS:
+        if col in encoders:
+            mask = mask & df[col].isin(encoders[col].classes_).to_numpy()
+        else:
+            mask = mask & np.isfinite(to_float(df[col]))
+    return mask
+
+
+def encode_frame(df, artifacts):
+    """Encode, scale and reorder raw input rows the same way app.py does.
+
+    All rows must be valid (see valid_rows); the result is a DataFrame in
+    model.feature_names_in_ order, ready for predict / predict_proba.
+    """
+    encoded = df[FEATURE_COLUMNS].copy()
+    for col, le in categorical_encoders(artifacts).items():
+        encoded[col] = le.transform(encoded[col])
+
+    num_cols = list(artifacts.scaler.feature_names_in_)
+    encoded[num_cols] = artifacts.scaler.transform(encoded[num_cols].apply(to_float))
+    return encoded.reindex(columns=artifacts.model.feature_names_in_)
+
+
+
+class Preprocessor:
+    """Array-based replacement for the DataFrame / LabelEncoder / MinMaxScaler chain.
+
+    Built once from the loaded artifacts: categoricals become dict lookups
+    (LabelEncoder codes are positions in the sorted classes_), scaled columns
+    keep the scaler's scale_ / min_ vectors, and every row is written straight
+    into a float64 array in model.feature_names_in_ order. Results are
+    identical to encode_frame.
+    """
+
+    def __init__(self, artifacts):
+        scaler = artifacts.scaler
+        scaled = list(scaler.feature_names_in_)
+        self._setup({
+            "feature_names": list(artifacts.model.feature_names_in_),
+            "categories": {col: le.classes_.tolist() for col, le in categorical_encoders(artifacts).items()},
+            "scaling": {
+                col: [float(scaler.scale_[k]), float(scaler.min_[k])] for k, col in enumerate(scaled)
+            },
+            "clip": bool(getattr(scaler, "clip", False)),
+            "feature_range": [float(v) for v in scaler.feature_range],
+        })
+
+    @classmethod
+    def from_spec(cls, spec):
+        """Rebuild a Preprocessor from spec() output without any sklearn objects."""
+        pre = cls.__new__(cls)
+        pre._setup(spec)
+        return pre
+
+    def spec(self):
+        """JSON-serializable description of this preprocessor."""
+        return self._spec
+
+    def _setup(self, spec):
+        self._spec = spec
+        self.feature_names = list(spec["feature_names"])
+        self.n_features = len(self.feature_names)
+        self.clip = spec["clip"]
+        self.feature_range = tuple(spec["feature_range"])
+        self.categories = {col: np.asarray(classes) for col, classes in spec["categories"].items()}
+
+        # (output position, column, lookup dict, classes) for each categorical
+        self.categorical = []
+        # (output position, column, scale, min) for each numeric column
+        self.numeric = []
+        self.scaled_positions = []
+        for j, col in enumerate(self.feature_names):
+            if col in self.categories:
+                classes = self.categories[col]
+                lookup = {value: code for code, value in enumerate(classes.tolist())}
+                self.categorical.append((j, col, lookup, classes))
+            elif col in spec["scaling"]:
+                scale, offset = spec["scaling"][col]
+                self.numeric.append((j, col, scale, offset))
+                self.scaled_positions.append(j)
+            else:
+                self.numeric.append((j, col, 1.0, 0.0))
+
+    def valid_mask(self, df):
+        """Boolean mask of rows with known categories and finite numbers (nothing missing)."""
+        mask = df[self.feature_names].notna().all(axis=1).to_numpy()
+        for _, col, _, classes in self.categorical:
+            mask = mask & df[col].isin(classes).to_numpy()
+        for _, col, _, _ in self.numeric:
+            mask = mask & np.isfinite(to_float(df[col]))
+        return mask
+
+    def transform_one(self, record, out=None):
+        """Encode one record (mapping of raw column -> value) into a 1-D array."""
+        if out is None:
+            out = np.empty(self.n_features)
+        self.encode_one(record, out)
+        return self.scale_one(record, out)
+
+    def encode_one(self, record, out):
+        """Fill the categorical positions of out; transform_one's first half."""
+        for j, col, lookup, _ in self.categorical:
+            value = record[col]
+            try:
+                out[j] = lookup[value]
+            except KeyError:
+                raise ValueError(f"Unknown {col}: {value!r}") from None
+        return out
+
+    def scale_one(self, record, out):
+        """Fill the numeric positions of out; transform_one's second half."""
+        for j, col, scale, offset in self.numeric:
+            out[j] = float(record[col]) * scale + offset
+        if self.clip:
+            self._clip(out)
+        return out
+
+    def transform(self, data, out=None):
+        """Encode a batch (DataFrame or mapping of columns) into a 2-D array."""
+        n = len(data[self.feature_names[0]])
+        if out is None:
+            out = np.empty((n, self.n_features))
+        for j, col, _, classes in self.categorical:
+            codes = pd.Categorical(data[col], categories=classes).codes
+            if (codes < 0).any():
+                bad = pd.unique(np.asarray(data[col], dtype=object)[codes < 0])
+                raise ValueError(f"Unknown {col}: {bad.tolist()!r}")
+            out[:, j] = codes
+        for j, col, scale, offset in self.numeric:
+            out[:, j] = to_float(data[col]) * scale + offset
+        if self.clip:
+            self._clip(out)
+        return out
+
+    def _clip(self, out):
+        for j in self.scaled_positions:
+            out[..., j] = np.clip(out[..., j], *self.feature_range)
+
+
+def check_parity(data_path="Daily_Water_Intake.csv", artifacts_dir="."):
+    """Compare Preprocessor with encode_frame on every valid row of the dataset."""
+    from artifacts import load_artifacts
+
+    artifacts = load_artifacts(artifacts_dir)
+    df = pd.read_csv(data_path)
+    df = df[valid_rows(df, artifacts)]
+    expected = encode_frame(df, artifacts).to_numpy(dtype=np.float64)
+    pre = Preprocessor(artifacts)
+
+    batch = pre.transform(df)
+    single = np.array([pre.transform_one(record) for record in df.to_dict("records")])
+    return len(df), int((batch != expected).sum()), int((single != expected).sum())
+
+
+if __name__ == "__main__":
+    rows, batch_diff, single_diff = check_parity()
+    print(f"{rows:,} rows checked: {batch_diff} batch / {single_diff} single-row differences")
+    if batch_diff or single_diff:
+        raise SystemExit(1)
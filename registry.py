@@ -0,0 +1,373 @@
+"""Versioned model registry with hot reload and shadow scoring.
+
+A registry is a directory of artifact bundles, one subdirectory per version,
+plus two pointer files holding a version name:
+    models/
+      CURRENT            version served to users
+      CANDIDATE          optional version shadow-scored against it
+      1c2cb799c013/      model_bundle.joblib + model_bundle.json (+ prediction_table.npz)
+
+ModelRegistry polls the pointers from a daemon thread. When one changes, the
+new bundle is loaded (checksum verified), compiled and warmed on that thread,
+then published by a single reference assignment. A rerun reads
+registry.live once and keeps using that LoadedModel, so in-flight reruns
+finish on the version they started with and never wait for a load. A version
+that fails to load is logged and skipped; the old one stays live.
+
+With a candidate and shadow_fraction > 0, shadow() samples live requests and
+scores them with both versions on a small thread pool, off the request path,
+recording agreement and the latency difference. Tasks beyond max_pending are
+dropped rather than queued.
+
+    python registry.py publish --registry models            # bundle ./ and make it CURRENT
+    python registry.py publish --registry models --candidate
+    python registry.py promote --registry models             # CANDIDATE becomes CURRENT
+    python registry.py list --registry models
+"""
+import argparse
+import datetime
+import os
+import random
+import shutil
+import sys
+import threading
+import time
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from artifacts import BUNDLE_MANIFEST, load_bundle, read_manifest, write_bundle
+
+REGISTRY_ENV = "HYDRATION_MODEL_REGISTRY"
+SHADOW_FRACTION_ENV = "HYDRATION_SHADOW_FRACTION"
+CURRENT_FILE = "CURRENT"
+CANDIDATE_FILE = "CANDIDATE"
+POLL_INTERVAL = 2.0  # seconds
+SHADOW_WORKERS = 1
+MAX_PENDING = 64  # shadow tasks in flight before new samples are dropped
+LOG_EVERY = 100  # shadow comparisons between summary log lines
+
+LoadedModel = namedtuple("LoadedModel", ["version", "engine", "preprocessor", "manifest", "loaded_at"])
+ShadowStats = namedtuple(
+    "ShadowStats", ["live", "candidate", "scored", "agreed", "dropped", "failed", "live_us", "candidate_us"]
+)
+
+
+def _log_stderr(message):
+    print(f"[registry {datetime.datetime.now():%H:%M:%S}] {message}", file=sys.stderr)
+
+
+def read_pointer(root, name):
+    try:
+        with open(os.path.join(root, name)) as f:
+            return f.read().strip() or None
+    except FileNotFoundError:
+        return None
+
+
+def write_pointer(root, name, version):
+    """Point name at version atomically; version None removes the pointer."""
+    path = os.path.join(root, name)
+    if version is None:
+        if os.path.exists(path):
+            os.remove(path)
+        return
+    if not os.path.isdir(os.path.join(root, version)):
+        raise ValueError(f"No version {version!r} in {root}")
+    with open(path + ".tmp", "w") as f:
+        f.write(version + "\n")
+    os.replace(path + ".tmp", path)
+
+
+def load_version(root, version):
+    """Load, compile and warm one registry version."""
+    from lookup_table import load_engine
+    from preprocessing import Preprocessor
+
+    path = os.path.join(root, version)
+    bundle = load_bundle(path)
+    engine = load_engine(bundle.artifacts, path)
+    preprocessor = Preprocessor(bundle.artifacts)
+    # Warm-up: the first calls pay for lazily built lookups and page faults
+    row = np.array([np.mean(preprocessor.feature_range)] * preprocessor.n_features)
+    engine.predict_one(row)
+    engine.predict(np.tile(row, (64, 1)))
+    return LoadedModel(version, engine, preprocessor, bundle.manifest, time.time())
+
+
+class ModelRegistry:
+    def __init__(self, root, poll_interval=POLL_INTERVAL, shadow_fraction=0.0, shadow_workers=SHADOW_WORKERS,
+                 max_pending=MAX_PENDING, log=_log_stderr, watch=True):
+        self.root = root
+        self.poll_interval = poll_interval
+        self.shadow_fraction = shadow_fraction
+        self.max_pending = max_pending
+        self.log = log
+        self.live = None
+        self.candidate = None
+        self._failed = {}  # version -> manifest mtime when it failed; retried once the bundle changes
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._pool = ThreadPoolExecutor(max_workers=shadow_workers, thread_name_prefix="shadow")
+        self._pending = 0
+        self._reset_shadow()
+
+        # The first version is loaded here: there is nothing to serve until it is
+        version = read_pointer(root, CURRENT_FILE)
+        if version is None:
+            raise FileNotFoundError(f"No {CURRENT_FILE} pointer in {root}")
+        self.live = load_version(root, version)
+        self.poll()
+        self._watcher = None
+        if watch:
+            self._watcher = threading.Thread(target=self._watch, name="registry-watcher", daemon=True)
+            self._watcher.start()
+
+    # ======= RELOAD =======
+    def _watch(self):
+        while not self._stop.wait(self.poll_interval):
+            try:
+                self.poll()
+            except Exception as e:  # keep watching whatever one poll hits
+                self.log(f"poll failed: {e!r}")
+
+    def poll(self):
+        """Load whatever the pointers name that is not loaded yet; returns True if anything changed."""
+        changed = False
+        version = read_pointer(self.root, CURRENT_FILE)
+        if version and version != self.live.version and not self._known_bad(version):
+            if self.candidate is not None and self.candidate.version == version:
+                loaded = self.candidate  # promoted: already loaded and warm
+            else:
+                loaded = self._load(version)
+            if loaded is not None:
+                previous, self.live = self.live, loaded
+                self.log(f"live model {previous.version} -> {loaded.version}")
+                self._reset_shadow()
+                changed = True
+
+        version = read_pointer(self.root, CANDIDATE_FILE)
+        if version == self.live.version:
+            version = None
+        current = self.candidate.version if self.candidate is not None else None
+        if version != current and not (version and self._known_bad(version)):
+            self.candidate = self._load(version) if version else None
+            if self.candidate is not None or version is None:
+                self.log(f"shadow candidate {current} -> {version}")
+                self._reset_shadow()
+                changed = True
+        return changed
+
+    def _stamp(self, version):
+        try:
+            return os.stat(os.path.join(self.root, version, BUNDLE_MANIFEST)).st_mtime_ns
+        except OSError:
+            return None
+
+    def _known_bad(self, version):
+        return version in self._failed and self._failed[version] == self._stamp(version)
+
+    def _load(self, version):
+        start = time.perf_counter()
+        try:
+            loaded = load_version(self.root, version)
+        except Exception as e:
+            self._failed[version] = self._stamp(version)
+            self.log(f"could not load {version}: {e!r}; keeping {self.live.version}")
+            return None
+        self.log(f"loaded and warmed {version} in {time.perf_counter() - start:.2f}s")
+        return loaded
+
+    def close(self):
+        self._stop.set()
+        if self._watcher is not None:
+            self._watcher.join()
+        self._pool.shutdown(wait=True)
+
+    # ======= SHADOW SCORING =======
+    def _reset_shadow(self):
+        with self._lock:
+            self._stats = dict(scored=0, agreed=0, dropped=0, failed=0, live_us=0.0, candidate_us=0.0)
+
+    def shadow(self, record):
+        """Maybe queue a raw input record for live-vs-candidate scoring; never blocks."""
+        live, candidate = self.live, self.candidate
+        if candidate is None or not self.shadow_fraction or random.random() >= self.shadow_fraction:
+            return False
+        with self._lock:
+            if self._pending >= self.max_pending:
+                self._stats["dropped"] += 1
+                return False
+            self._pending += 1
+        self._pool.submit(self._compare, live, candidate, dict(record))
+        return True
+
+    @staticmethod
+    def _score(model, record):
+        start = time.perf_counter()
+        result = model.engine.predict_one(model.preprocessor.transform_one(record))
+        return result, (time.perf_counter() - start) * 1e6
+
+    def _compare(self, live, candidate, record):
+        try:
+            (live_class, _), live_us = self._score(live, record)
+            (candidate_class, _), candidate_us = self._score(candidate, record)
+        except Exception:
+            with self._lock:
+                self._pending -= 1
+                self._stats["failed"] += 1
+            return
+        with self._lock:
+            self._pending -= 1
+            if (live, candidate) != (self.live, self.candidate):
+                return  # a swap happened meanwhile; these versions are no longer compared
+            stats = self._stats
+            stats["scored"] += 1
+            stats["agreed"] += int(live_class == candidate_class)
+            stats["live_us"] += live_us
+            stats["candidate_us"] += candidate_us
+            summary = stats["scored"] % LOG_EVERY == 0
+        if summary:
+            self.log(self.describe_shadow())
+
+    def shadow_stats(self):
+        live, candidate = self.live, self.candidate
+        with self._lock:
+            stats = dict(self._stats)
+        return ShadowStats(live.version, candidate.version if candidate else None, **stats)
+
+    def describe_shadow(self):
+        s = self.shadow_stats()
+        if s.candidate is None:
+            return f"serving {s.live}, no shadow candidate"
+        if not s.scored:
+            return f"shadow {s.candidate} vs {s.live}: nothing scored yet"
+        live_us, candidate_us = s.live_us / s.scored, s.candidate_us / s.scored
+        return (f"shadow {s.candidate} vs {s.live}: {s.agreed / s.scored:.2%} agreement over {s.scored:,}, "
+                f"latency {candidate_us:.1f}us vs {live_us:.1f}us ({candidate_us - live_us:+.1f}us), "
+                f"{s.dropped:,} dropped")
+
+    def prometheus_lines(self):
+        """Live version and shadow counters (see telemetry.Telemetry.add_collector)."""
+        s = self.shadow_stats()
+        lines = [
+            "# HELP hydration_model_info Model version being served.",
+            "# TYPE hydration_model_info gauge",
+            f'hydration_model_info{{version="{s.live}"}} 1',
+        ]
+        if s.candidate is None:
+            return lines
+        labels = f'live="{s.live}",candidate="{s.candidate}"'
+        return lines + [
+            "# HELP hydration_shadow_total Shadow comparisons by outcome.",
+            "# TYPE hydration_shadow_total counter",
+            f'hydration_shadow_total{{{labels},outcome="agreed"}} {s.agreed}',
+            f'hydration_shadow_total{{{labels},outcome="disagreed"}} {s.scored - s.agreed}',
+            f'hydration_shadow_total{{{labels},outcome="dropped"}} {s.dropped}',
+            f'hydration_shadow_total{{{labels},outcome="failed"}} {s.failed}',
+            "# HELP hydration_shadow_seconds_total Scoring time spent in shadow comparisons.",
+            "# TYPE hydration_shadow_seconds_total counter",
+            f'hydration_shadow_seconds_total{{{labels},model="live"}} {s.live_us / 1e6:.9g}',
+            f'hydration_shadow_seconds_total{{{labels},model="candidate"}} {s.candidate_us / 1e6:.9g}',
+        ]
+
+
+# ======= PUBLISHING =======
+def publish(artifacts_dir, root, candidate=False):
+    """Bundle the artifacts in artifacts_dir as a registry version and point CURRENT (or CANDIDATE) at it."""
+    os.makedirs(root, exist_ok=True)
+    staging = os.path.join(root, f".staging-{os.getpid()}")
+    shutil.rmtree(staging, ignore_errors=True)
+    os.makedirs(staging)
+    try:
+        manifest = write_bundle(artifacts_dir, staging)
+        version = manifest["version"][:12]
+        target = os.path.join(root, version)
+        if os.path.exists(target):
+            shutil.rmtree(staging)
+        else:
+            os.rename(staging, target)
+    except BaseException:
+        shutil.rmtree(staging, ignore_errors=True)
+        raise
+    write_pointer(root, CANDIDATE_FILE if candidate else CURRENT_FILE, version)
+    return version
+
+
+def versions(root):
+    """(version, manifest) for every bundle in the registry, oldest first."""
+    found = []
+    for name in os.listdir(root):
+        if os.path.isdir(os.path.join(root, name)) and not name.startswith("."):
+            try:
+                found.append((name, read_manifest(os.path.join(root, name))))
+            except (OSError, ValueError):
+                continue
+    return sorted(found, key=lambda item: item[1].get("created", ""))
+
+
+def simulate(root, requests=2000, shadow_fraction=0.25, data_path="Daily_Water_Intake.csv"):
+    """Score dataset rows through the live model while shadowing the candidate; returns the stats."""
+    import pandas as pd
+
+    from artifacts import FEATURE_COLUMNS
+
+    registry = ModelRegistry(root, shadow_fraction=shadow_fraction, watch=False, log=lambda message: None)
+    try:
+        if registry.candidate is None:
+            raise SystemExit(f"No {CANDIDATE_FILE} in {root} to shadow")
+        records = pd.read_csv(data_path, nrows=requests)[FEATURE_COLUMNS].to_dict("records")
+        start = time.perf_counter()
+        for record in records:
+            live = registry.live
+            live.engine.predict_one(live.preprocessor.transform_one(record))
+            registry.shadow(record)
+        request_s = time.perf_counter() - start
+    finally:
+        registry.close()
+    return registry.describe_shadow(), request_s / len(records) * 1e6
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Manage the versioned model registry.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    for name, help_text in [("publish", "bundle the artifacts as a new version"),
+                            ("promote", "make the candidate (or --version) the live version"),
+                            ("list", "show the versions and pointers"),
+                            ("shadow", "replay dataset rows and report live vs candidate agreement")]:
+        command = sub.add_parser(name, help=help_text)
+        command.add_argument("--registry", default=os.environ.get(REGISTRY_ENV, "models"))
+    sub.choices["publish"].add_argument("--artifacts", default=".", help="directory holding the .pkl artifacts")
+    sub.choices["publish"].add_argument("--candidate", action="store_true", help="point CANDIDATE instead of CURRENT")
+    sub.choices["promote"].add_argument("--version", help="version to make live (default: the candidate)")
+    sub.choices["shadow"].add_argument("--requests", type=int, default=2000)
+    sub.choices["shadow"].add_argument("--fraction", type=float, default=0.25)
+    sub.choices["shadow"].add_argument("--data", default="Daily_Water_Intake.csv")
+    args = parser.parse_args(argv)
+
+    root = args.registry
+    if args.command == "publish":
+        version = publish(args.artifacts, root, args.candidate)
+        print(f"Published {version} as {CANDIDATE_FILE if args.candidate else CURRENT_FILE}")
+    elif args.command == "promote":
+        version = args.version or read_pointer(root, CANDIDATE_FILE)
+        if not version:
+            raise SystemExit(f"No {CANDIDATE_FILE} to promote; pass --version")
+        write_pointer(root, CURRENT_FILE, version)
+        if read_pointer(root, CANDIDATE_FILE) == version:
+            write_pointer(root, CANDIDATE_FILE, None)
+        print(f"{version} is now {CURRENT_FILE}")
+    elif args.command == "list":
+        current, candidate = read_pointer(root, CURRENT_FILE), read_pointer(root, CANDIDATE_FILE)
+        for version, manifest in versions(root):
+            mark = " (current)" if version == current else " (candidate)" if version == candidate else ""
+            print(f"{version}  {manifest.get('created', '?')}  {manifest.get('model', '?')}{mark}")
+    else:
+        summary, request_us = simulate(root, args.requests, args.fraction, args.data)
+        print(summary)
+        print(f"live request path with shadow sampling: {request_us:.1f}us/request")
+
+
+if __name__ == "__main__":
+    main()
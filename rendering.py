@@ -0,0 +1,462 @@
+"""Page styling and Plotly figures for app.py.
+
+The CSS strings are built once per process instead of on every rerun.
+Figures come in two kinds:
+- The feature-importance chart depends only on the model and the theme. It
+  is built once per (model version, dark_mode) and shared.
+- The gauge, the intake-vs-goal bar and the per-prediction explanation
+  change with every prediction. They are built once per session from plain
+  graph objects, and each rerun patches their values in place. Building
+  them through plotly.express took about 55ms per figure.
+
+Plotly is imported inside the builders, so importing this module for the CSS
+keeps it off the cold-start path.
+
+    python rendering.py --bench
+"""
+import argparse
+import time
+
+# ======= CSS & UI STYLING (Glassmorphism, Animations) =======
+BASE_CSS = """
+<style>
+/* Background Gradient Animation */
+@keyframes gradientBG {
+    0% { background-position: 0% 50%; }
+    50% { background-position: 100% 50%; }
+    100% { background-position: 0% 50%; }
+}
+
+/* Base Body Style */
+.stApp {
+    background: linear-gradient(-45deg, #1e3c72, #2a5298, #0f2027, #203a43);
+    background-size: 400% 400%;
+    animation: gradientBG 15s ease infinite;
+    color: #ffffff;
+    font-family: 'Inter', sans-serif;
+}
+
+/* Hide Streamlit empty containers that wrap style/markdown injections */
+[data-testid="stMarkdownContainer"]:empty,
+[data-testid="stMarkdownContainer"]:has(style) {
+    display: none !important;
+}
+div[data-testid="stVerticalBlock"] > div:has(style),
+div[data-testid="stVerticalBlock"] > div:empty {
+    display: none !important;
+    padding: 0 !important;
+    margin: 0 !important;
+}
+
+div[data-testid="stForm"], 
+div[data-testid="stVerticalBlock"] > div > div:not(:has(.marquee-container)):not(:empty) {
+    background: rgba(255, 255, 255, 0.05) !important;
+    backdrop-filter: blur(10px);
+    -webkit-backdrop-filter: blur(10px);
+    border-radius: 15px;
+    border: 1px solid rgba(255, 255, 255, 0.1);
+    box-shadow: 0 8px 32px 0 rgba(0, 0, 0, 0.37);
+    padding: 1rem;
+}
+
+/* The predict button - Game Action Style */
+div[data-testid="stFormSubmitButton"] > button {
+    background: linear-gradient(90deg, #ff8a00, #e52e71);
+    border: none;
+    border-radius: 50px;
+    color: white;
+    font-weight: 800;
+    font-size: 1.2rem;
+    padding: 0.5rem 2rem;
+    box-shadow: 0 4px 15px rgba(229, 46, 113, 0.4);
+    transition: all 0.3s ease;
+}
+
+div[data-testid="stFormSubmitButton"] > button:hover {
+    transform: translateY(-3px) scale(1.05);
+    box-shadow: 0 8px 25px rgba(229, 46, 113, 0.6);
+}
+
+div[data-testid="stFormSubmitButton"] > button:active {
+    transform: translateY(1px);
+}
+
+/* Emojis Animation Sequence */
+@keyframes storyAnimation {
+  0%, 20% { content: "🏃"; transform: translateX(-20px); opacity: 0; }
+  25%, 45% { content: "💧"; transform: translateX(0); opacity: 1; text-shadow: 0 0 10px #00f2fe; }
+  50%, 70% { content: "🥤"; transform: scale(1.2); opacity: 1; text-shadow: 0 0 15px #4facfe; }
+  75%, 95% { content: "⚡"; transform: translateY(-10px) scale(1.3); opacity: 1; text-shadow: 0 0 20px #f6d365; }
+  100% { content: "🏃"; transform: translateX(-20px); opacity: 0; }
+}
+
+.story-emoji::after {
+    content: "🏃";
+    display: inline-block;
+    font-size: 4rem;
+    animation: storyAnimation 6s infinite;
+}
+
+/* Text overrides for readability on dark backgrounds */
+h1, h2, h3, h4, p, label {
+    color: #ffffff !important;
+    text-shadow: 1px 1px 3px rgba(0,0,0,0.5);
+}
+
+.title-glow {
+    text-align: center;
+    font-size: 3rem;
+    font-weight: 900;
+    background: linear-gradient(to right, #00f2fe, #4facfe);
+    -webkit-background-clip: text;
+    -webkit-text-fill-color: transparent;
+    text-shadow: none;
+    margin-bottom: 0;
+}
+
+/* Pulse animation for Poor Status */
+@keyframes pulseRed {
+    0% { transform: scale(1); box-shadow: 0 0 0 0 rgba(255, 75, 75, 0.7); }
+    70% { transform: scale(1.02); box-shadow: 0 0 0 15px rgba(255, 75, 75, 0); }
+    100% { transform: scale(1); box-shadow: 0 0 0 0 rgba(255, 75, 75, 0); }
+}
+.pulse-card {
+    animation: pulseRed 2s infinite;
+    border: 2px solid #ff4b4b !important;
+}
+
+/* Highlight XP / Progress */
+progress {
+    border-radius: 7px; 
+    width: 100%;
+    height: 22px;
+    box-shadow: 1px 1px 4px rgba( 0, 0, 0, 0.2 );
+}
+progress::-webkit-progress-bar {
+    background-color: #333;
+    border-radius: 7px;
+}
+progress::-webkit-progress-value {
+    background: linear-gradient(90deg, #00C9FF 0%, #92FE9D 100%);
+    border-radius: 7px;
+}
+
+/* Marquee Animation */
+.marquee-container {
+    width: 100%;
+    overflow: hidden;
+    background: rgba(255, 255, 255, 0.1);
+    border-radius: 10px;
+    padding: 10px 0;
+    margin-bottom: 20px;
+    box-shadow: 0 4px 15px rgba(0, 0, 0, 0.2);
+    border: 1px solid rgba(255, 255, 255, 0.2);
+}
+
+.marquee-text {
+    display: inline-block;
+    white-space: nowrap;
+    animation: marquee 15s linear infinite;
+    font-size: 1.2rem;
+    font-weight: bold;
+    color: #00f2fe;
+    text-shadow: 0 0 5px rgba(0, 242, 254, 0.8);
+}
+
+@keyframes marquee {
+    0% { transform: translateX(100%); }
+    100% { transform: translateX(-100%); }
+}
+</style>
+"""
+
+# Light theme overrides, appended after BASE_CSS
+LIGHT_CSS = """
+    <style>
+    .stApp {
+        background: linear-gradient(-45deg, #e0c3fc, #8ec5fc, #e0c3fc, #8ec5fc) !important;
+        color: #111111 !important;
+    }
+    h1, h2, h3, h4, p, label {
+        color: #111111 !important;
+        text-shadow: none !important;
+    }
+    div[data-testid="stForm"], 
+    div[data-testid="stVerticalBlock"] > div > div:not(:has(.marquee-container)):not(:empty) {
+        background: rgba(255, 255, 255, 0.6) !important;
+        border: 1px solid rgba(0, 0, 0, 0.1) !important;
+        box-shadow: 0 4px 15px rgba(0, 0, 0, 0.05) !important;
+        color: #111111 !important;
+    }
+    .marquee-container {
+        background: rgba(255, 255, 255, 0.5) !important;
+        box-shadow: 0 4px 15px rgba(0, 0, 0, 0.05) !important;
+        border: 1px solid rgba(0, 0, 0, 0.1) !important;
+    }
+    .marquee-text {
+        color: #0072ff !important;
+        text-shadow: none !important;
+    }
+    .title-glow {
+        background: linear-gradient(to right, #0072ff, #00c6ff);
+        -webkit-background-clip: text;
+        -webkit-text-fill-color: transparent;
+    }
+    </style>
+    """
+
+PAGE_CSS = {True: BASE_CSS, False: BASE_CSS + LIGHT_CSS}
+
+
+def page_css(dark_mode):
+    return PAGE_CSS[bool(dark_mode)]
+
+
+# ======= FIGURE TEMPLATES =======
+GOOD_COLOR = "#00f2fe"
+POOR_COLOR = "#ff4b4b"
+GOAL_COLOR = "#4facfe"
+TRANSPARENT = "rgba(0,0,0,0)"
+
+# Shown when the model has no feature_importances_ (e.g. Logistic Regression or KNN)
+MOCK_IMPORTANCES = {
+    "Water Intake": 0.45,
+    "Weight": 0.20,
+    "Physical Activity": 0.15,
+    "Weather": 0.10,
+    "Age": 0.08,
+    "Gender": 0.02,
+}
+
+
+def gauge_figure():
+    """Health-score gauge with placeholder values; fill it with update_gauge()."""
+    import plotly.graph_objects as go
+
+    fig = go.Figure(go.Indicator(
+        mode="gauge+number",
+        value=0,
+        title={'text': "Overall Health Score", 'font': {'color': 'white'}},
+        gauge={
+            'axis': {'range': [None, 100], 'tickcolor': "white"},
+            'bar': {'color': "green"},
+            'steps': [
+                {'range': [0, 50], 'color': "rgba(255, 75, 75, 0.3)"},
+                {'range': [50, 80], 'color': "rgba(255, 204, 0, 0.3)"},
+                {'range': [80, 100], 'color': "rgba(0, 204, 102, 0.3)"}],
+        }
+    ))
+    fig.update_layout(
+        paper_bgcolor=TRANSPARENT,
+        plot_bgcolor=TRANSPARENT,
+        font={'color': "white"},
+        height=200,
+        margin=dict(l=20, r=20, t=50, b=20)
+    )
+    return fig
+
+
+def update_gauge(fig, score, color):
+    indicator = fig.data[0]
+    indicator.value = score
+    indicator.gauge.bar.color = color
+    return fig
+
+
+def intake_figure():
+    """Intake-vs-goal bar; the same traces px.bar produced, without its per-call cost."""
+    import plotly.graph_objects as go
+
+    fig = go.Figure()
+    for name, color in (("Your Intake", GOOD_COLOR), ("Recommended Goal", GOAL_COLOR)):
+        fig.add_trace(go.Bar(
+            name=name,
+            legendgroup=name,
+            x=[name],
+            y=[0.0],
+            text=[0.0],
+            marker={'color': color},
+            textposition='outside',
+            hovertemplate='Category=%{x}<br>Water (Liters)=%{text}<extra></extra>',
+        ))
+    fig.update_layout(
+        title={'text': "Water Intake vs Recommended Goal"},
+        barmode="relative",
+        xaxis={'title': {'text': "Category"}, 'categoryorder': "array",
+               'categoryarray': ["Your Intake", "Recommended Goal"]},
+        yaxis={'title': {'text': "Water (Liters)"}},
+        paper_bgcolor=TRANSPARENT,
+        plot_bgcolor=TRANSPARENT,
+        font={'color': "white"},
+        showlegend=False
+    )
+    return fig
+
+
+def update_intake(fig, intake, goal, good):
+    """goal is None when no intake in the solver's range reaches Good."""
+    yours, target = fig.data
+    with fig.batch_update():
+        yours.y = yours.text = [intake]
+        yours.marker.color = GOOD_COLOR if good else POOR_COLOR
+        target.y = [goal]
+        target.text = [goal if goal is not None else "out of range"]
+    return fig
+
+
+def explanation_figure():
+    """Per-prediction contributions (explain.py), one horizontal bar per feature."""
+    import plotly.graph_objects as go
+
+    fig = go.Figure(go.Bar(
+        orientation='h',
+        x=[],
+        y=[],
+        hovertemplate='%{y}: %{x:+.1f} points<extra></extra>',
+    ))
+    fig.update_layout(
+        title={'text': "What Drove Your Prediction"},
+        xaxis={'title': {'text': "Change in confidence (points)"}, 'zeroline': True},
+        paper_bgcolor=TRANSPARENT,
+        plot_bgcolor=TRANSPARENT,
+        font={'color': "white"},
+        showlegend=False
+    )
+    return fig
+
+
+def update_explanation(fig, features, contributions, status, dark_mode):
+    """Fill in contributions (fractions of probability) toward the predicted status.
+
+    Bars are sorted by size; inputs that pushed toward the prediction are
+    green, those that pushed against it red.
+    """
+    order = sorted(range(len(features)), key=lambda j: abs(contributions[j]))
+    points = [round(float(contributions[j]) * 100, 1) for j in order]
+    bar = fig.data[0]
+    with fig.batch_update():
+        bar.x = points
+        bar.y = [features[j] for j in order]
+        bar.marker.color = ["#00cc66" if p >= 0 else POOR_COLOR for p in points]
+        fig.layout.title.text = f"What Drove Your \"{status}\" Prediction"
+        fig.layout.font.color = "white" if dark_mode else "black"
+    return fig
+
+
+def importance_figure(importances, features, dark_mode):
+    """Horizontal feature-importance bar; MOCK_IMPORTANCES when importances is None."""
+    import pandas as pd
+    import plotly.express as px
+
+    if importances is None:
+        features, importances = list(MOCK_IMPORTANCES), list(MOCK_IMPORTANCES.values())
+        scale, title = "Plasma", "Estimated Feature Impact on Hydration Prediction"
+    else:
+        scale, title = "Viridis", "Feature Impact on Hydration Prediction"
+    df_imp = pd.DataFrame({"Feature": list(features), "Importance": importances}).sort_values(by="Importance", ascending=True)
+    fig = px.bar(
+        df_imp,
+        x="Importance",
+        y="Feature",
+        orientation='h',
+        color="Importance",
+        color_continuous_scale=scale,
+        title=title
+    )
+    fig.update_layout(
+        paper_bgcolor=TRANSPARENT,
+        plot_bgcolor=TRANSPARENT,
+        font={'color': "white" if dark_mode else "black"}
+    )
+    return fig
+
+
+class SessionFigures:
+    """One session's gauge, intake and explanation figures, patched on each rerun.
+
+    Kept per session, not shared: a shared figure would be patched by one
+    session while another serializes it.
+    """
+
+    def __init__(self):
+        self.gauge = gauge_figure()
+        self.intake = intake_figure()
+        self._explanation = None
+
+    def update(self, good, intake, goal):
+        update_gauge(self.gauge, 85 if good else 35, "green" if good else "red")
+        update_intake(self.intake, intake, goal, good)
+        return self.gauge, self.intake
+
+    def explanation(self, features, contributions, status, dark_mode):
+        if self._explanation is None:
+            self._explanation = explanation_figure()
+        return update_explanation(self._explanation, features, contributions, status, dark_mode)
+
+
+# ======= BENCHMARK =======
+def _legacy_intake(intake, goal, good):
+    # The px.bar call app.py made on every submit before the templates
+    import pandas as pd
+    import plotly.express as px
+
+    chart_data = pd.DataFrame({"Category": ["Your Intake", "Recommended Goal"], "Water (Liters)": [intake, goal]})
+    fig = px.bar(
+        chart_data, x="Category", y="Water (Liters)", color="Category",
+        color_discrete_map={"Your Intake": GOOD_COLOR if good else POOR_COLOR, "Recommended Goal": GOAL_COLOR},
+        text="Water (Liters)", title="Water Intake vs Recommended Goal",
+    )
+    fig.update_traces(textposition='outside')
+    fig.update_layout(paper_bgcolor=TRANSPARENT, plot_bgcolor=TRANSPARENT, font={'color': "white"}, showlegend=False)
+    return fig
+
+
+def benchmark(runs=50):
+    """Mean ms per rerun to produce the three figures and serialize them as st.plotly_chart does."""
+    import plotly.io
+
+    features = ["Age", "Gender", "Weight (kg)", "Daily Water Intake (liters)", "Physical Activity Level", "Weather"]
+    importances = [0.1, 0.01, 0.2, 0.5, 0.15, 0.04]
+
+    def rebuild(i):
+        good = i % 2 == 0
+        gauge = update_gauge(gauge_figure(), 85 if good else 35, "green" if good else "red")
+        return gauge, _legacy_intake(1.5 + i % 4, 2.45, good), importance_figure(importances, features, True)
+
+    shared = importance_figure(importances, features, True)
+    session = SessionFigures()
+
+    def patched(i):
+        return (*session.update(i % 2 == 0, 1.5 + i % 4, 2.45), shared)
+
+    results = {}
+    for name, render in (("rebuild", rebuild), ("templates", patched)):
+        render(0)
+        build = serialize = 0.0
+        for i in range(runs):
+            start = time.perf_counter()
+            figs = render(i)
+            mid = time.perf_counter()
+            for fig in figs:
+                plotly.io.to_json(fig.to_dict(), validate=False)
+            build += mid - start
+            serialize += time.perf_counter() - mid
+        results[name] = {"build_ms": build / runs * 1000, "serialize_ms": serialize / runs * 1000}
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Time figure rendering per rerun.")
+    parser.add_argument("--bench", action="store_true", help="compare rebuilding every figure with patched templates")
+    parser.add_argument("--runs", type=int, default=50)
+    args = parser.parse_args(argv)
+    if not args.bench:
+        parser.print_help()
+        return
+    for name, r in benchmark(args.runs).items():
+        print(f"{name:<10} build {r['build_ms']:7.2f}ms  serialize {r['serialize_ms']:6.2f}ms  "
+              f"total {r['build_ms'] + r['serialize_ms']:7.2f}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,254 @@
+"""PDF health reports: the app's download and bulk rendering of scored files.
+
+Reports are rendered by FPDF (compressed, stamped with the real creation
+time) and memoized on everything they show: prediction, confidence, session
+count and date. A tree model gives only a few distinct confidences, so even
+a bulk run over a large scored file renders a handful of PDFs per worker and
+writes the cached bytes for every other row.
+
+    python reports.py scored.csv reports/ --workers 4
+    python reports.py --check
+"""
+import argparse
+import datetime
+import os
+import re
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from functools import lru_cache
+
+import numpy as np
+
+TITLE = "Hydration Quest - AI Health Report"
+STATUS_TEXT = {0: "Optimal (Hydrated Hero)", 1: "Poor (Needs Water)"}
+ADVICE = {
+    0: "Great job! Your hydration markers look steady. Continue to balance water intake with your physical activity.",
+    1: "You are currently running a hydration deficit. Increase fluid intake to optimize bodily functions and energy levels.",
+}
+MEMO_SIZE = 4096  # memoized reports per process
+DEFAULT_CHUNK = 1000  # reports per bulk task
+
+_CREATION_DATE = re.compile(rb"/CreationDate \(D:(\d{14})")
+
+
+def _document(prediction, date, confidence, history_len, compress=True):
+    from fpdf import FPDF
+
+    pdf = FPDF()
+    pdf.set_compression(compress)
+    pdf.add_page()
+    pdf.set_font("Helvetica", size=16)
+    pdf.cell(200, 10, txt=TITLE, align='C')
+    pdf.ln(20)
+
+    pdf.set_font("Helvetica", size=12)
+    pdf.cell(200, 10, txt=f"Date: {date}")
+    pdf.ln(10)
+    pdf.cell(200, 10, txt=f"Current Status: {STATUS_TEXT[prediction]}")
+    pdf.ln(10)
+    pdf.cell(200, 10, txt=f"AI Confidence: {confidence}%")
+    pdf.ln(10)
+    if history_len is not None:
+        pdf.cell(200, 10, txt=f"Total Predictions made this session: {history_len}")
+        pdf.ln(10)
+    pdf.ln(10)
+
+    pdf.cell(200, 10, txt="Personalized Advice:")
+    pdf.ln(10)
+    pdf.set_font("Helvetica", style='I', size=11)
+    pdf.multi_cell(0, 10, txt=ADVICE[prediction])
+    return pdf
+
+
+def _output(pdf):
+    try:
+        out = pdf.output(dest='S')
+    except Exception:
+        out = pdf.output()
+    return out.encode('latin-1') if isinstance(out, str) else bytes(out)
+
+
+def render_pdf(prediction, confidence, history_len=None, date=None, compress=True):
+    """Build one report with FPDF."""
+    date = (date or datetime.date.today()).strftime("%Y-%m-%d")
+    return _output(_document(prediction, date, confidence, history_len, compress))
+
+
+@lru_cache(maxsize=MEMO_SIZE)
+def _memoized(prediction, confidence, history_len, date):
+    return render_pdf(prediction, confidence, history_len, date)
+
+
+def report_pdf(prediction, confidence, history_len=None, date=None):
+    """Memoized report; date defaults to today."""
+    return _memoized(int(prediction), float(confidence), history_len, date or datetime.date.today())
+
+
+# ======= BULK =======
+def _iter_scored(path, chunksize):
+    """(row numbers, predictions, confidences) chunks of a batch_score.py output file."""
+    columns = ["Prediction", "Confidence"]
+    if os.path.splitext(path)[1].lower() in (".parquet", ".pq"):
+        import pyarrow.parquet as pq
+
+        first = 0
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=chunksize, columns=columns):
+            rows = np.arange(first, first + batch.num_rows)
+            first += batch.num_rows
+            yield rows, batch.column(0).to_numpy(), batch.column(1).to_numpy(zero_copy_only=False)
+    else:
+        import pandas as pd
+
+        for chunk in pd.read_csv(path, usecols=columns, chunksize=chunksize):
+            yield chunk.index.to_numpy(), chunk["Prediction"].to_numpy(), chunk["Confidence"].to_numpy()
+
+
+def _write_reports(out_dir, date, rows, predictions, confidences):
+    for row, prediction, confidence in zip(rows.tolist(), predictions.tolist(), confidences.tolist()):
+        with open(os.path.join(out_dir, f"report-{row:08d}.pdf"), "wb") as f:
+            f.write(report_pdf(prediction, confidence, None, date))
+    return len(rows)
+
+
+def render_file(scored_path, out_dir, workers=None, chunksize=DEFAULT_CHUNK, date=None, log=None):
+    """One report-<row>.pdf per valid row of a scored file; returns (reports, seconds).
+
+    Chunks of rows go to a process pool (workers=1 renders in this process);
+    each worker renders every distinct report once and reuses the bytes.
+    Only a few chunks are in flight at a time, so memory stays bounded.
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    date = date or datetime.date.today()
+    workers = workers or os.cpu_count() or 1
+    written = 0
+    start = time.perf_counter()
+
+    def _report(done):
+        nonlocal written
+        written += done
+        if log:
+            elapsed = time.perf_counter() - start
+            log(f"{written:,} reports written ({written / elapsed:,.0f} reports/sec)")
+
+    chunks = (
+        (rows[valid], predictions[valid].astype(np.int64), confidences[valid])
+        for rows, predictions, confidences in _iter_scored(scored_path, chunksize)
+        for valid in [np.isin(predictions, list(STATUS_TEXT))]
+    )
+    if workers == 1:
+        for chunk in chunks:
+            _report(_write_reports(out_dir, date, *chunk))
+        return written, time.perf_counter() - start
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = set()
+        for chunk in chunks:
+            if len(pending) >= 2 * workers:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    _report(future.result())
+            pending.add(pool.submit(_write_reports, out_dir, date, *chunk))
+        for future in pending:
+            _report(future.result())
+    return written, time.perf_counter() - start
+
+
+def _structure_problems(pdf):
+    """Problems found by walking the xref table; an empty list for a well-formed file."""
+    problems = []
+    if not pdf.startswith(b"%PDF-") or not pdf.rstrip().endswith(b"%%EOF"):
+        problems.append("missing header or %%EOF")
+    start = pdf.rfind(b"startxref")
+    xref = int(pdf[start + len(b"startxref"):].split()[0]) if start >= 0 else -1
+    if pdf[xref:xref + 4] != b"xref":
+        return problems + ["startxref does not point at the xref table"]
+    lines = pdf[xref:].split(b"\n")
+    first, count = (int(n) for n in lines[1].split())
+    for number, line in enumerate(lines[2:2 + count], first):
+        offset, _, kind = line.split()[:3]
+        if kind == b"n" and not pdf.startswith(b"%d 0 obj" % number, int(offset)):
+            problems.append(f"object {number} is not at its xref offset")
+    for match in re.finditer(rb"/Length (\d+)>>\nstream\n", pdf):
+        end = match.end() + int(match.group(1))
+        if not pdf.startswith(b"\nendstream", end):
+            problems.append(f"stream at {match.end()} does not end at its /Length")
+    return problems
+
+
+def check():
+    """Memoized reports against fresh FPDF output: same bytes, well formed, compressed, real timestamps."""
+    problems = []
+    cases = 0
+    date = datetime.date(2026, 1, 31)
+    for prediction in STATUS_TEXT:
+        for history_len in (None, 1, 42, 123456):
+            for confidence in (0.0, 5.5, 87.3, 100.0):
+                report = report_pdf(prediction, confidence, history_len, date)
+                cases += 1
+                label = f"({prediction}, {confidence}, {history_len})"
+                if report_pdf(prediction, confidence, history_len, date) is not report:
+                    problems.append(f"{label}: memo miss on repeat")
+                fresh = render_pdf(prediction, confidence, history_len, date)
+                if _CREATION_DATE.sub(b"", fresh) != _CREATION_DATE.sub(b"", report):
+                    problems.append(f"{label}: differs from a fresh render")
+                problems += [f"{label}: {problem}" for problem in _structure_problems(report)]
+                if b"/FlateDecode" not in report:
+                    problems.append(f"{label}: content stream not compressed")
+                stamp = datetime.datetime.strptime(_CREATION_DATE.search(report).group(1).decode(), "%Y%m%d%H%M%S")
+                if abs(datetime.datetime.now() - stamp) > datetime.timedelta(hours=1):
+                    problems.append(f"{label}: CreationDate {stamp} is not the render time")
+    return cases, problems
+
+
+def benchmark(n=2000):
+    """Reports/sec: FPDF per report vs a memo hit."""
+
+    def _rate(fn):
+        fn(0)
+        start = time.perf_counter()
+        for i in range(n):
+            fn(i)
+        return n / (time.perf_counter() - start)
+
+    return {
+        "fpdf per report": _rate(lambda i: render_pdf(i % 2, 50 + i % 500 / 10, i)),
+        "memoized hit": _rate(lambda i: report_pdf(1, 90.0, 3)),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Render PDF health reports for a batch-scored file.")
+    parser.add_argument("scored", nargs="?", help="batch_score.py output (.csv or .parquet)")
+    parser.add_argument("out_dir", nargs="?", help="directory for the report-<row>.pdf files")
+    parser.add_argument("--workers", type=int, help="processes (default: one per CPU)")
+    parser.add_argument("--chunksize", type=int, default=DEFAULT_CHUNK, help="reports per task (default: %(default)s)")
+    parser.add_argument("--date", type=datetime.date.fromisoformat, help="report date, YYYY-MM-DD (default: today)")
+    parser.add_argument("--progress", action="store_true", help="report throughput after every chunk")
+    parser.add_argument("--check", action="store_true", help="check memoized reports against FPDF's output")
+    parser.add_argument("--bench", action="store_true", help="measure single-report rendering")
+    args = parser.parse_args(argv)
+    if not (args.check or args.bench or (args.scored and args.out_dir)):
+        parser.print_help()
+        return
+
+    if args.check:
+        cases, problems = check()
+        print(f"{cases} reports checked against FPDF: {len(problems)} problems")
+        for problem in problems:
+            print(f"  {problem}")
+        if problems:
+            sys.exit(1)
+    if args.bench:
+        for name, rate in benchmark().items():
+            print(f"  {name:<16} {rate:12,.0f} reports/sec")
+    if args.scored and args.out_dir:
+        log = (lambda msg: print(msg, file=sys.stderr)) if args.progress else None
+        reports, seconds = render_file(args.scored, args.out_dir, args.workers, args.chunksize, args.date, log)
+        rate = reports / seconds if seconds else float("inf")
+        print(f"Wrote {reports:,} reports in {seconds:.2f}s ({rate:,.0f} reports/sec) -> {args.out_dir}",
+              file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
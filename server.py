@@ -0,0 +1,249 @@
+"""Standalone asyncio inference service (stdlib only).
+
+Loads the same artifacts as app.py and serves JSON predictions without a
+Streamlit rerun. Concurrent requests are coalesced into micro-batches so the
+model is walked once per batch instead of once per request.
+
+    python server.py --port 8502 --max-batch 64 --max-wait-ms 2
+
+Endpoints:
+    GET  /health
+    POST /predict        {"Age": 30, "Gender": "Male", "Weight (kg)": 70, ...}
+    POST /predict/batch  {"records": [{...}, {...}]}
+"""
+import argparse
+import asyncio
+import json
+import time
+from http import HTTPStatus
+
+import numpy as np
+
+from artifacts import FEATURE_COLUMNS, load_artifacts, status_label
+from inference import compile_model
+from preprocessing import Preprocessor
+
+MAX_BODY_BYTES = 8 * 1024 * 1024
+
+
+class MicroBatcher:
+    """Collect feature rows from concurrent callers and predict them together.
+
+    A batch is flushed when it reaches max_batch rows or when max_wait
+    seconds have passed since its first row arrived.
+    """
+
+    def __init__(self, engine, max_batch=64, max_wait=0.002):
+        self.engine = engine
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self.queue = asyncio.Queue()
+        self.batches = 0
+        self.rows = 0
+        self._task = None
+
+    def start(self):
+        self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+
+    async def predict(self, features):
+        """Predict a 2-D array of encoded rows; returns (classes, confidences)."""
+        future = asyncio.get_running_loop().create_future()
+        await self.queue.put((features, future))
+        return await future
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            pending = [await self.queue.get()]
+            size = len(pending[0][0])
+            deadline = loop.time() + self.max_wait
+            while size < self.max_batch:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    item = await asyncio.wait_for(self.queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+                pending.append(item)
+                size += len(item[0])
+            self._flush(pending)
+
+    def _flush(self, pending):
+        X = np.concatenate([features for features, _ in pending])
+        try:
+            classes, confidence = self.engine.predict(X)
+        except Exception as e:
+            for _, future in pending:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        self.batches += 1
+        self.rows += len(X)
+        start = 0
+        for features, future in pending:
+            end = start + len(features)
+            if not future.done():
+                future.set_result((classes[start:end], confidence[start:end]))
+            start = end
+
+
+class InferenceService:
+    def __init__(self, artifacts, max_batch=64, max_wait=0.002):
+        self.preprocessor = Preprocessor(artifacts)
+        self.batcher = MicroBatcher(compile_model(artifacts.model), max_batch, max_wait)
+        self.started = time.time()
+        self.requests = 0
+
+    def encode(self, records):
+        features = np.empty((len(records), self.preprocessor.n_features))
+        for i, record in enumerate(records):
+            if not isinstance(record, dict):
+                raise ValueError(f"record {i} must be a JSON object")
+            missing = [col for col in FEATURE_COLUMNS if col not in record]
+            if missing:
+                raise ValueError(f"record {i} is missing {missing}")
+            try:
+                self.preprocessor.transform_one(record, out=features[i])
+            except (TypeError, ValueError) as e:
+                raise ValueError(f"record {i}: {e}") from None
+            if not np.isfinite(features[i]).all():
+                raise ValueError(f"record {i} has a non-finite feature value")
+        return features
+
+    async def predict(self, records):
+        classes, confidence = await self.batcher.predict(self.encode(records))
+        return [
+            {
+                "prediction": int(c),
+                "status": status_label(c),
+                "confidence": round(float(p) * 100, 1),
+            }
+            for c, p in zip(classes, confidence)
+        ]
+
+    async def handle(self, method, path, body):
+        """Route one request; returns (HTTPStatus, JSON-serializable payload)."""
+        self.requests += 1
+        if method == "GET" and path == "/health":
+            return HTTPStatus.OK, {
+                "status": "ok",
+                "uptime_s": round(time.time() - self.started, 1),
+                "requests": self.requests,
+                "batches": self.batcher.batches,
+                "rows": self.batcher.rows,
+            }
+        if method != "POST" or path not in ("/predict", "/predict/batch"):
+            return HTTPStatus.NOT_FOUND, {"error": f"no route for {method} {path}"}
+        try:
+            payload = json.loads(body or b"null")
+        except ValueError:
+            return HTTPStatus.BAD_REQUEST, {"error": "body is not valid JSON"}
+        try:
+            if path == "/predict":
+                return HTTPStatus.OK, (await self.predict([payload]))[0]
+            records = payload.get("records") if isinstance(payload, dict) else payload
+            if not isinstance(records, list):
+                return HTTPStatus.BAD_REQUEST, {"error": "expected {\"records\": [...]}"}
+            if not records:
+                return HTTPStatus.OK, {"results": []}
+            return HTTPStatus.OK, {"results": await self.predict(records)}
+        except ValueError as e:
+            return HTTPStatus.BAD_REQUEST, {"error": str(e)}
+
+    async def serve_connection(self, reader, writer):
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                try:
+                    method, target, _ = request_line.decode("latin-1").split(" ", 2)
+                except ValueError:
+                    await _respond(writer, HTTPStatus.BAD_REQUEST, {"error": "malformed request line"}, False)
+                    break
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+                length = _content_length(headers.get("content-length"))
+                if length is None:
+                    await _respond(writer, HTTPStatus.BAD_REQUEST, {"error": "invalid Content-Length"}, False)
+                    break
+                if length > MAX_BODY_BYTES:
+                    await _respond(writer, HTTPStatus.REQUEST_ENTITY_TOO_LARGE, {"error": "body too large"}, False)
+                    break
+                body = await reader.readexactly(length) if length else b""
+                keep_alive = headers.get("connection", "").lower() != "close"
+                status, payload = await self.handle(method, target.split("?", 1)[0], body)
+                await _respond(writer, status, payload, keep_alive)
+                if not keep_alive:
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+
+def _content_length(value):
+    """Body size from the header; None unless it is a plain non-negative integer."""
+    if not value:
+        return 0
+    if not (value.isascii() and value.isdigit()):
+        return None
+    return int(value)
+
+
+async def _respond(writer, status, payload, keep_alive):
+    body = json.dumps(payload).encode()
+    head = (
+        f"HTTP/1.1 {status.value} {status.phrase}\r\n"
+        "Content-Type: application/json\r\n"
+        f"Content-Length: {len(body)}\r\n"
+        f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n"
+    )
+    writer.write(head.encode("latin-1") + body)
+    await writer.drain()
+
+
+async def serve(host, port, artifacts, max_batch=64, max_wait=0.002):
+    service = InferenceService(artifacts, max_batch, max_wait)
+    service.batcher.start()
+    server = await asyncio.start_server(service.serve_connection, host, port)
+    print(f"Serving predictions on http://{host}:{port} (max batch {max_batch}, max wait {max_wait * 1000:g}ms)")
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        await service.batcher.stop()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Async micro-batching inference server.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8502)
+    parser.add_argument("--artifacts", default=".", help="directory holding the .pkl artifacts")
+    parser.add_argument("--max-batch", type=int, default=64, help="rows per micro-batch (default: %(default)s)")
+    parser.add_argument("--max-wait-ms", type=float, default=2.0, help="max time a row waits for its batch (default: %(default)s)")
+    args = parser.parse_args(argv)
+
+    artifacts = load_artifacts(args.artifacts)
+    try:
+        asyncio.run(serve(args.host, args.port, artifacts, args.max_batch, args.max_wait_ms / 1000))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
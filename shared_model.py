@@ -0,0 +1,301 @@
+"""Shared, read-only model arrays for multi-process deployments.
+
+Every Streamlit / server worker normally unpickles its own copy of the model
+and imports sklearn to do it. Exporting the flattened tree once writes its
+node arrays as .npy files plus a JSON manifest (preprocessor spec, feature
+names); workers then attach with np.load(mmap_mode="r"), so all of them
+share the same page-cache pages and never import sklearn.
+
+    python shared_model.py export --out /dev/shm/hydration_model
+    HYDRATION_SHARED_MODEL=/dev/shm/hydration_model streamlit run app.py
+    python shared_model.py rss-check --workers 4
+"""
+import argparse
+import json
+import os
+import shutil
+import sys
+from collections import namedtuple
+
+import numpy as np
+
+from inference import TreeEngine, compile_model
+from preprocessing import Preprocessor
+
+SHARED_FORMAT = 2  # 2: is_leaf is exported with the node arrays
+SHARED_MANIFEST = "manifest.json"
+SHARED_ENV = "HYDRATION_SHARED_MODEL"
+# rss-check fails if an extra shared worker grows by more than this fraction
+# of the model's array bytes over an extra baseline worker (same imports and
+# data, no model arrays); a private copy of the arrays costs at least 1.0
+MAX_MODEL_FRACTION = 0.25
+# Per-worker memory varies by a few MB between runs; smaller arrays than this
+# cannot be told apart from noise, so the fraction is not checked for them
+MIN_CHECKED_ARRAY_KB = 16 * 1024
+# The real tree is a few hundred nodes, far below measurement noise, so
+# rss-check attaches a synthetic complete tree of this depth (~75 MB)
+SYNTHETIC_DEPTH = 19
+
+SharedModel = namedtuple("SharedModel", ["engine", "preprocessor", "manifest"])
+
+
+def export_shared(artifacts, path, version=""):
+    """Write the model's arrays and preprocessing spec under path (replacing it)."""
+    engine = compile_model(artifacts.model)
+    if not isinstance(engine, TreeEngine):
+        raise TypeError(f"Shared loading needs a decision tree, got {type(artifacts.model).__name__}")
+    return write_shared(engine, Preprocessor(artifacts), path, version)
+
+
+def synthetic_engine(n_features, depth=SYNTHETIC_DEPTH, classes=(0, 1, 2), seed=0):
+    """A complete random tree of the given depth, for memory checks at scale."""
+    rng = np.random.default_rng(seed)
+    n_nodes = 2 ** (depth + 1) - 1
+    nodes = np.arange(n_nodes)
+    is_leaf = nodes >= n_nodes // 2
+    proba = rng.dirichlet(np.ones(len(classes)), size=n_nodes)
+    return TreeEngine.from_arrays(
+        np.asarray(classes),
+        depth,
+        feature_names_in_=np.asarray([f"x{j}" for j in range(n_features)], dtype=object),
+        feature=np.where(is_leaf, 0, rng.integers(0, n_features, n_nodes)).astype(np.intp),
+        threshold=np.where(is_leaf, 0.0, rng.uniform(-1.0, 1.0, n_nodes)),
+        left=np.where(is_leaf, nodes, 2 * nodes + 1).astype(np.intp),
+        right=np.where(is_leaf, nodes, 2 * nodes + 2).astype(np.intp),
+        is_leaf=is_leaf,
+        leaf_proba=proba,
+        leaf_class=np.asarray(classes)[proba.argmax(axis=1)],
+        leaf_confidence=proba.max(axis=1),
+    )
+
+
+def write_shared(engine, preprocessor, path, version=""):
+    """Write a TreeEngine's arrays and preprocessor.spec() under path (replacing it)."""
+    path = os.path.abspath(path)
+    tmp = f"{path}.tmp-{os.getpid()}"
+    shutil.rmtree(tmp, ignore_errors=True)
+    os.makedirs(tmp)
+    arrays = {name: getattr(engine, name) for name in TreeEngine.ARRAYS}
+    arrays["classes"] = np.asarray(engine.classes_.tolist())
+    if engine.feature_importances_ is not None:
+        arrays["feature_importances"] = engine.feature_importances_
+    for name, array in arrays.items():
+        np.save(os.path.join(tmp, f"{name}.npy"), np.ascontiguousarray(array))
+
+    manifest = {
+        "format": SHARED_FORMAT,
+        "version": version,
+        "max_depth": engine.max_depth,
+        "n_nodes": engine.n_nodes,
+        "feature_names": list(engine.feature_names_in_),
+        "preprocessor": preprocessor.spec(),
+    }
+    with open(os.path.join(tmp, SHARED_MANIFEST), "w") as f:
+        json.dump(manifest, f, indent=2)
+
+    # Move the old export aside and swap the new one in before deleting
+    # anything, so path is missing only between two renames. Attached workers
+    # keep their (now unlinked) mappings until they re-attach.
+    old = f"{path}.old-{os.getpid()}"
+    if os.path.exists(path):
+        os.rename(path, old)
+    os.rename(tmp, path)
+    shutil.rmtree(old, ignore_errors=True)
+    return manifest
+
+
+def attach(path):
+    """Map an exported model read-only; no arrays are copied into the process."""
+    with open(os.path.join(path, SHARED_MANIFEST)) as f:
+        manifest = json.load(f)
+    if manifest.get("format") != SHARED_FORMAT:
+        raise ValueError(f"Unsupported shared model format {manifest.get('format')!r}")
+
+    def _map(name):
+        return np.load(os.path.join(path, f"{name}.npy"), mmap_mode="r")
+
+    importances = _map("feature_importances") if os.path.exists(os.path.join(path, "feature_importances.npy")) else None
+    engine = TreeEngine.from_arrays(
+        np.load(os.path.join(path, "classes.npy")),
+        manifest["max_depth"],
+        feature_names_in_=np.asarray(manifest["feature_names"], dtype=object),
+        feature_importances_=importances,
+        **{name: _map(name) for name in TreeEngine.ARRAYS},
+    )
+    return SharedModel(engine, Preprocessor.from_spec(manifest["preprocessor"]), manifest)
+
+
+# ======= RSS CHECK =======
+def _memory_kb():
+    """(RSS, PSS) of this process in kB; PSS splits shared pages between their users."""
+    rss = pss = None
+    with open("/proc/self/status") as f:
+        for line in f:
+            if line.startswith("VmRSS:"):
+                rss = int(line.split()[1])
+    try:
+        with open("/proc/self/smaps_rollup") as f:
+            for line in f:
+                if line.startswith("Pss:"):
+                    pss = int(line.split()[1])
+    except OSError:
+        pass
+    return rss, pss
+
+
+def _touch(engine):
+    """Read every page of the engine's arrays, so they all count towards RSS."""
+    for name in TreeEngine.ARRAYS:
+        array = np.asarray(getattr(engine, name))
+        int(array.reshape(-1).view(np.uint8).sum())
+
+
+def _worker(mode, shared_path, artifacts_dir, data_path, results, release):
+    import pandas as pd
+
+    engine = None
+    if mode == "baseline":
+        # Same imports and preprocessing as a shared worker, but no model arrays
+        with open(os.path.join(shared_path, SHARED_MANIFEST)) as f:
+            preprocessor = Preprocessor.from_spec(json.load(f)["preprocessor"])
+    elif mode == "shared":
+        model = attach(shared_path)
+        engine, preprocessor = model.engine, model.preprocessor
+    else:
+        from artifacts import load_artifacts
+
+        artifacts = load_artifacts(artifacts_dir)
+        engine, preprocessor = compile_model(artifacts.model), Preprocessor(artifacts)
+    df = pd.read_csv(data_path)
+    X = preprocessor.transform(df[preprocessor.valid_mask(df)])
+    if engine is not None:
+        engine.predict(X)
+        for row in X[:1000]:
+            engine.predict_one(row)
+        _touch(engine)
+    rss, pss = _memory_kb()
+    results.put({"rss": rss, "pss": pss, "sklearn": "sklearn" in sys.modules})
+    release.wait()
+
+
+def measure_workers(mode, n, shared_path, artifacts_dir, data_path):
+    """Start n workers in the given mode, all alive at once; return their reports."""
+    import multiprocessing
+
+    ctx = multiprocessing.get_context("spawn")
+    results, release = ctx.Queue(), ctx.Event()
+    procs = [
+        ctx.Process(target=_worker, args=(mode, shared_path, artifacts_dir, data_path, results, release))
+        for _ in range(n)
+    ]
+    for p in procs:
+        p.start()
+    reports = [results.get(timeout=120) for _ in procs]
+    release.set()
+    for p in procs:
+        p.join()
+    return reports
+
+
+def rss_check(workers, artifacts_dir=".", data_path="Daily_Water_Intake.csv", depth=SYNTHETIC_DEPTH):
+    """Per-worker memory growth for attaching shared arrays (and pickle loading).
+
+    With a depth, the shared export is a synthetic tree of that depth on the
+    real preprocessor; with depth=None it is the real model, and the pickle
+    mode is measured as well. A baseline run (same imports and data, no
+    model) gives the growth that any extra worker costs: "model_kb" in each
+    mode is what is left over, and "model_fraction" is that over the size of
+    the model's arrays.
+    """
+    import tempfile
+
+    from artifacts import artifacts_version, load_artifacts
+
+    tmp = tempfile.mkdtemp(prefix="hydration_shared_")
+    shared_path = os.path.join(tmp, "model")
+    try:
+        artifacts = load_artifacts(artifacts_dir)
+        if depth is None:
+            export_shared(artifacts, shared_path, artifacts_version(artifacts_dir))
+            modes = ("baseline", "pickle", "shared")
+        else:
+            preprocessor = Preprocessor(artifacts)
+            write_shared(synthetic_engine(preprocessor.n_features, depth), preprocessor, shared_path, "synthetic")
+            modes = ("baseline", "shared")
+        array_kb = sum(
+            os.path.getsize(os.path.join(shared_path, name)) for name in os.listdir(shared_path) if name.endswith(".npy")
+        ) / 1024
+        summary = {}
+        for mode in modes:
+            one = measure_workers(mode, 1, shared_path, artifacts_dir, data_path)
+            many = measure_workers(mode, workers, shared_path, artifacts_dir, data_path)
+            total_one = sum(r["pss"] or r["rss"] for r in one)
+            total_many = sum(r["pss"] or r["rss"] for r in many)
+            summary[mode] = {
+                "rss_per_worker_kb": sum(r["rss"] for r in many) / len(many),
+                "extra_worker_kb": (total_many - total_one) / max(workers - 1, 1),
+                "imports_sklearn": any(r["sklearn"] for r in many),
+            }
+        baseline = summary["baseline"]["extra_worker_kb"]
+        for s in summary.values():
+            s["model_kb"] = s["extra_worker_kb"] - baseline
+            s["model_fraction"] = s["model_kb"] / array_kb
+        summary["array_kb"] = array_kb
+        return summary
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+def rss_problems(summary):
+    """What rss_check's summary says is wrong with the shared workers, if anything."""
+    shared = summary["shared"]
+    problems = []
+    if shared["imports_sklearn"]:
+        problems.append("shared workers imported sklearn")
+    if summary["array_kb"] >= MIN_CHECKED_ARRAY_KB and shared["model_fraction"] > MAX_MODEL_FRACTION:
+        problems.append(f"an extra shared worker holds {shared['model_kb'] / 1024:.1f} MB of its own for "
+                        f"{summary['array_kb'] / 1024:.1f} MB of model arrays (limit {MAX_MODEL_FRACTION:.0%})")
+    return problems
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Export or check the shared, memory-mapped model.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    export = sub.add_parser("export", help="write the shared model arrays")
+    export.add_argument("--artifacts", default=".")
+    export.add_argument("--out", required=True, help="directory to write, e.g. /dev/shm/hydration_model")
+    check = sub.add_parser("rss-check", help="measure memory per extra worker process")
+    check.add_argument("--artifacts", default=".")
+    check.add_argument("--workers", type=int, default=4)
+    check.add_argument("--data", default="Daily_Water_Intake.csv")
+    check.add_argument("--depth", type=int, default=SYNTHETIC_DEPTH,
+                       help="synthetic tree depth (default: %(default)s); 0 checks the real model")
+    args = parser.parse_args(argv)
+
+    if args.command == "export":
+        from artifacts import artifacts_version, load_artifacts
+
+        manifest = export_shared(load_artifacts(args.artifacts), args.out, artifacts_version(args.artifacts))
+        print(f"Exported {manifest['n_nodes']} nodes to {args.out}; attach with {SHARED_ENV}={args.out}")
+        return
+
+    summary = rss_check(args.workers, args.artifacts, args.data, args.depth or None)
+    array_kb = summary.pop("array_kb")
+    print(f"Model arrays: {array_kb / 1024:.2f} MB" + (f" (synthetic, depth {args.depth})" if args.depth else ""))
+    if array_kb < MIN_CHECKED_ARRAY_KB:
+        print("  too small to tell from noise; only the sklearn import is checked")
+    print(f"{'mode':<10}{'RSS/worker (MB)':>17}{'extra worker PSS (MB)':>23}{'model (MB)':>12}"
+          f"{'of arrays':>11}{'sklearn':>9}")
+    for mode, s in summary.items():
+        print(f"{mode:<10}{s['rss_per_worker_kb'] / 1024:>17.1f}{s['extra_worker_kb'] / 1024:>23.1f}"
+              f"{s['model_kb'] / 1024:>12.1f}{s['model_fraction']:>11.0%}{str(s['imports_sklearn']):>9}")
+    summary["array_kb"] = array_kb
+    problems = rss_problems(summary)
+    for problem in problems:
+        print(f"FAIL: {problem}")
+    if problems:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
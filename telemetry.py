@@ -0,0 +1,274 @@
+"""Per-stage latency telemetry for app.py.
+
+Off unless HYDRATION_TELEMETRY is set, or a metrics file or port is
+configured. When off, span() returns one shared no-op context manager, so an
+instrumented stage costs a method call and an empty with block. When on, each
+span adds its duration to a fixed-bucket histogram for its stage. The
+histograms live in the process and are shared by every session; a lock guards
+the update. They are exposed as Prometheus text:
+
+- HYDRATION_METRICS_FILE: rewritten (atomically) at the end of a rerun, at
+  most once per WRITE_INTERVAL seconds;
+- HYDRATION_METRICS_PORT: served at /metrics from a daemon thread, on
+  127.0.0.1 unless HYDRATION_METRICS_HOST says otherwise. Give each worker
+  process its own port.
+
+With telemetry on, any rerun can also be profiled with cProfile; see
+RerunProfile.
+
+    python telemetry.py --bench
+"""
+import argparse
+import cProfile
+import datetime
+import os
+import threading
+import time
+from bisect import bisect_left
+from collections import namedtuple
+from contextlib import nullcontext
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+TELEMETRY_ENV = "HYDRATION_TELEMETRY"
+METRICS_FILE_ENV = "HYDRATION_METRICS_FILE"
+METRICS_PORT_ENV = "HYDRATION_METRICS_PORT"
+METRICS_HOST_ENV = "HYDRATION_METRICS_HOST"
+DEFAULT_METRICS_HOST = "127.0.0.1"
+PROFILE_DIR_ENV = "HYDRATION_PROFILE_DIR"
+DEFAULT_PROFILE_DIR = "profiles"
+METRIC_NAME = "hydration_stage_seconds"
+WRITE_INTERVAL = 1.0  # seconds between metrics file rewrites
+
+# Upper bounds in seconds; one more bucket catches everything above the last
+BUCKETS = (
+    0.00001, 0.000025, 0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005,
+    0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0,
+)
+
+_NULL_SPAN = nullcontext()
+
+StageSummary = namedtuple("StageSummary", ["stage", "count", "mean_ms", "p50_ms", "p99_ms", "total_s"])
+
+
+class Histogram:
+    __slots__ = ("counts", "count", "sum")
+
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, seconds):
+        self.counts[bisect_left(BUCKETS, seconds)] += 1
+        self.count += 1
+        self.sum += seconds
+
+    def copy(self):
+        other = Histogram()
+        other.counts, other.count, other.sum = list(self.counts), self.count, self.sum
+        return other
+
+    def quantile(self, q):
+        """Estimate like Prometheus' histogram_quantile: linear within the bucket."""
+        if not self.count:
+            return float("nan")
+        rank = q * self.count
+        seen = 0
+        for i, n in enumerate(self.counts):
+            if seen + n >= rank and n:
+                if i == len(BUCKETS):
+                    return BUCKETS[-1]
+                low = BUCKETS[i - 1] if i else 0.0
+                return low + (BUCKETS[i] - low) * (rank - seen) / n
+            seen += n
+        return BUCKETS[-1]
+
+
+class _Span:
+    __slots__ = ("telemetry", "stage", "start")
+
+    def __init__(self, telemetry, stage):
+        self.telemetry = telemetry
+        self.stage = stage
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.telemetry.observe(self.stage, time.perf_counter() - self.start)
+        return False
+
+
+class Telemetry:
+    def __init__(self, enabled=False, metrics_file=None, write_interval=WRITE_INTERVAL):
+        self.enabled = enabled
+        self.metrics_file = metrics_file
+        self.write_interval = write_interval
+        self._histograms = {}
+        self._lock = threading.Lock()
+        self._last_write = 0.0
+        self._server = None
+        self._collectors = {}
+
+    @classmethod
+    def from_env(cls):
+        metrics_file = os.environ.get(METRICS_FILE_ENV) or None
+        enabled = bool(os.environ.get(TELEMETRY_ENV) or metrics_file or os.environ.get(METRICS_PORT_ENV))
+        return cls(enabled, metrics_file)
+
+    # ======= RECORDING =======
+    def span(self, stage):
+        """Context manager timing one stage; a shared no-op when disabled."""
+        if not self.enabled:
+            return _NULL_SPAN
+        return _Span(self, stage)
+
+    def observe(self, stage, seconds):
+        if not self.enabled:
+            return
+        with self._lock:
+            histogram = self._histograms.get(stage)
+            if histogram is None:
+                histogram = self._histograms[stage] = Histogram()
+            histogram.observe(seconds)
+
+    def snapshot(self):
+        """Copy of every stage's histogram, in first-seen order."""
+        with self._lock:
+            return {stage: histogram.copy() for stage, histogram in self._histograms.items()}
+
+    def reset(self):
+        with self._lock:
+            self._histograms.clear()
+
+    def add_collector(self, collect, key=None):
+        """Append collect()'s Prometheus text lines to every export (e.g. DriftMonitor.prometheus_lines).
+
+        A collector added under an existing key replaces the old one.
+        """
+        self._collectors[collect if key is None else key] = collect
+
+    # ======= EXPORT =======
+    def summary(self):
+        return [
+            StageSummary(stage, h.count, h.sum / h.count * 1000, h.quantile(0.5) * 1000, h.quantile(0.99) * 1000, h.sum)
+            for stage, h in self.snapshot().items()
+            if h.count
+        ]
+
+    def render_prometheus(self):
+        lines = [
+            f"# HELP {METRIC_NAME} Time spent in each app stage per rerun.",
+            f"# TYPE {METRIC_NAME} histogram",
+        ]
+        for stage, h in self.snapshot().items():
+            cumulative = 0
+            for bound, n in zip(BUCKETS + ("+Inf",), h.counts):
+                cumulative += n
+                lines.append(f'{METRIC_NAME}_bucket{{stage="{stage}",le="{bound}"}} {cumulative}')
+            lines.append(f'{METRIC_NAME}_sum{{stage="{stage}"}} {h.sum:.9g}')
+            lines.append(f'{METRIC_NAME}_count{{stage="{stage}"}} {h.count}')
+        for collect in list(self._collectors.values()):
+            lines.extend(collect())
+        return "\n".join(lines) + "\n"
+
+    def write(self, path=None, force=False):
+        """Rewrite the metrics file, at most once per write_interval unless forced."""
+        path = path or self.metrics_file
+        if not (self.enabled and path):
+            return
+        now = time.monotonic()
+        if not force and now - self._last_write < self.write_interval:
+            return
+        self._last_write = now
+        tmp = f"{path}.tmp-{os.getpid()}-{threading.get_ident()}"
+        with open(tmp, "w") as f:
+            f.write(self.render_prometheus())
+        os.replace(tmp, path)
+
+    def serve(self, port, host=DEFAULT_METRICS_HOST):
+        """Serve /metrics on a daemon thread; returns the server (one per Telemetry)."""
+        if self._server is not None:
+            return self._server
+        telemetry = self
+
+        class MetricsHandler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split("?")[0] != "/metrics":
+                    self.send_error(404)
+                    return
+                body = telemetry.render_prometheus().encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self._server = ThreadingHTTPServer((host, port), MetricsHandler)
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, name="metrics-server", daemon=True).start()
+        return self._server
+
+
+class RerunProfile:
+    """cProfile of one rerun, started here and dumped by stop().
+
+    Only code on this thread is profiled, i.e. the script run itself; open
+    the .prof file with `python -m pstats` or snakeviz.
+    """
+
+    def __init__(self, directory=None):
+        self.directory = directory or os.environ.get(PROFILE_DIR_ENV, DEFAULT_PROFILE_DIR)
+        self.path = None
+        self.profiler = cProfile.Profile()
+        self.profiler.enable()
+
+    def stop(self):
+        """Disable and dump the profile; later calls return the same path."""
+        if self.path is None:
+            self.profiler.disable()
+            os.makedirs(self.directory, exist_ok=True)
+            stamp = datetime.datetime.now().strftime("%Y%m%d-%H%M%S-%f")
+            self.path = os.path.join(self.directory, f"rerun-{stamp}.prof")
+            self.profiler.dump_stats(self.path)
+        return self.path
+
+
+def benchmark(n=1_000_000):
+    """Per-span overhead in ns, disabled vs enabled."""
+
+    def _cost(telemetry):
+        span = telemetry.span
+        start = time.perf_counter()
+        for _ in range(n):
+            with span("stage"):
+                pass
+        return (time.perf_counter() - start) / n * 1e9
+
+    start = time.perf_counter()
+    for _ in range(n):
+        pass
+    loop = (time.perf_counter() - start) / n * 1e9
+    return {
+        "disabled": _cost(Telemetry(enabled=False)) - loop,
+        "enabled": _cost(Telemetry(enabled=True)) - loop,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="App telemetry utilities.")
+    parser.add_argument("--bench", action="store_true", help="measure the cost of one span, disabled and enabled")
+    args = parser.parse_args(argv)
+    if not args.bench:
+        parser.print_help()
+        return
+    for mode, ns in benchmark().items():
+        print(f"  {mode:<9} {ns:8.0f} ns/span")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,40 @@
+"""The modules live at the repository root; tests use its data and artifacts."""
+import os
+import sys
+import warnings
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+
+@pytest.fixture(scope="session")
+def root():
+    return ROOT
+
+
+@pytest.fixture(scope="session")
+def data_path():
+    return os.path.join(ROOT, "Daily_Water_Intake.csv")
+
+
+@pytest.fixture(scope="session")
+def artifacts():
+    from artifacts import load_artifacts
+
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")  # pickles from another sklearn release
+        return load_artifacts(ROOT)
+
+
+@pytest.fixture(scope="session")
+def encoded(artifacts, data_path):
+    """Every valid row of the dataset, encoded and scaled in model feature order."""
+    import pandas as pd
+
+    from preprocessing import Preprocessor
+
+    df = pd.read_csv(data_path)
+    preprocessor = Preprocessor(artifacts)
+    return preprocessor.transform(df[preprocessor.valid_mask(df)])
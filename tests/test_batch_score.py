@@ -0,0 +1,48 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from batch_score import score_file
+
+VALID = "25,Male,70.5,2.5,Moderate,Normal"
+ROWS = [VALID] * 4 + [
+    "abc,Male,70.5,2.5,Moderate,Normal",
+    "25,Male,inf,2.5,Moderate,Normal",
+    "25,Male,70.5,-inf,Moderate,Normal",
+    "25,Male,,2.5,Moderate,Normal",
+    "25,Robot,70.5,2.5,Moderate,Normal",
+    VALID,
+]
+
+
+@pytest.fixture
+def input_csv(tmp_path):
+    path = tmp_path / "input.csv"
+    header = "Age,Gender,Weight (kg),Daily Water Intake (liters),Physical Activity Level,Weather"
+    path.write_text("\n".join([header] + ROWS) + "\n")
+    return str(path)
+
+
+@pytest.mark.parametrize("suffix", [".csv", ".parquet"])
+def test_bad_values_in_a_later_chunk_are_marked_invalid(artifacts, input_csv, tmp_path, suffix):
+    output = str(tmp_path / f"scored{suffix}")
+    rows, _ = score_file(input_csv, output, artifacts, chunksize=4)
+    assert rows == len(ROWS)
+    scored = pd.read_csv(output) if suffix == ".csv" else pd.read_parquet(output)
+    invalid = [row != VALID for row in ROWS]
+    np.testing.assert_array_equal(scored["Status"] == "Invalid", invalid)
+    assert (scored["Prediction"][invalid] == -1).all()
+    assert scored["Confidence"][invalid].isna().all()
+
+
+def test_parquet_schema_does_not_depend_on_the_first_chunk(artifacts, input_csv, tmp_path):
+    import pyarrow.parquet as pq
+
+    output = str(tmp_path / "scored.parquet")
+    score_file(input_csv, output, artifacts, chunksize=4)
+    schema = pq.read_schema(output)
+    assert str(schema.field("Age").type) == "double"
+    assert str(schema.field("Gender").type) == "string"
+    assert str(schema.field("Prediction").type) == "int64"
+    assert str(schema.field("Confidence").type) == "double"
+    assert pq.read_table(output).column("Age").null_count == 1  # "abc"
@@ -0,0 +1,59 @@
+import threading
+import time
+
+import pytest
+
+from history_store import HistoryStore
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = HistoryStore(str(tmp_path / "history.db"), flush_interval=0.05)
+    yield store
+    store.close()
+
+
+def _record(store, user, status="Good"):
+    store.record(user, time.time(), 30, 70.0, 2.5, "Moderate", status, 90.0)
+
+
+def test_flush_waits_for_queued_records(store):
+    for i in range(1000):
+        _record(store, f"user{i % 3}", "Good" if i % 4 else "Poor")
+    assert store.flush(timeout=10)
+    assert store.user_stats() == (1000, 750)
+    assert sum(store.user_stats(f"user{i}").total for i in range(3)) == 1000
+
+
+def test_flush_times_out_while_the_writer_is_stuck(store):
+    release = threading.Event()
+    write_batch = store.write_batch
+
+    def stuck(rows):
+        release.wait()
+        write_batch(rows)
+
+    store.write_batch = stuck
+    _record(store, "a")
+    assert not store.flush(timeout=0.2)
+    release.set()
+    assert store.flush(timeout=10)
+    assert store.user_stats("a").total == 1
+
+
+def test_failed_batches_are_dropped_and_the_writer_keeps_going(tmp_path):
+    store = HistoryStore(str(tmp_path / "history.db"), flush_interval=0.05, retries=1)
+    write_batch = store.write_batch
+
+    def failing(rows):
+        raise OSError("disk full")
+
+    store.write_batch = failing
+    _record(store, "a")
+    assert store.flush(timeout=10)
+    assert store.dropped == 1
+    store.write_batch = write_batch
+    _record(store, "a")
+    assert store.flush(timeout=10)
+    assert store.user_stats("a").total == 1
+    store.close()
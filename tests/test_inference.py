@@ -0,0 +1,25 @@
+import numpy as np
+import pytest
+
+from inference import ProbaEngine, TreeEngine, check_parity, compile_model
+
+
+def test_tree_engine_matches_sklearn_on_the_dataset(root, data_path):
+    engine_name, rows, mismatches = check_parity(data_path, root)
+    assert engine_name == TreeEngine.__name__
+    assert rows > 0
+    assert mismatches == {name: 0 for name in mismatches}
+
+
+def test_non_tree_models_fall_back_to_predict_proba(artifacts, encoded):
+    from sklearn.linear_model import LogisticRegression
+
+    X = encoded[:2000]
+    y = artifacts.model.predict(X)
+    model = LogisticRegression(max_iter=500).fit(X, y)
+    engine = compile_model(model)
+    assert isinstance(engine, ProbaEngine)
+    classes, confidence = engine.predict(X)
+    np.testing.assert_array_equal(classes, model.predict(X))
+    np.testing.assert_allclose(confidence, model.predict_proba(X).max(axis=1))
+    assert engine.predict_one(X[0]) == (classes[0], pytest.approx(confidence[0]))
@@ -0,0 +1,38 @@
+import os
+
+import numpy as np
+import pytest
+
+from inference import TreeEngine, compile_model
+from shared_model import SYNTHETIC_DEPTH, attach, export_shared, rss_check, rss_problems
+
+
+@pytest.fixture(scope="module")
+def shared(artifacts, tmp_path_factory):
+    path = tmp_path_factory.mktemp("shared") / "model"
+    export_shared(artifacts, str(path))
+    return attach(str(path))
+
+
+def test_attached_engine_matches_model(artifacts, encoded, shared):
+    engine = compile_model(artifacts.model)
+    classes, confidence = shared.engine.predict(encoded)
+    expected_classes, expected_confidence = engine.predict(encoded)
+    np.testing.assert_array_equal(classes, expected_classes)
+    np.testing.assert_allclose(confidence, expected_confidence)
+    for row, cls, conf in zip(encoded, expected_classes, expected_confidence):
+        assert shared.engine.predict_one(row) == (cls, pytest.approx(conf))
+
+
+def test_attached_engine_walks_the_mapped_arrays(shared):
+    engine = shared.engine
+    for name in TreeEngine.ARRAYS:
+        assert isinstance(getattr(engine, name), np.memmap)
+    for name in ("feature", "threshold", "left", "right", "is_leaf", "leaf_class", "leaf_confidence"):
+        assert np.shares_memory(getattr(engine, f"_{name}"), getattr(engine, name))
+
+
+@pytest.mark.skipif(not os.path.exists("/proc/self/smaps_rollup"), reason="needs Linux PSS accounting")
+def test_extra_worker_adds_no_copy_of_a_large_model(root, data_path):
+    summary = rss_check(3, root, data_path, SYNTHETIC_DEPTH)
+    assert rss_problems(summary) == []
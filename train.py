@@ -0,0 +1,299 @@
+"""Training pipeline extracted from analysis_model.ipynb.
+
+Fits the LabelEncoders and MinMaxScaler, trains the notebook's candidates
+(Logistic Regression, Random Forest and Decision Tree grids, KNN k sweep),
+keeps the most accurate one on the held-out split and writes the same
+.pkl artifacts app.py loads.
+
+Grid points and CV folds run concurrently in a process pool, and every fold
+score is cached on disk under a key made of the data hash, the estimator,
+its hyperparameters and the fold, so unchanged configurations are skipped
+on the next run:
+
+    python train.py --out . --jobs 8
+"""
+import argparse
+import hashlib
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+
+import joblib
+import numpy as np
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.linear_model import LogisticRegression
+from sklearn.metrics import (
+    accuracy_score,
+    confusion_matrix,
+    f1_score,
+    precision_score,
+    recall_score,
+)
+from sklearn.model_selection import ParameterGrid, StratifiedKFold, train_test_split
+from sklearn.neighbors import KNeighborsClassifier
+from sklearn.preprocessing import LabelEncoder, MinMaxScaler
+from sklearn.tree import DecisionTreeClassifier
+
+from artifacts import (
+    FEATURE_COLUMNS,
+    MODEL_FILE,
+    SCALER_FILE,
+    TARGET_COLUMN,
+    TARGET_ENCODER_FILE,
+    has_bundle,
+    write_bundle,
+)
+from datasource import data_version, read_data
+
+CAT_COLS = ["Gender", "Physical Activity Level", "Weather"]
+NUM_COLS = ["Age", "Weight (kg)", "Daily Water Intake (liters)"]
+TEST_SIZE = 0.2
+SPLIT_SEED = 42
+CV_FOLDS = 3
+KNN_MAX_K = 20
+CACHE_DIR = ".train_cache"
+REPORT_FILE = "training_report.json"
+
+# Same search spaces as the notebook
+GRIDS = {
+    "Random Forest Classifier": (RandomForestClassifier, {
+        "n_estimators": [100, 200],
+        "max_depth": [None, 10, 20],
+        "min_samples_split": [2, 5],
+        "min_samples_leaf": [1, 2],
+    }),
+    "Decision Tree Classifier": (DecisionTreeClassifier, {
+        "max_depth": [None, 10, 20],
+        "min_samples_split": [2, 5],
+        "min_samples_leaf": [1, 2],
+    }),
+}
+
+
+@contextmanager
+def timed(timings, name):
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings[name] = round(time.perf_counter() - start, 4)
+
+
+def prepare(df):
+    """Fit the encoders and scaler like the notebook; returns (x, y, fitted objects)."""
+    x = df[FEATURE_COLUMNS].copy()
+    encoders = {}
+    for col in CAT_COLS:
+        le = LabelEncoder()
+        x[col] = le.fit_transform(x[col])
+        encoders[col] = le
+    scaler = MinMaxScaler()
+    x[NUM_COLS] = scaler.fit_transform(x[NUM_COLS])
+    target_encoder = LabelEncoder()
+    y = target_encoder.fit_transform(df[TARGET_COLUMN])
+    return x, y, encoders, scaler, target_encoder
+
+
+def evaluate(model, x_test, y_test):
+    y_pred = model.predict(x_test)
+    return {
+        "Accuracy Score": accuracy_score(y_test, y_pred),
+        "Precision Score": precision_score(y_test, y_pred),
+        "recall Score": recall_score(y_test, y_pred),
+        "f1 Score": f1_score(y_test, y_pred),
+        "confusion_matrix": confusion_matrix(y_test, y_pred).tolist(),
+    }
+
+
+# ======= WORKER TASKS =======
+# Training data is sent to each pool worker once, not with every task.
+_DATA = {}
+
+
+def _init_worker(x_train, y_train, folds):
+    _DATA.update(x_train=x_train, y_train=y_train, folds=folds)
+
+
+def _build(name, params, random_state):
+    if name == "Logistic Regression":
+        return LogisticRegression(max_iter=1000)
+    estimator_cls, _ = GRIDS[name]
+    return estimator_cls(random_state=random_state, **params)
+
+
+def _fold_task(name, params, fold, random_state):
+    start = time.perf_counter()
+    train_idx, val_idx = _DATA["folds"][fold]
+    x, y = _DATA["x_train"], _DATA["y_train"]
+    model = _build(name, params, random_state).fit(x.iloc[train_idx], y[train_idx])
+    score = accuracy_score(y[val_idx], model.predict(x.iloc[val_idx]))
+    return score, time.perf_counter() - start
+
+
+def _fit_task(name, params, random_state):
+    start = time.perf_counter()
+    model = _build(name, params, random_state).fit(_DATA["x_train"], _DATA["y_train"])
+    return model, time.perf_counter() - start
+
+
+def knn_sweep(x_train, y_train, x_test, y_test, max_k=KNN_MAX_K):
+    """Test accuracy for every k in 1..max_k from a single max_k neighbor query.
+
+    Each k votes over its first k neighbors; ties go to the smallest class,
+    as in KNeighborsClassifier.predict. Scores can differ from separate
+    per-k fits only where neighbors sit at exactly equal distances, since
+    which of them make the cut depends on the query size.
+    """
+    knn = KNeighborsClassifier(n_neighbors=max_k).fit(x_train, y_train)
+    neighbors = knn.kneighbors(x_test, n_neighbors=max_k, return_distance=False)
+    labels = np.searchsorted(knn.classes_, np.asarray(y_train)[neighbors])
+    votes = np.cumsum(np.eye(len(knn.classes_), dtype=np.int32)[labels], axis=1)
+    predictions = knn.classes_[votes.argmax(axis=2)]  # (n_test, max_k)
+    return {k: accuracy_score(y_test, predictions[:, k - 1]) for k in range(1, max_k + 1)}
+
+
+# ======= FOLD CACHE =======
+class FoldCache:
+    def __init__(self, directory, data_key, enabled=True):
+        self.directory = directory
+        self.data_key = data_key
+        self.enabled = enabled
+        self.hits = 0
+        self.misses = 0
+        if enabled:
+            os.makedirs(directory, exist_ok=True)
+
+    def _path(self, name, params, fold, random_state):
+        key = json.dumps({
+            "data": self.data_key,
+            "model": name,
+            "params": params,
+            "fold": fold,
+            "folds": CV_FOLDS,
+            "random_state": random_state,
+            "split": [TEST_SIZE, SPLIT_SEED],
+        }, sort_keys=True, default=str)
+        return os.path.join(self.directory, hashlib.sha256(key.encode()).hexdigest() + ".json")
+
+    def get(self, *key):
+        if self.enabled:
+            try:
+                with open(self._path(*key)) as f:
+                    score = json.load(f)["score"]
+                self.hits += 1
+                return score
+            except (OSError, ValueError, KeyError):
+                pass
+        self.misses += 1
+        return None
+
+    def put(self, score, *key):
+        if self.enabled:
+            with open(self._path(*key), "w") as f:
+                json.dump({"score": score}, f)
+
+
+def run(data_path="Daily_Water_Intake.csv", out_dir=".", jobs=None, cache_dir=CACHE_DIR,
+        use_cache=True, random_state=SPLIT_SEED, log=print):
+    timings = {}
+    with timed(timings, "load"):
+        # A dataset directory has the same values and key as its CSV, so
+        # fold scores cached for either are shared
+        df = read_data(data_path)
+        data_key = data_version(data_path)
+    with timed(timings, "encode"):
+        x, y, encoders, scaler, target_encoder = prepare(df)
+        x_train, x_test, y_train, y_test = train_test_split(x, y, test_size=TEST_SIZE, random_state=SPLIT_SEED)
+        folds = list(StratifiedKFold(CV_FOLDS).split(x_train, y_train))
+
+    cache = FoldCache(cache_dir, data_key, enabled=use_cache)
+    grid_scores = {}
+    fold_times = {}
+    with ProcessPoolExecutor(max_workers=jobs, initializer=_init_worker,
+                             initargs=(x_train, y_train, folds)) as pool:
+        with timed(timings, "search"):
+            # Logistic Regression has no grid; start its fit alongside the folds
+            lr_future = pool.submit(_fit_task, "Logistic Regression", {}, random_state)
+            pending = {}
+            for name, (_, grid) in GRIDS.items():
+                grid_scores[name] = []
+                for i, params in enumerate(ParameterGrid(grid)):
+                    scores = []
+                    for fold in range(CV_FOLDS):
+                        cached = cache.get(name, params, fold, random_state)
+                        if cached is None:
+                            pending[pool.submit(_fold_task, name, params, fold, random_state)] = (name, i, fold, params)
+                        scores.append(cached)
+                    grid_scores[name].append((params, scores))
+            with timed(timings, "knn_sweep"):
+                knn_scores = knn_sweep(x_train, y_train, x_test, y_test)
+            for future, (name, i, fold, params) in pending.items():
+                score, seconds = future.result()
+                cache.put(score, name, params, fold, random_state)
+                grid_scores[name][i][1][fold] = score
+                fold_times[name] = fold_times.get(name, 0.0) + seconds
+
+        with timed(timings, "refit"):
+            best_params = {}
+            refits = {}
+            for name, results in grid_scores.items():
+                means = [np.mean(scores) for _, scores in results]
+                best_params[name] = results[int(np.argmax(means))][0]
+                refits[name] = pool.submit(_fit_task, name, best_params[name], random_state)
+            best_k = max(knn_scores, key=lambda k: (knn_scores[k], -k))
+            models = {"Logistic Regression": lr_future.result()[0]}
+            for name, future in refits.items():
+                models[name] = future.result()[0]
+            models["KNeighbors Classifier"] = KNeighborsClassifier(n_neighbors=best_k).fit(x_train, y_train)
+
+    with timed(timings, "evaluate"):
+        results = {name: evaluate(model, x_test, y_test) for name, model in models.items()}
+        best_name = max(results, key=lambda name: results[name]["Accuracy Score"])
+        best_model = models[best_name]
+
+    with timed(timings, "write"):
+        os.makedirs(out_dir, exist_ok=True)
+        for col, le in encoders.items():
+            joblib.dump(le, os.path.join(out_dir, f"label_encoder_{col}.pkl"))
+        joblib.dump(scaler, os.path.join(out_dir, SCALER_FILE))
+        joblib.dump(target_encoder, os.path.join(out_dir, TARGET_ENCODER_FILE))
+        joblib.dump(best_model, os.path.join(out_dir, MODEL_FILE))
+        if has_bundle(out_dir):
+            write_bundle(out_dir)  # keep an existing bundle in step with the new .pkl files
+
+    report = {
+        "data": {"path": data_path, "sha256": data_key, "rows": len(df)},
+        "best_model": best_name,
+        "best_params": {**best_params, "KNeighbors Classifier": {"n_neighbors": best_k}},
+        "results": results,
+        "knn_scores": knn_scores,
+        "cache": {"hits": cache.hits, "misses": cache.misses},
+        "timings": {**timings, "fold_cpu_seconds": {k: round(v, 4) for k, v in fold_times.items()}},
+    }
+    with open(os.path.join(out_dir, REPORT_FILE), "w") as f:
+        json.dump(report, f, indent=2, default=str)
+    if log:
+        log(f"Best model: {best_name} (accuracy {results[best_name]['Accuracy Score']:.4f})")
+        log(f"Fold cache: {cache.hits} hits, {cache.misses} misses")
+        for stage, seconds in timings.items():
+            log(f"  {stage:<10} {seconds:8.3f}s")
+    return report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Train the hydration model and write the app's artifacts.")
+    parser.add_argument("--data", default="Daily_Water_Intake.csv",
+                        help="CSV file, or a directory written by `python dataset.py convert`")
+    parser.add_argument("--out", default=".", help="directory for the .pkl artifacts and report")
+    parser.add_argument("--jobs", type=int, default=None, help="worker processes (default: CPU count)")
+    parser.add_argument("--cache-dir", default=CACHE_DIR)
+    parser.add_argument("--no-cache", action="store_true", help="recompute every fold")
+    parser.add_argument("--random-state", type=int, default=SPLIT_SEED, help="seed for the tree / forest candidates")
+    args = parser.parse_args(argv)
+    run(args.data, args.out, args.jobs, args.cache_dir, not args.no_cache, args.random_state)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,196 @@
+"""What-if solver: the least daily water intake the model rates Good.
+
+All other inputs are held fixed. For a decision tree the answer is exact:
+the model's output as a function of intake can only change where a split
+tests the intake feature, so it is enough to score one candidate at the
+start of every interval between those thresholds. Each candidate is the
+first RESOLUTION-litre step past its threshold, and every row's candidates
+are scored in one batched predict. Other models are scored on the whole
+RESOLUTION grid instead, still in one batch per chunk of rows.
+
+    python whatif.py --check
+    python whatif.py --data Daily_Water_Intake.csv --out intake_targets.csv
+"""
+import argparse
+import sys
+import time
+from collections import namedtuple
+
+import numpy as np
+
+from artifacts import FORM_LIMITS
+from inference import TreeEngine
+
+INTAKE_COLUMN = "Daily Water Intake (liters)"
+GOOD_CLASS = 0  # artifacts.status_label(0) == "Good"
+DEFAULT_TARGET_CONFIDENCE = 0.85
+RESOLUTION = 0.01  # litres
+MIN_INTAKE = FORM_LIMITS[INTAKE_COLUMN].min
+MAX_INTAKE = FORM_LIMITS[INTAKE_COLUMN].max  # the app's input limit
+MAX_BATCH_ROWS = 1_000_000  # rows x candidates scored per predict call
+
+# intake: least qualifying litres (NaN if none in range); confidence: the
+# model's confidence in Good there
+Target = namedtuple("Target", ["intake", "confidence"])
+
+
+class IntakeSolver:
+    def __init__(self, engine, preprocessor, low=MIN_INTAKE, high=MAX_INTAKE, resolution=RESOLUTION):
+        self.engine = engine
+        self.preprocessor = preprocessor
+        self.resolution = resolution
+        for j, col, scale, offset in preprocessor.numeric:
+            if col == INTAKE_COLUMN:
+                self.column, self.scale, self.offset = j, scale, offset
+                break
+        else:
+            raise ValueError(f"{INTAKE_COLUMN!r} is not a model feature")
+        self.candidates = self._candidates(low, high)
+        self.scaled_candidates = self._scale(self.candidates)
+
+    def _scale(self, litres):
+        scaled = litres * self.scale + self.offset
+        if self.preprocessor.clip:
+            scaled = np.clip(scaled, *self.preprocessor.feature_range)
+        return scaled
+
+    def _steps(self, low, high):
+        return np.round(np.arange(round(low / self.resolution), round(high / self.resolution) + 1) * self.resolution, 10)
+
+    def _candidates(self, low, high):
+        tree = getattr(self.engine, "engine", self.engine)  # unwrap a lookup_table.TableEngine
+        if not isinstance(tree, TreeEngine):
+            return self._steps(low, high)
+        splits = ~np.asarray(tree.is_leaf) & (np.asarray(tree.feature) == self.column)
+        thresholds = np.unique(np.asarray(tree.threshold)[splits])
+        # First grid step on the right-hand side of each threshold, compared
+        # in float32 like the tree itself
+        steps = np.ceil((thresholds - self.offset) / self.scale / self.resolution - 1e-9)
+        litres = np.round(steps * self.resolution, 10)
+        behind = self._scale(litres).astype(np.float32) <= thresholds
+        litres[behind] = np.round(litres[behind] + self.resolution, 10)
+        litres = litres[(litres > low) & (litres <= high)]
+        return np.unique(np.concatenate([[low], litres]))
+
+    def solve(self, X, target_confidence=DEFAULT_TARGET_CONFIDENCE, from_current=False):
+        """Target per row of X (encoded and scaled, model feature order).
+
+        By default this is the least qualifying intake anywhere in range.
+        With from_current, it is the nearest one reachable from each row's
+        own intake without crossing a stretch that does not qualify:
+        - for a row that already qualifies, where its qualifying stretch
+          begins;
+        - otherwise, the least qualifying intake above the current one.
+        """
+        X = np.atleast_2d(np.asarray(X, dtype=np.float64))
+        k = len(self.candidates)
+        intake = np.full(len(X), np.nan)
+        confidence = np.full(len(X), np.nan)
+        chunk = max(1, MAX_BATCH_ROWS // (k + 1))
+        for start in range(0, len(X), chunk):
+            rows = X[start:start + chunk]
+            n = len(rows)
+            grid = np.repeat(rows, k + 1, axis=0)  # every candidate, then the row as given
+            grid[:, self.column] = np.tile(np.append(self.scaled_candidates, np.nan), n)
+            grid[k::k + 1, self.column] = rows[:, self.column]
+            classes, conf = self.engine.predict(grid)
+            classes = np.asarray(classes).reshape(n, k + 1)
+            conf = np.asarray(conf).reshape(n, k + 1)
+            ok = (classes == GOOD_CLASS) & (conf >= target_confidence)
+            current_ok, current_conf, ok, conf = ok[:, k], conf[:, k], ok[:, :k], conf[:, :k]
+            found = ok.any(axis=1)
+            first = ok.argmax(axis=1)
+            at_current = np.zeros(n, dtype=bool)
+            if from_current:
+                below = self.scaled_candidates[None, :] <= rows[:, [self.column]]
+                n_below = below.sum(axis=1)
+                # Qualifying rows: back to just after the last failing candidate below
+                failing = ~ok & below
+                run_start = np.where(failing.any(axis=1), k - failing[:, ::-1].argmax(axis=1), 0)
+                # An off-grid intake can qualify while the candidate before it does not
+                at_current = current_ok & (run_start >= n_below)
+                # Other rows: the first qualifying candidate above
+                above = ok & ~below
+                first = np.where(current_ok, np.minimum(run_start, k - 1), above.argmax(axis=1))
+                found = current_ok | above.any(axis=1)
+            litres = np.where(at_current, (rows[:, self.column] - self.offset) / self.scale, self.candidates[first])
+            chosen_conf = np.where(at_current, current_conf, conf[np.arange(n), first])
+            intake[start:start + chunk] = np.where(found, litres, np.nan)
+            confidence[start:start + chunk] = np.where(found, chosen_conf, np.nan)
+        return Target(intake, confidence)
+
+    def solve_one(self, row, target_confidence=DEFAULT_TARGET_CONFIDENCE, from_current=False):
+        target = self.solve(np.asarray(row).reshape(1, -1), target_confidence, from_current)
+        return Target(float(target.intake[0]), float(target.confidence[0]))
+
+    def solve_frame(self, df, target_confidence=DEFAULT_TARGET_CONFIDENCE, from_current=False):
+        """Targets for raw rows shaped like Daily_Water_Intake.csv; NaN for invalid rows."""
+        mask = self.preprocessor.valid_mask(df)
+        intake = np.full(len(df), np.nan)
+        confidence = np.full(len(df), np.nan)
+        if mask.any():
+            target = self.solve(self.preprocessor.transform(df[mask]), target_confidence, from_current)
+            intake[mask], confidence[mask] = target.intake, target.confidence
+        return Target(intake, confidence)
+
+
+def _load(data_path, artifacts_dir):
+    import pandas as pd
+
+    from artifacts import load_artifacts
+    from inference import compile_model
+    from preprocessing import Preprocessor
+
+    artifacts = load_artifacts(artifacts_dir)
+    return pd.read_csv(data_path), compile_model(artifacts.model), Preprocessor(artifacts)
+
+
+def check(data_path="Daily_Water_Intake.csv", artifacts_dir=".", target_confidence=DEFAULT_TARGET_CONFIDENCE):
+    """Compare the threshold solver with a full-grid scan on every dataset row."""
+    df, engine, preprocessor = _load(data_path, artifacts_dir)
+    solver = IntakeSolver(engine, preprocessor)
+    grid = IntakeSolver(engine, preprocessor)
+    grid.candidates = grid._steps(MIN_INTAKE, MAX_INTAKE)
+    grid.scaled_candidates = grid._scale(grid.candidates)
+    mismatches = 0
+    for from_current in (False, True):
+        fast = solver.solve_frame(df, target_confidence, from_current)
+        full = grid.solve_frame(df, target_confidence, from_current)
+        same = np.isclose(fast.intake, full.intake, rtol=0, atol=1e-9) | (np.isnan(fast.intake) & np.isnan(full.intake))
+        mismatches += int((~same).sum())
+    return len(df), len(solver.candidates), len(grid.candidates), mismatches
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Least water intake the model rates Good, per profile.")
+    parser.add_argument("--data", default="Daily_Water_Intake.csv")
+    parser.add_argument("--artifacts", default=".")
+    parser.add_argument("--out", help="write the input rows with their target intake to this CSV")
+    parser.add_argument("--confidence", type=float, default=DEFAULT_TARGET_CONFIDENCE, help="minimum confidence in Good")
+    parser.add_argument("--from-current", action="store_true",
+                        help="nearest qualifying intake from each row's own intake instead of the least overall")
+    parser.add_argument("--check", action="store_true", help="compare with a full 0.01L grid scan")
+    args = parser.parse_args(argv)
+    if not (args.check or args.out):
+        parser.print_help()
+        return
+
+    if args.check:
+        rows, k, grid_k, mismatches = check(args.data, args.artifacts, args.confidence)
+        print(f"{rows:,} rows: {k} threshold candidates vs {grid_k} grid steps, {mismatches} mismatches")
+        if mismatches:
+            sys.exit(1)
+    if args.out:
+        df, engine, preprocessor = _load(args.data, args.artifacts)
+        start = time.perf_counter()
+        target = IntakeSolver(engine, preprocessor).solve_frame(df, args.confidence, args.from_current)
+        seconds = time.perf_counter() - start
+        df["Target Intake (liters)"] = target.intake
+        df["Target Confidence"] = np.round(target.confidence * 100, 1)
+        df.to_csv(args.out, index=False)
+        print(f"Solved {len(df):,} profiles in {seconds:.2f}s ({len(df) / seconds:,.0f} profiles/sec) -> {args.out}",
+              file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()